@@ -1,21 +1,34 @@
 from __future__ import annotations
 
-from typing import Any
-
-from django.contrib import admin
-from django.contrib.admin.utils import label_for_field, lookup_field
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
-from django.http import HttpRequest, HttpResponse
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Count
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.urls import path
-from django.utils import formats
-
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-
+from django.utils import timezone
+
+from .applications import decide_applications
+from .counters import COUNTER_SOURCES, bump_event_counters
+from .exports import (
+    XLSX_CONTENT_TYPE,
+    allowed_model_admins,
+    export_content_type,
+    export_filename,
+    export_model_admins,
+    iter_export,
+    xlsx_tempfile,
+)
 from .forms import AdminExportForm
-from .models import Category, Event, VolunteerApplication, EventLike
+from .models import Category, Event, ExportJob, VolunteerApplication, EventLike
+from .pagination import EstimatedCountPaginator
+from .profiling import dump_path, list_profiles
+from .seats import lock_application_events, lock_events, promote_waitlist, release_seats, sync_seat
+from .slowsql import buffer_is_process_local, clear_slow_queries, recent_slow_queries
 
 
 @admin.register(Category)
@@ -24,152 +37,312 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ("name",)
 
 
+class LargeTableAdminMixin:
+    """
+    Список большой таблицы: FK-колонки list_display подтягиваются JOIN-ом
+    (list_select_related вычисляется сам), без фильтров число строк — по
+    статистике БД вместо COUNT(*), второго COUNT(*) «всего» нет.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_list_select_related(self, request):
+        opts = self.model._meta
+        related = []
+        for name in self.get_list_display(request):
+            if not isinstance(name, str):
+                continue
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                continue  # метод/атрибут админки, а не поле
+            if field.many_to_one or field.one_to_one:
+                related.append(name)
+        return tuple(related)
+
+
+class EventListFilter(admin.SimpleListFilter):
+    """
+    Фильтр по мероприятию без списка всех Event в боковой панели: только
+    ADMIN_EVENT_FILTER_LIMIT последних по дате и выбранное (если оно старше).
+    Остальные — через ?event=<id> или поиск.
+    """
+    title = "мероприятие"
+    parameter_name = "event"
+
+    def lookups(self, request, model_admin):
+        events = list(Event.objects.order_by("-event_date", "-pk").values_list("pk", "title")[
+            : settings.ADMIN_EVENT_FILTER_LIMIT
+        ])
+        selected = self.value()
+        if selected and selected.isdigit() and int(selected) not in {pk for pk, _ in events}:
+            events += list(Event.objects.filter(pk=selected).values_list("pk", "title"))
+        return [(str(pk), title) for pk, title in events]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        if not value.isdigit():
+            raise IncorrectLookupParameters(f"Некорректный id мероприятия: {value}")
+        return queryset.filter(event_id=value)
+
+
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "category", "event_date", "location", "created_at")
+class EventAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "title", "category", "event_date", "location", "capacity", "seats_taken", "created_at")
     list_filter = ("category",)
     search_fields = ("title", "location")
+    readonly_fields = ("likes_count", "applications_count", "seats_taken")
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            # Счётчики и занятые места параллельно меняются F()-сдвигами — значения,
+            # прочитанные при открытии формы, обратно не пишем
+            obj.save(
+                update_fields=[
+                    f.name
+                    for f in obj._meta.concrete_fields
+                    if not f.primary_key and f.name not in COUNTER_SOURCES
+                ]
+            )
+        else:
+            super().save_model(request, obj, form, change)
+        if "capacity" in form.changed_data:
+            # Мест стало больше — забираем людей из листа ожидания
+            promote_waitlist(obj.pk)
+
+
+class EventCounterAdminMixin:
+    """Поддерживает денормализованный счётчик Event при добавлении/удалении строк из админки."""
+    counter_kwarg: str = ""  # "likes" | "applications" — аргумент bump_event_counters
+
+    def _bump(self, event_id: int, delta: int) -> None:
+        bump_event_counters(event_id, **{self.counter_kwarg: delta})
+
+    def save_model(self, request, obj, form, change):
+        old_event_id = None
+        if change and "event" in form.changed_data:
+            old_event_id = type(obj).objects.filter(pk=obj.pk).values_list("event_id", flat=True).first()
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if not change:
+                self._bump(obj.event_id, 1)
+            elif old_event_id is not None and old_event_id != obj.event_id:
+                self._bump(old_event_id, -1)
+                self._bump(obj.event_id, 1)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            event_id = obj.event_id
+            super().delete_model(request, obj)
+            self._bump(event_id, -1)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            per_event = dict(queryset.order_by().values_list("event_id").annotate(n=Count("pk")))
+            super().delete_queryset(request, queryset)
+            for event_id, n in per_event.items():
+                self._bump(event_id, -n)
 
 
 @admin.register(VolunteerApplication)
-class VolunteerApplicationAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "event", "status", "created_at")
-    list_filter = ("status", "event")
+class VolunteerApplicationAdmin(LargeTableAdminMixin, EventCounterAdminMixin, admin.ModelAdmin):
+    counter_kwarg = "applications"
+    list_display = ("id", "user", "event", "status", "created_at", "decided_by", "decided_at")
+    list_filter = ("status", EventListFilter)
+    autocomplete_fields = ("user", "event")
+    readonly_fields = ("decided_by", "decided_at")
     search_fields = ("user__username", "event__title")
+    # «Выбрать все N» в панели действий — решение по всем заявкам под текущими фильтрами и поиском
+    actions = ("approve_applications", "reject_applications")
+
+    def save_model(self, request, obj, form, change):
+        if "status" in form.changed_data:
+            obj.decided_by = request.user
+            obj.decided_at = timezone.now()
+        with transaction.atomic():
+            # Сначала мероприятия (старое и новое), потом заявка — порядок блокировок core.seats
+            if change:
+                before = lock_application_events(obj.pk, obj.event_id)
+            else:
+                before = None
+                lock_events([obj.event_id])
+            super().save_model(request, obj, form, change)
+            # Занятые места и лист ожидания; решение организатора может превысить capacity
+            sync_seat(before, (obj.event_id, obj.status))
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            before = lock_application_events(obj.pk)
+            super().delete_model(request, obj)
+            sync_seat(before, None)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            lock_events(queryset.order_by().values_list("event_id", flat=True).distinct())
+            held = dict(
+                queryset.filter(status__in=VolunteerApplication.SEAT_STATUSES)
+                .order_by()
+                .values_list("event_id")
+                .annotate(n=Count("pk"))
+            )
+            super().delete_queryset(request, queryset)
+            release_seats(held)
 
+    def _decide(self, request, queryset, status: str) -> None:
+        changed = decide_applications(queryset, status, request.user)
+        label = VolunteerApplication.Status(status).label
+        self.message_user(request, f"Статус «{label}» поставлен заявкам: {changed}.", messages.SUCCESS)
 
-@admin.register(EventLike)
-class EventLikeAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "event", "created_at")
-    search_fields = ("user__username", "event__title")
-
-
-def _format_admin_value(value: Any) -> Any:
-    if value is None:
-        return ""
-
-    if isinstance(value, bool):
-        return "Да" if value else "Нет"
-
-    if isinstance(value, models.Model):
-        return str(value)
-
-    # datetime/date: локализованный формат как в админке
-    if hasattr(value, "tzinfo") and hasattr(value, "year") and hasattr(value, "month"):
-        try:
-            return formats.date_format(value, format="DATETIME_FORMAT", use_l10n=True)
-        except Exception:
-            return value.isoformat(sep=" ", timespec="seconds")
-
-    if hasattr(value, "year") and hasattr(value, "month") and hasattr(value, "day") and not hasattr(value, "hour"):
-        try:
-            return formats.date_format(value, format="DATE_FORMAT", use_l10n=True)
-        except Exception:
-            return value.isoformat()
-
-    return value
-
-
-def _get_admin_columns_and_headers(
-    request: HttpRequest,
-    model_admin: admin.ModelAdmin,
-) -> tuple[list[str], list[str]]:
-    columns = list(model_admin.get_list_display(request))
-    headers: list[str] = []
-
-    for col in columns:
-        try:
-            header = label_for_field(col, model_admin.model, model_admin=model_admin, return_attr=False)
-        except Exception:
-            header = col
-        headers.append(str(header))
-
-    return columns, headers
-
-
-def _get_admin_row_values(
-    model_admin: admin.ModelAdmin,
-    obj: models.Model,
-    columns: list[str],
-) -> list[Any]:
-    row: list[Any] = []
+    @admin.action(description="Одобрить выбранные заявки", permissions=["change"])
+    def approve_applications(self, request, queryset):
+        self._decide(request, queryset, VolunteerApplication.Status.APPROVED)
 
-    for col in columns:
-        try:
-            _, _, value = lookup_field(col, obj, model_admin)
-        except ObjectDoesNotExist:
-            value = ""
-        except Exception:
-            value = ""
+    @admin.action(description="Отклонить выбранные заявки", permissions=["change"])
+    def reject_applications(self, request, queryset):
+        self._decide(request, queryset, VolunteerApplication.Status.REJECTED)
 
-        row.append(_format_admin_value(value))
 
-    return row
+@admin.register(EventLike)
+class EventLikeAdmin(LargeTableAdminMixin, EventCounterAdminMixin, admin.ModelAdmin):
+    counter_kwarg = "likes"
+    list_display = ("id", "user", "event", "created_at")
+    list_filter = (EventListFilter,)
+    autocomplete_fields = ("user", "event")
+    search_fields = ("user__username", "event__title")
 
 
 def export_xlsx_view(request: HttpRequest) -> HttpResponse:
     """
-    Экспорт XLSX по колонкам list_display (как в админке).
+    Экспорт XLSX / CSV / NDJSON по колонкам list_display (как в админке).
     Доступ: staff/superuser.
     """
     if not request.user.is_authenticated or not request.user.is_staff:
         return HttpResponse("Forbidden", status=403)
 
-    # Берём текущие ModelAdmin из стандартного admin.site
-    model_admin_map: dict[str, admin.ModelAdmin] = {
-        "core.Category": admin.site._registry.get(Category),
-        "core.Event": admin.site._registry.get(Event),
-        "core.VolunteerApplication": admin.site._registry.get(VolunteerApplication),
-        "core.EventLike": admin.site._registry.get(EventLike),
-    }
-    model_admin_map = {k: v for k, v in model_admin_map.items() if v is not None}
+    model_admin_map = export_model_admins()
+    choices = [(k, k) for k in model_admin_map.keys()]
 
     form = AdminExportForm()
-    form.fields["models"].choices = [(k, k) for k in model_admin_map.keys()]
+    form.fields["models"].choices = choices
 
     if request.method == "POST":
         form = AdminExportForm(request.POST)
-        form.fields["models"].choices = [(k, k) for k in model_admin_map.keys()]
+        form.fields["models"].choices = choices
 
         if form.is_valid():
             selected_models = form.cleaned_data["models"]
 
-            wb = Workbook()
-            default_ws = wb.active
-            wb.remove(default_ws)
+            export_format = form.cleaned_data["format"]
+            compress = form.cleaned_data["compress"] and export_format != "xlsx"
+
+            if form.cleaned_data["background"]:
+                job = ExportJob.objects.create(
+                    created_by=request.user,
+                    model_labels=selected_models,
+                    export_format=export_format,
+                    compress=compress,
+                )
+                messages.success(request, f"Экспорт #{job.pk} поставлен в очередь. Файл появится в списке ниже.")
+                return redirect("admin:export_xlsx")
+
+            model_admins = allowed_model_admins(request.user, selected_models)
+
+            if export_format != "xlsx":
+                # CSV/NDJSON: строки уходят клиенту по мере чтения из БД
+                resp = StreamingHttpResponse(
+                    iter_export(request, model_admins, export_format, compress),
+                    content_type=export_content_type(export_format, compress),
+                )
+                resp["Content-Disposition"] = f'attachment; filename="{export_filename(export_format, compress)}"'
+                return resp
+
+            # Файл собирается во временном файле на диске и отдаётся кусками:
+            # память не растёт с числом строк, ограничения в 5000 строк больше нет.
+            return FileResponse(
+                xlsx_tempfile(request, model_admins),
+                as_attachment=True,
+                filename="export.xlsx",
+                content_type=XLSX_CONTENT_TYPE,
+            )
 
-            for model_label in selected_models:
-                model_admin = model_admin_map.get(model_label)
-                if not model_admin:
-                    continue
+    jobs = ExportJob.objects.all()
+    if not request.user.is_superuser:
+        jobs = jobs.filter(created_by=request.user)
+    jobs = list(jobs[:20])
+    context = {
+        **admin.site.each_context(request),
+        "form": form,
+        "jobs": jobs,
+        "has_active_jobs": any(j.status in (ExportJob.Status.QUEUED, ExportJob.Status.RUNNING) for j in jobs),
+    }
+    return TemplateResponse(request, "admin/export_xlsx.html", context)
 
-                # (опционально) строгая проверка прав на модель
-                app_label = model_admin.model._meta.app_label
-                model_name = model_admin.model._meta.model_name
-                perm = f"{app_label}.view_{model_name}"
-                if not (request.user.is_superuser or request.user.has_perm(perm)):
-                    continue
 
-                columns, headers = _get_admin_columns_and_headers(request, model_admin)
+def export_job_download_view(request: HttpRequest, pk: int) -> HttpResponse:
+    """Скачивание готового файла фоновой выгрузки (только автор или суперпользователь)."""
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return HttpResponse("Forbidden", status=403)
 
-                ws = wb.create_sheet(title=model_label.split(".")[-1][:31])
-                ws.append(headers)
+    job = get_object_or_404(ExportJob, pk=pk, status=ExportJob.Status.DONE)
+    if not (request.user.is_superuser or job.created_by_id == request.user.pk):
+        return HttpResponse("Forbidden", status=403)
+    if not job.file:
+        raise Http404("Файл экспорта не найден")
 
-                qs = model_admin.get_queryset(request).order_by("id")[:5000]
-                for obj in qs:
-                    ws.append(_get_admin_row_values(model_admin, obj, columns))
+    return FileResponse(
+        job.file.open("rb"),
+        as_attachment=True,
+        filename=export_filename(job.export_format, job.compress, stem=f"export-{job.pk}"),
+        content_type=export_content_type(job.export_format, job.compress),
+    )
 
-                for i, header in enumerate(headers, start=1):
-                    ws.column_dimensions[get_column_letter(i)].width = max(12, min(45, len(str(header)) + 6))
 
-            resp = HttpResponse(
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            resp["Content-Disposition"] = 'attachment; filename="export.xlsx"'
-            wb.save(resp)
-            return resp
+def slow_sql_view(request: HttpRequest) -> HttpResponse:
+    """Кольцевой буфер медленных SQL (core.slowsql). Только суперпользователь: в параметрах бывают личные данные."""
+    if not request.user.is_authenticated or not request.user.is_superuser:
+        return HttpResponse("Forbidden", status=403)
 
-    return TemplateResponse(request, "admin/export_xlsx.html", {"form": form})
+    if request.method == "POST":
+        clear_slow_queries()
+        messages.success(request, "Журнал медленных запросов очищен.")
+        return redirect("admin:slow_sql")
+
+    context = {
+        **admin.site.each_context(request),
+        "title": "Медленные SQL-запросы",
+        "records": recent_slow_queries(),
+        "enabled": settings.SLOW_SQL_ENABLED,
+        "threshold_ms": settings.SLOW_SQL_THRESHOLD_MS,
+        "buffer_size": settings.SLOW_SQL_BUFFER_SIZE,
+        "process_local": buffer_is_process_local(),
+    }
+    return TemplateResponse(request, "admin/slow_sql.html", context)
+
+
+def profiles_view(request: HttpRequest) -> HttpResponse:
+    """Дампы cProfile, снятые по ?_profile=1 (core.profiling), с самыми дорогими функциями."""
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return HttpResponse("Forbidden", status=403)
+
+    context = {
+        **admin.site.each_context(request),
+        "title": "Профили запросов",
+        "profiles": list_profiles(),
+        "enabled": settings.PROFILE_ENABLED,
+        "max_files": settings.PROFILE_MAX_FILES,
+    }
+    return TemplateResponse(request, "admin/profiles.html", context)
+
+
+def profile_download_view(request: HttpRequest, name: str) -> HttpResponse:
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return HttpResponse("Forbidden", status=403)
+    path = dump_path(name)
+    if path is None:
+        raise Http404("Профиль не найден")
+    return FileResponse(path.open("rb"), as_attachment=True, filename=name, content_type="application/octet-stream")
 
 
 # ✅ Главное: НЕ подменяем admin.site целиком.
@@ -181,6 +354,14 @@ def _patched_get_urls():
     urls = _original_get_urls()
     custom = [
         path("export-xlsx/", admin.site.admin_view(export_xlsx_view), name="export_xlsx"),
+        path(
+            "export-xlsx/jobs/<int:pk>/download/",
+            admin.site.admin_view(export_job_download_view),
+            name="export_job_download",
+        ),
+        path("slow-sql/", admin.site.admin_view(slow_sql_view), name="slow_sql"),
+        path("profiles/", admin.site.admin_view(profiles_view), name="profiles"),
+        path("profiles/<str:name>/", admin.site.admin_view(profile_download_view), name="profile_download"),
     ]
     return custom + urls
 
@@ -0,0 +1,190 @@
+"""
+Публичный JSON API только для чтения (версия 1): мероприятия и категории.
+
+    GET /api/v1/events/?category=1,2&date_from=2026-05-01&date_to=2026-05-31&fields=id,title&limit=20
+    GET /api/v1/events/<id>/?fields=...
+    GET /api/v1/categories/?fields=...
+
+- fields= — какие поля отдать (по умолчанию все); в SELECT попадают только они.
+- Список листается курсором (core.pagination), ссылки — в next/previous.
+- Каждый ответ — один SQL-запрос: категория через JOIN, счётчики денормализованы.
+- Ответы общие для всех: ETag по телу и Cache-Control: public, max-age=API_CACHE_MAX_AGE;
+  совпавший If-None-Match — 304.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import BigIntegerField, Count
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import quote_etag, urlencode
+from django.views.decorators.http import require_safe
+
+from .models import Category, Event
+from .pagination import KeysetPaginator
+
+# Поле API -> поле для .values()
+EVENT_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "event_date": "event_date",
+    "location": "location",
+    "category": "category_id",
+    "category_name": "category__name",
+    "image": "image",
+    "likes_count": "likes_count",
+    "applications_count": "applications_count",
+    "capacity": "capacity",
+    "seats_taken": "seats_taken",
+    "updated_at": "updated_at",
+}
+CATEGORY_FIELDS = ("id", "name", "events_count")
+
+
+class ApiError(Exception):
+    """Некорректный запрос: текст уходит клиенту с кодом 400."""
+
+
+def _fields(request: HttpRequest, allowed) -> list[str]:
+    raw = request.GET.get("fields", "").strip()
+    if not raw:
+        return list(allowed)
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    if not fields:
+        raise ApiError(f"fields: укажите хотя бы одно поле из: {', '.join(allowed)}.")
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ApiError(f"Неизвестные поля: {', '.join(unknown)}. Доступны: {', '.join(allowed)}.")
+    return fields
+
+
+def _int_list(request: HttpRequest, name: str) -> list[int]:
+    raw = request.GET.get(name, "").strip()
+    if not raw:
+        return []
+    try:
+        values = [int(v) for v in raw.split(",") if v.strip()]
+    except ValueError:
+        raise ApiError(f"{name}: ожидаются целые числа через запятую.") from None
+    # Вне bigint запрос к БД падает (OverflowError в SQLite, DataError в PostgreSQL)
+    if any(abs(v) > BigIntegerField.MAX_BIGINT for v in values):
+        raise ApiError(f"{name}: слишком большое число.")
+    return values
+
+
+def _datetime(request: HttpRequest, name: str, *, end_of_day: bool = False) -> datetime | None:
+    """ISO-дата или дата-время. Для голой даты date_to включает весь день."""
+    raw = request.GET.get(name, "").strip()
+    if not raw:
+        return None
+    try:
+        # parse_datetime принимает и голую дату, поэтому дату проверяем первой
+        day = parse_date(raw)
+        if day is not None:
+            value = datetime.combine(day + timedelta(days=1) if end_of_day else day, time.min)
+        else:
+            value = parse_datetime(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ApiError(f"{name}: ожидается дата ГГГГ-ММ-ДД или дата-время ISO 8601.")
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def _limit(request: HttpRequest) -> int:
+    try:
+        limit = int(request.GET.get("limit", settings.API_PAGE_SIZE))
+    except ValueError:
+        raise ApiError("limit: ожидается целое число.") from None
+    return min(max(1, limit), settings.API_MAX_PAGE_SIZE)
+
+
+def _event_payload(row: dict, fields: list[str]) -> dict:
+    data = {field: row[EVENT_FIELDS[field]] for field in fields}
+    if "image" in data:
+        data["image"] = default_storage.url(data["image"]) if data["image"] else None
+    return data
+
+
+def _json(request: HttpRequest, payload: dict) -> HttpResponse:
+    response = JsonResponse(payload, json_dumps_params={"ensure_ascii": False})
+    etag = quote_etag(hashlib.blake2b(response.content, digest_size=16).hexdigest())
+    response.headers["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=settings.API_CACHE_MAX_AGE)
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+def _error(message: str, status: int) -> JsonResponse:
+    return JsonResponse({"error": message}, status=status, json_dumps_params={"ensure_ascii": False})
+
+
+def _page_url(request: HttpRequest, **cursor) -> str:
+    params = {k: v for k, v in request.GET.items() if k not in ("after", "before")}
+    return request.build_absolute_uri(f"{request.path}?{urlencode({**params, **cursor})}")
+
+
+@require_safe
+def event_list(request: HttpRequest) -> HttpResponse:
+    try:
+        fields = _fields(request, EVENT_FIELDS)
+        categories = _int_list(request, "category")
+        date_from = _datetime(request, "date_from")
+        date_to = _datetime(request, "date_to", end_of_day=True)
+        limit = _limit(request)
+    except ApiError as exc:
+        return _error(str(exc), 400)
+
+    events = Event.objects.all()
+    if categories:
+        events = events.filter(category_id__in=categories)
+    if date_from:
+        events = events.filter(event_date__gte=date_from)
+    if date_to:
+        events = events.filter(event_date__lt=date_to)
+    # id и event_date нужны курсору, даже если их не просили
+    columns = dict.fromkeys(["id", "event_date", *(EVENT_FIELDS[f] for f in fields)])
+    paginator = KeysetPaginator(events.values(*columns), key="event_date", page_size=limit)
+    page = paginator.page(after=request.GET.get("after"), before=request.GET.get("before"))
+
+    return _json(
+        request,
+        {
+            "results": [_event_payload(row, fields) for row in page],
+            "next": _page_url(request, after=page.next_cursor) if page.has_next else None,
+            "previous": _page_url(request, before=page.prev_cursor) if page.has_previous else None,
+        },
+    )
+
+
+@require_safe
+def event_detail(request: HttpRequest, pk: int) -> HttpResponse:
+    try:
+        fields = _fields(request, EVENT_FIELDS)
+    except ApiError as exc:
+        return _error(str(exc), 400)
+
+    row = Event.objects.filter(pk=pk).values(*dict.fromkeys(EVENT_FIELDS[f] for f in fields)).first()
+    if row is None:
+        return _error("Мероприятие не найдено.", 404)
+    return _json(request, _event_payload(row, fields))
+
+
+@require_safe
+def category_list(request: HttpRequest) -> HttpResponse:
+    try:
+        fields = _fields(request, CATEGORY_FIELDS)
+    except ApiError as exc:
+        return _error(str(exc), 400)
+
+    categories = Category.objects.order_by("name")
+    if "events_count" in fields:
+        categories = categories.annotate(events_count=Count("events"))
+    return _json(request, {"results": list(categories.values(*fields))})
@@ -0,0 +1,58 @@
+"""
+Массовое решение по заявкам волонтёров (одобрить / отклонить).
+
+Статус меняется set-based UPDATE-ами по мероприятиям, пачками по DECISION_BATCH_SIZE строк:
+
+    UPDATE core_volunteerapplication SET status=..., decided_by_id=..., decided_at=..., updated_at=...
+    WHERE id IN (SELECT id FROM ... WHERE <фильтры> AND event_id = ... AND status <> ... ORDER BY id LIMIT N)
+
+Каждая пачка — отдельная короткая транзакция под блокировкой строки мероприятия
+(core.seats.lock_events): перед UPDATE тем же подзапросом считается, сколько заявок
+пачки занимали место, и seats_taken сдвигается на разницу, освободившиеся места
+сразу отдаются листу ожидания. Строки не читаются в Python, сигналы не срабатывают
+(статус не входит ни в счётчики, ни в кэш карточек).
+Уже имеющие нужный статус заявки не трогаются — decided_by у них прежний.
+updated_at сдвигается, чтобы страницы участника получили новый ETag (core.conditional).
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .models import VolunteerApplication
+from .seats import lock_events, promote_waitlist, shift_seats
+
+
+def decide_applications(queryset: QuerySet, status: str, decided_by, *, batch_size: int | None = None) -> int:
+    """Ставит status всем заявкам queryset (кроме уже имеющих его). Возвращает число изменённых."""
+    if status not in VolunteerApplication.Status.values:
+        raise ValueError(f"Неизвестный статус заявки: {status}")
+    batch_size = max(1, batch_size or settings.DECISION_BATCH_SIZE)
+    pending = queryset.exclude(status=status).order_by("pk").values("pk")
+    decided_by_id = decided_by.pk if decided_by is not None else None
+    takes_seat = status in VolunteerApplication.SEAT_STATUSES
+    event_ids = sorted(pending.order_by().values_list("event_id", flat=True).distinct())
+
+    total = 0
+    for event_id in event_ids:
+        batch = pending.filter(event_id=event_id)[:batch_size]
+        while True:
+            now = timezone.now()
+            with transaction.atomic():
+                lock_events([event_id])
+                held = VolunteerApplication.objects.filter(
+                    pk__in=batch, status__in=VolunteerApplication.SEAT_STATUSES
+                ).count()
+                changed = VolunteerApplication.objects.filter(pk__in=batch).update(
+                    status=status, decided_by_id=decided_by_id, decided_at=now, updated_at=now
+                )
+                shift_seats(event_id, changed - held if takes_seat else -held)
+                if held and not takes_seat:
+                    promote_waitlist(event_id)
+            total += changed
+            if changed < batch_size:
+                break
+    return total
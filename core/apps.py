@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401  (подключение обработчиков сигналов)
+        from . import slowsql  # noqa: F401  (системная проверка кэша журнала медленных SQL)
@@ -0,0 +1,117 @@
+"""
+Поддержка режима ASGI (uvicorn): всё, что нужно, чтобы цепочка middleware
+оставалась асинхронной до async-представлений.
+
+Если хоть одна middleware умеет только sync, Django оборачивает остаток цепочки
+в поток на каждый запрос — и async-представления теряют смысл. Поэтому наши
+middleware умеют оба режима, а WhiteNoise (только sync) обёрнут здесь.
+
+Потоковый ответ с обычным итератором (экспорт CSV/NDJSON, FileResponse выгрузок
+и статики) Django под ASGI сначала целиком читает в память (sync_to_async(list)).
+AsyncStreamingMiddleware подменяет такой итератор асинхронным, который тянет
+по одному чанку — память снова O(чанк), как под WSGI.
+"""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import FileResponse
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+# Под ASGI каждый чанк — переход в поток, поэтому файлы читаем крупнее, чем по 4 КБ
+ASYNC_FILE_BLOCK_SIZE = 256 * 1024
+
+_DONE = object()
+
+
+@asynccontextmanager
+async def aexecute_wrapper(wrapper, using: str = DEFAULT_DB_ALIAS):
+    """
+    connection.execute_wrapper() для async-кода. Соединения с БД у Django
+    привязаны к потоку, а async ORM выполняет SQL запроса в его отдельном
+    «thread-sensitive» потоке — обёртку ставим на соединение именно этого потока.
+    """
+
+    def enter():
+        manager = connections[using].execute_wrapper(wrapper)
+        manager.__enter__()
+        return manager
+
+    manager = await sync_to_async(enter)()
+    try:
+        yield
+    finally:
+        await sync_to_async(manager.__exit__)(None, None, None)
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise, который не переводит цепочку в sync: статику отдаёт сразу, остальное — дальше с await."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs) -> None:
+        super().__init__(get_response, *args, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _static_file(self, request):
+        if self.autorefresh:
+            return self.find_file(request.path_info)
+        return self.files.get(request.path_info)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        static_file = self._static_file(request)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+async def aiter_chunks(chunks):
+    """
+    Async-итератор поверх sync: по одному next() через sync_to_async. thread_sensitive —
+    итераторы экспорта читают БД курсором, он живёт на соединении потока запроса.
+    """
+    iterator = iter(chunks)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(iterator, _DONE)) is not _DONE:
+        yield chunk
+
+
+class AsyncStreamingMiddleware:
+    """
+    Ставить первой. Под ASGI отдаёт потоковые ответы с sync-итератором по чанку
+    (см. описание модуля); под WSGI ничего не делает.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if response.streaming and not response.is_async:
+            if isinstance(response, FileResponse):
+                # FileResponse читает файл по self.block_size в момент итерации
+                response.block_size = max(response.block_size, ASYNC_FILE_BLOCK_SIZE)
+            response.streaming_content = aiter_chunks(response.streaming_content)
+        return response
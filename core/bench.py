@@ -0,0 +1,241 @@
+"""
+Замеры горячих страниц через тестовый клиент Django (manage.py bench).
+
+Каждый сценарий — один запрос к представлению; для него собираются задержки
+(p50/p95/p99), число SQL-запросов и размер ответа. Запуск — на засеянной БД
+(manage.py seed --users ... --events ...), результат — JSON, который удобно
+сравнивать между коммитами (--compare).
+
+Тестовый клиент не закрывает соединение с БД после запроса, поэтому обычный замер
+не видит стоимость подключения. С --connections каждый сценарий гоняется в
+режимах соединения (connection_mode) и после каждого запроса соединение
+закрывается или возвращается в пул, как это делает настоящий обработчик.
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Event, EventLike, VolunteerApplication
+
+BENCH_VIEWS = ("event_list", "event_list_search", "event_detail", "my_dashboard", "export_xlsx")
+# direct — новое соединение на запрос, persistent — CONN_MAX_AGE, pool — пул psycopg 3
+CONNECTION_MODES = ("direct", "persistent", "pool")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    path: str
+    method: str = "get"
+    data: dict | None = None
+    user: object | None = None
+
+
+@dataclass
+class BenchResult:
+    name: str
+    latencies_ms: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    bytes: list[int] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        return {
+            "iterations": len(self.latencies_ms),
+            "p50_ms": round(percentile(self.latencies_ms, 50), 2),
+            "p95_ms": round(percentile(self.latencies_ms, 95), 2),
+            "p99_ms": round(percentile(self.latencies_ms, 99), 2),
+            "queries": max(self.queries, default=0),
+            "bytes": max(self.bytes, default=0),
+        }
+
+
+def percentile(values: list[float], p: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def _bench_host() -> str:
+    hosts = [h for h in settings.ALLOWED_HOSTS if h and h != "*" and not h.startswith(".")]
+    return hosts[0] if hosts else "localhost"
+
+
+def build_scenarios(views: tuple[str, ...] = BENCH_VIEWS) -> tuple[list[Scenario], list[str]]:
+    """Сценарии по данным из БД и список пропущенных (с причиной)."""
+    User = get_user_model()
+    scenarios: list[Scenario] = []
+    skipped: list[str] = []
+
+    # Самые «тяжёлые» объекты: популярное мероприятие и самый активный пользователь
+    event = Event.objects.order_by("-likes_count", "-pk").only("pk").first()
+    user = (
+        User.objects.filter(is_active=True)
+        .annotate(n=Count("event_likes", distinct=True))
+        .order_by("-n", "pk")
+        .first()
+    )
+    staff = User.objects.filter(is_active=True, is_staff=True).order_by("pk").first()
+
+    for name in views:
+        if name == "event_list":
+            scenarios.append(Scenario(name, reverse("event_list")))
+        elif name == "event_list_search":
+            scenarios.append(Scenario(name, reverse("event_list"), data={"q": "помощь"}))
+        elif name == "event_detail":
+            if event is None:
+                skipped.append(f"{name}: нет мероприятий")
+                continue
+            scenarios.append(Scenario(name, reverse("event_detail", args=[event.pk]), user=user))
+        elif name == "my_dashboard":
+            if user is None:
+                skipped.append(f"{name}: нет пользователей")
+                continue
+            scenarios.append(Scenario(name, reverse("my_dashboard"), user=user))
+        elif name == "export_xlsx":
+            if staff is None:
+                skipped.append(f"{name}: нет активного staff-пользователя")
+                continue
+            scenarios.append(
+                Scenario(
+                    name,
+                    reverse("admin:export_xlsx"),
+                    method="post",
+                    data={"models": ["core.Event"], "format": "xlsx"},
+                    user=staff,
+                )
+            )
+        else:
+            skipped.append(f"{name}: неизвестный сценарий")
+    return scenarios, skipped
+
+
+def connection_unsupported(mode: str) -> str | None:
+    """Почему режим соединения недоступен на текущей БД (None — доступен)."""
+    if mode not in CONNECTION_MODES:
+        return f"{mode}: неизвестный режим соединения"
+    if mode == "pool" and connection.vendor != "postgresql":
+        return f"{mode}: пул соединений есть только у PostgreSQL"
+    return None
+
+
+def _drop_connection() -> None:
+    connection.close()
+    if connection.vendor == "postgresql":
+        connection.close_pool()
+
+
+@contextmanager
+def connection_mode(mode: str) -> Iterator[None]:
+    """Временно переводит соединение default в режим mode (см. CONNECTION_MODES)."""
+    if reason := connection_unsupported(mode):
+        raise ValueError(reason)
+    saved = {key: connection.settings_dict[key] for key in ("CONN_MAX_AGE", "OPTIONS")}
+    options = {key: value for key, value in saved["OPTIONS"].items() if key != "pool"}
+    if mode == "pool":
+        options["pool"] = settings.DB_POOL_OPTIONS
+    _drop_connection()
+    connection.settings_dict.update(
+        CONN_MAX_AGE=(saved["CONN_MAX_AGE"] or 60) if mode == "persistent" else 0, OPTIONS=options
+    )
+    try:
+        yield
+    finally:
+        _drop_connection()
+        connection.settings_dict.update(saved)
+
+
+def run_scenario(
+    scenario: Scenario,
+    *,
+    iterations: int = 20,
+    warmup: int = 2,
+    before_each: Callable[[], None] | None = None,
+    recycle_connections: bool = False,
+) -> BenchResult:
+    """recycle_connections — после каждого запроса закрывать соединение по CONN_MAX_AGE / отдавать в пул."""
+    client = Client(HTTP_HOST=_bench_host())
+    if scenario.user is not None:
+        client.force_login(scenario.user)
+    send = getattr(client, scenario.method)
+
+    result = BenchResult(scenario.name)
+    for i in range(warmup + iterations):
+        if before_each:
+            before_each()
+        if recycle_connections:
+            close_old_connections()
+        # Таймер — до CaptureQueriesContext: он сразу открывает соединение
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            response = send(scenario.path, scenario.data)
+            # Потоковые ответы считаем целиком: пользователь ждёт весь файл
+            body = b"".join(response.streaming_content) if response.streaming else response.content
+            elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"{scenario.name}: HTTP {response.status_code} для {scenario.path}")
+        if i >= warmup:
+            result.latencies_ms.append(elapsed * 1000)
+            result.queries.append(len(ctx.captured_queries))
+            result.bytes.append(len(body))
+    return result
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def bench_meta() -> dict:
+    """Контекст замера: коммит, БД и объём данных — чтобы сравнивать сопоставимое."""
+    User = get_user_model()
+    return {
+        "revision": _git_revision(),
+        "timestamp": timezone.now().isoformat(),
+        "db_vendor": connection.vendor,
+        "rows": {
+            "users": User.objects.count(),
+            "events": Event.objects.count(),
+            "likes": EventLike.objects.count(),
+            "applications": VolunteerApplication.objects.count(),
+        },
+    }
+
+
+def compare_results(old: dict, new: dict) -> list[tuple[str, str, float, float, float | None]]:
+    """(сценарий, метрика, было, стало, изменение в %) для общих сценариев."""
+    rows = []
+    for name, current in new.get("results", {}).items():
+        previous = old.get("results", {}).get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "queries", "bytes"):
+            before, after = previous.get(metric, 0), current.get(metric, 0)
+            change = (after - before) * 100 / before if before else None
+            rows.append((name, metric, before, after, change))
+    return rows
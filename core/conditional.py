@@ -0,0 +1,99 @@
+"""
+Условные GET для страниц мероприятий (ETag / Last-Modified).
+
+Валидатор считается из того, что уже выбрано для страницы: (id, updated_at,
+likes_count, applications_count) мероприятий и состояние посетителя
+(core.user_state), плюс ключ пользователя. Если клиент прислал совпадающий
+If-None-Match / If-Modified-Since — отдаём 304, не трогая кэш карточек и
+шаблоны.
+
+updated_at мероприятия сдвигается и при изменениях, которые идут мимо save():
+счётчики (core.counters, core.likes), копии картинки (core.images),
+переименование категории (core.signals) — поэтому Last-Modified страницы
+мероприятия честный. У списков Last-Modified нет, только ETag: если мероприятие
+удалили или оно ушло со страницы, на его место встают более старые, и max(updated_at)
+не растёт — по If-Modified-Since клиент получил бы 304 на изменившийся список.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.contrib.messages import get_messages
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .user_state import EventUserState
+
+# Менять при правке шаблонов страниц: иначе браузеры получат 304 на старую разметку
+PAGE_VERSION = "v2"
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: int | None
+
+    def not_modified(self, request: HttpRequest) -> HttpResponse | None:
+        response = get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None:
+            self.apply(response)
+        return response
+
+    def apply(self, response: HttpResponse) -> HttpResponse:
+        response.headers["ETag"] = self.etag
+        if self.last_modified is not None:
+            response.headers["Last-Modified"] = http_date(self.last_modified)
+        # Страница персональная: хранить можно только в браузере и только с перепроверкой
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Cookie",))
+        return response
+
+
+def _user_key(request: HttpRequest) -> tuple:
+    user = request.user
+    if not user.is_authenticated:
+        return ("anon",)
+    # Токен CSRF в формах страницы привязан к секрету в cookie: новый секрет — новая страница.
+    # get_token() заводит секрет уже сейчас, чтобы ETag первого ответа совпал со вторым.
+    get_token(request)
+    return (user.pk, user.get_username(), user.is_staff, request.META["CSRF_COOKIE"])
+
+
+def page_validators(
+    request: HttpRequest,
+    rows: Iterable[tuple[int, datetime, int, int]],
+    states: dict[int, EventUserState],
+    *extra,
+    with_last_modified: bool = True,
+) -> Validators | None:
+    """
+    rows — (id, updated_at, likes_count, applications_count) мероприятий страницы,
+    extra — всё прочее, от чего зависит разметка (навигация, поисковый запрос).
+    with_last_modified=False — для списков (см. описание модуля).
+    None — страницу кэшировать нельзя (ждут показа flash-сообщения).
+    """
+    if request.method not in ("GET", "HEAD") or len(get_messages(request)):
+        return None
+
+    rows = list(rows)
+    user_parts = []
+    timestamps = [row[1] for row in rows]
+    for pk, state in sorted(states.items()):
+        application = state.application
+        user_parts.append((pk, state.liked, application.status if application else None))
+        if application is not None:
+            timestamps.append(application.updated_at)
+
+    digest = hashlib.blake2b(
+        repr((PAGE_VERSION, _user_key(request), rows, user_parts, extra)).encode(),
+        digest_size=16,
+    ).hexdigest()
+    last_modified = int(max(timestamps).timestamp()) if timestamps and with_last_modified else None
+    # Слабый ETag: в разметке есть маскированный CSRF-токен, байты каждый раз разные
+    return Validators(etag=f"W/{quote_etag(digest)}", last_modified=last_modified)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from django.db.models import Count, F, IntegerField, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Event, EventLike, VolunteerApplication
+
+# Счётчик на Event -> (модель, строки которой он считает; условие на эти строки)
+COUNTER_SOURCES = {
+    "likes_count": (EventLike, Q()),
+    "applications_count": (VolunteerApplication, Q()),
+    "seats_taken": (VolunteerApplication, Q(status__in=VolunteerApplication.SEAT_STATUSES)),
+}
+
+
+def bump_event_counters(event_id: int, *, likes: int = 0, applications: int = 0) -> None:
+    """
+    Атомарно сдвигает счётчики одного мероприятия одним UPDATE.
+    Вызывать в той же транзакции, что и вставку/удаление лайка или заявки.
+    """
+    updates = {}
+    for field, delta in (("likes_count", likes), ("applications_count", applications)):
+        if delta:
+            # Greatest: счётчик не уходит в минус, даже если он уже «разъехался»
+            updates[field] = Greatest(F(field) + delta, Value(0))
+    if updates:
+        # updated_at — чтобы Last-Modified страниц мероприятия учитывал счётчики (core.conditional)
+        Event.objects.filter(pk=event_id).update(**updates, updated_at=timezone.now())
+
+
+def _actual_count_subquery(field: str) -> Coalesce:
+    source, condition = COUNTER_SOURCES[field]
+    counted = (
+        source.objects.filter(condition, event=OuterRef("pk"))
+        .order_by()
+        .values("event")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def rebuild_event_counters(queryset: QuerySet | None = None, fields=tuple(COUNTER_SOURCES)) -> int:
+    """Пересчитывает счётчики одним set-based UPDATE. Возвращает число обновлённых строк."""
+    qs = Event.objects.all() if queryset is None else queryset
+    return qs.update(**{field: _actual_count_subquery(field) for field in fields})
+
+
+def find_counter_drift(queryset: QuerySet | None = None) -> QuerySet:
+    """Мероприятия, у которых хотя бы один счётчик не совпадает с реальным числом строк."""
+    qs = Event.objects.all() if queryset is None else queryset
+    qs = qs.annotate(**{f"actual_{field}": _actual_count_subquery(field) for field in COUNTER_SOURCES})
+    mismatch = Q()
+    for field in COUNTER_SOURCES:
+        mismatch |= ~Q(**{field: F(f"actual_{field}")})
+    return qs.filter(mismatch).order_by("pk")
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.http import HttpRequest
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .exports import allowed_model_admins, count_admin_rows, export_filename, iter_export, write_xlsx
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+def fail_stale_jobs() -> int:
+    """
+    Задачи RUNNING, у которых updated_at (его двигает каждый отчёт о прогрессе) старше
+    EXPORT_JOB_STALE_AFTER секунд: воркер умер посреди выгрузки. Помечаются ошибкой,
+    а не возвращаются в очередь — выгрузка, которая уронила воркер (например, по памяти),
+    уронила бы и следующий. Возвращает число таких задач.
+    """
+    now = timezone.now()
+    stale = ExportJob.objects.filter(
+        status=ExportJob.Status.RUNNING, updated_at__lt=now - timedelta(seconds=settings.EXPORT_JOB_STALE_AFTER)
+    )
+    failed = stale.update(
+        status=ExportJob.Status.FAILED,
+        error="Воркер остановился во время выгрузки. Запустите экспорт заново.",
+        finished_at=now,
+        updated_at=now,
+    )
+    if failed:
+        logger.warning("Marked %s stale export job(s) as failed", failed)
+    return failed
+
+
+def claim_next_job() -> ExportJob | None:
+    """
+    Забирает самую старую задачу из очереди. SKIP LOCKED (Postgres) позволяет
+    запускать несколько воркеров: каждый получит свою задачу.
+    Заодно закрывает задачи умерших воркеров (fail_stale_jobs).
+    """
+    fail_stale_jobs()
+    with transaction.atomic():
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ExportJob.Status.QUEUED)
+            .order_by("created_at", "pk")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ExportJob.Status.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at", "updated_at"])
+        return job
+
+
+def _job_request(job: ExportJob):
+    """
+    ModelAdmin.get_list_display()/get_queryset() принимают request —
+    воспроизводим запрос автора задачи, чтобы колонки и права были как в админке.
+    """
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = "/admin/"
+    request.user = job.created_by
+    return request
+
+
+def run_export_job(job: ExportJob) -> None:
+    """Выполняет задачу: пишет файл во временный файл, затем сохраняет в EXPORT_ROOT/exports/."""
+    try:
+        if job.created_by is None or not job.created_by.is_staff:
+            raise PermissionError("Автор задачи больше не имеет доступа к админке.")
+
+        request = _job_request(job)
+        model_admins = allowed_model_admins(job.created_by, job.model_labels)
+
+        job.rows_total = count_admin_rows(request, model_admins)
+        job.save(update_fields=["rows_total", "updated_at"])
+
+        def on_progress(rows_done: int) -> None:
+            ExportJob.objects.filter(pk=job.pk).update(rows_done=rows_done, updated_at=timezone.now())
+
+        with tempfile.TemporaryFile() as tmp:
+            if job.export_format == "xlsx":
+                write_xlsx(request, model_admins, tmp, on_progress=on_progress)
+            else:
+                for chunk in iter_export(request, model_admins, job.export_format, job.compress, on_progress):
+                    tmp.write(chunk)
+            tmp.seek(0)
+            # Случайный суффикс: имя файла не угадать по номеру задачи
+            stem = f"export-{job.pk}-{get_random_string(20)}"
+            filename = export_filename(job.export_format, job.compress, stem=stem)
+            job.file.save(filename, File(tmp), save=False)
+
+        job.refresh_from_db(fields=["rows_done"])
+        job.status = ExportJob.Status.DONE
+    except Exception as exc:
+        logger.exception("Export job #%s failed", job.pk)
+        job.status = ExportJob.Status.FAILED
+        job.error = str(exc)
+
+    job.finished_at = timezone.now()
+    job.save()
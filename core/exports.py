@@ -0,0 +1,447 @@
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+import json
+import tempfile
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import IO, Any
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.utils import label_for_field, lookup_field
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import QuerySet
+from django.db.models.constants import LOOKUP_SEP
+from django.http import HttpRequest
+from django.utils import formats
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# формат -> (расширение, Content-Type)
+EXPORT_FORMATS = {
+    "xlsx": ("xlsx", XLSX_CONTENT_TYPE),
+    "csv": ("csv", "text/csv; charset=utf-8"),
+    "ndjson": ("ndjson", "application/x-ndjson; charset=utf-8"),
+}
+
+# Сколько байт копить перед отдачей клиенту: меньше накладных расходов на каждый yield
+STREAM_BUFFER_SIZE = 64 * 1024
+
+# Модели, доступные для экспорта (порядок = порядок в форме)
+EXPORT_MODEL_LABELS = ("core.Category", "core.Event", "core.VolunteerApplication", "core.EventLike")
+
+
+def export_model_admins() -> dict[str, admin.ModelAdmin]:
+    """Текущие ModelAdmin из стандартного admin.site по меткам моделей."""
+    model_admin_map: dict[str, admin.ModelAdmin] = {}
+    for label in EXPORT_MODEL_LABELS:
+        model_admin = admin.site._registry.get(apps.get_model(label))
+        if model_admin is not None:
+            model_admin_map[label] = model_admin
+    return model_admin_map
+
+
+def allowed_model_admins(user, model_labels: list[str]) -> list[tuple[str, admin.ModelAdmin]]:
+    """Выбранные модели, на просмотр которых у пользователя есть право."""
+    model_admin_map = export_model_admins()
+    allowed: list[tuple[str, admin.ModelAdmin]] = []
+    for model_label in model_labels:
+        model_admin = model_admin_map.get(model_label)
+        if not model_admin:
+            continue
+
+        # (опционально) строгая проверка прав на модель
+        app_label = model_admin.model._meta.app_label
+        model_name = model_admin.model._meta.model_name
+        perm = f"{app_label}.view_{model_name}"
+        if not (user.is_superuser or user.has_perm(perm)):
+            continue
+
+        allowed.append((model_label, model_admin))
+    return allowed
+
+
+def _format_admin_value(value: Any) -> Any:
+    if value is None:
+        return ""
+
+    if isinstance(value, bool):
+        return "Да" if value else "Нет"
+
+    if isinstance(value, models.Model):
+        return str(value)
+
+    # datetime/date: локализованный формат как в админке
+    if hasattr(value, "tzinfo") and hasattr(value, "year") and hasattr(value, "month"):
+        try:
+            return formats.date_format(value, format="DATETIME_FORMAT", use_l10n=True)
+        except Exception:
+            return value.isoformat(sep=" ", timespec="seconds")
+
+    if hasattr(value, "year") and hasattr(value, "month") and hasattr(value, "day") and not hasattr(value, "hour"):
+        try:
+            return formats.date_format(value, format="DATE_FORMAT", use_l10n=True)
+        except Exception:
+            return value.isoformat()
+
+    return value
+
+
+def get_admin_columns_and_headers(
+    request: HttpRequest,
+    model_admin: admin.ModelAdmin,
+) -> tuple[list[str], list[str]]:
+    columns = list(model_admin.get_list_display(request))
+    headers: list[str] = []
+
+    for col in columns:
+        try:
+            header = label_for_field(col, model_admin.model, model_admin=model_admin, return_attr=False)
+        except Exception:
+            header = col
+        headers.append(str(header))
+
+    return columns, headers
+
+
+def _empty_if_none(value: Any) -> Any:
+    return "" if value is None else value
+
+
+def _format_related(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _format_bool(value: Any) -> Any:
+    if value is None:
+        return ""
+    return "Да" if value else "Нет"
+
+
+def _format_datetime(value: Any) -> Any:
+    if value is None:
+        return ""
+    try:
+        return formats.date_format(value, format="DATETIME_FORMAT", use_l10n=True)
+    except Exception:
+        return value.isoformat(sep=" ", timespec="seconds")
+
+
+def _format_date(value: Any) -> Any:
+    if value is None:
+        return ""
+    try:
+        return formats.date_format(value, format="DATE_FORMAT", use_l10n=True)
+    except Exception:
+        return value.isoformat()
+
+
+def _formatter_for_field(field: models.Field) -> Callable[[Any], Any]:
+    if field.is_relation:
+        return _format_related
+    if isinstance(field, models.BooleanField):
+        return _format_bool
+    if isinstance(field, models.DateTimeField):
+        return _format_datetime
+    if isinstance(field, models.DateField):
+        return _format_date
+    return _empty_if_none
+
+
+def _resolve_field_path(model: type[models.Model], name: str) -> list[models.Field] | None:
+    """
+    Цепочка полей для `name` ("status", "event", "event__category__name").
+    None — это не поле модели (метод ModelAdmin, свойство, callable...) — такие
+    колонки идут общим путём через lookup_field.
+    """
+    fields: list[models.Field] = []
+    current = model
+    parts = name.split(LOOKUP_SEP)
+    for i, part in enumerate(parts):
+        try:
+            field = current._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        # обратные связи, GFK и M2M — общим путём; "<fk>_id" — сырое значение, как в lookup_field
+        if not getattr(field, "concrete", False) or field.many_to_many:
+            return None
+        if field.is_relation and part == field.attname != field.name:
+            return None
+        fields.append(field)
+        if i < len(parts) - 1:
+            if not field.is_relation:
+                return None
+            current = field.related_model
+    return fields
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    """Колонка экспорта, разобранная один раз: извлечение значения + форматирование."""
+    name: str
+    header: str
+    extract: Callable[[models.Model], Any]
+    format: Callable[[Any], Any]
+    # путь для select_related, если колонка читает FK (или идёт через FK)
+    related_path: str | None = None
+
+
+def _safe_lookup(name: Any, model_admin: admin.ModelAdmin) -> Callable[[models.Model], Any]:
+    """Общий (медленный) путь для методов ModelAdmin/модели — как в админке, через lookup_field."""
+    def extract(obj: models.Model) -> Any:
+        try:
+            _, _, value = lookup_field(name, obj, model_admin)
+        except Exception:
+            value = ""
+        return value
+
+    return extract
+
+
+def _chain_getter(attnames: list[str]) -> Callable[[models.Model], Any]:
+    if len(attnames) == 1:
+        return attrgetter(attnames[0])
+
+    def extract(obj: models.Model) -> Any:
+        value: Any = obj
+        for attname in attnames:
+            value = getattr(value, attname, None)
+            if value is None:
+                return None
+        return value
+
+    return extract
+
+
+def compile_export_columns(request: HttpRequest, model_admin: admin.ModelAdmin) -> list[ExportColumn]:
+    """
+    Разбирает list_display один раз на экспорт: для каждой колонки —
+    специализированный extractor и formatter, без lookup_field на каждую ячейку.
+    """
+    columns, headers = get_admin_columns_and_headers(request, model_admin)
+    compiled: list[ExportColumn] = []
+
+    for name, header in zip(columns, headers):
+        fields = _resolve_field_path(model_admin.model, name) if isinstance(name, str) else None
+        if fields is None:
+            compiled.append(
+                ExportColumn(
+                    name=str(name),
+                    header=header,
+                    extract=_safe_lookup(name, model_admin),
+                    format=_format_admin_value,
+                )
+            )
+            continue
+
+        relations = [f.name for f in fields if f.is_relation]
+        compiled.append(
+            ExportColumn(
+                name=name,
+                header=header,
+                extract=_chain_getter([f.name for f in fields]),
+                format=_formatter_for_field(fields[-1]),
+                related_path=LOOKUP_SEP.join(relations) if relations else None,
+            )
+        )
+
+    return compiled
+
+
+def export_queryset(request: HttpRequest, model_admin: admin.ModelAdmin, columns: list[ExportColumn]) -> QuerySet:
+    """Queryset для экспорта с select_related по всем FK-колонкам — без запроса на каждую строку."""
+    qs = model_admin.get_queryset(request).order_by("id")
+    paths = sorted({c.related_path for c in columns if c.related_path})
+    if paths:
+        qs = qs.select_related(*paths)
+    return qs
+
+
+def iter_admin_rows(
+    request: HttpRequest,
+    model_admin: admin.ModelAdmin,
+    columns: list[ExportColumn] | None = None,
+) -> Iterator[list[Any]]:
+    """
+    Строки таблицы по list_display без ограничения по количеству.
+    .iterator() читает из БД пачками (server-side cursor в Postgres),
+    поэтому в памяти одновременно не больше EXPORT_CHUNK_SIZE объектов.
+    """
+    if columns is None:
+        columns = compile_export_columns(request, model_admin)
+    cells = [(c.extract, c.format) for c in columns]
+    qs = export_queryset(request, model_admin, columns)
+    for obj in qs.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        yield [fmt(extract(obj)) for extract, fmt in cells]
+
+
+def count_admin_rows(request: HttpRequest, model_admins: list[tuple[str, admin.ModelAdmin]]) -> int:
+    return sum(model_admin.get_queryset(request).count() for _, model_admin in model_admins)
+
+
+def write_xlsx(
+    request: HttpRequest,
+    model_admins: list[tuple[str, admin.ModelAdmin]],
+    fileobj: IO[bytes],
+    on_progress: Callable[[int], None] | None = None,
+) -> None:
+    """
+    Пишет XLSX в fileobj в write-only режиме openpyxl: строки листов сразу
+    уходят во временные файлы на диске, а не копятся в памяти.
+    on_progress(rows_done) вызывается после каждой пачки строк.
+    """
+    wb = Workbook(write_only=True)
+    rows_done = 0
+    chunk = settings.EXPORT_CHUNK_SIZE
+
+    for model_label, model_admin in model_admins:
+        columns = compile_export_columns(request, model_admin)
+        headers = [c.header for c in columns]
+
+        ws = wb.create_sheet(title=model_label.split(".")[-1][:31])
+        # в write-only режиме ширины колонок задаются до первой строки
+        for i, header in enumerate(headers, start=1):
+            ws.column_dimensions[get_column_letter(i)].width = max(12, min(45, len(str(header)) + 6))
+
+        ws.append(headers)
+        for row in iter_admin_rows(request, model_admin, columns):
+            ws.append(row)
+            rows_done += 1
+            if on_progress and rows_done % chunk == 0:
+                on_progress(rows_done)
+
+    wb.save(fileobj)
+    if on_progress:
+        on_progress(rows_done)
+
+
+def xlsx_tempfile(request: HttpRequest, model_admins: list[tuple[str, admin.ModelAdmin]]) -> IO[bytes]:
+    """Готовый XLSX во временном файле (позиция — в начале), удаляется при закрытии."""
+    tmp = tempfile.TemporaryFile(suffix=".xlsx")
+    try:
+        write_xlsx(request, model_admins, tmp)
+    except BaseException:
+        tmp.close()
+        raise
+    tmp.seek(0)
+    return tmp
+
+
+def _json_value(value: Any) -> Any:
+    """Значение колонки для NDJSON: типы сохраняем, даты — ISO 8601, модели — str()."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _report(on_progress: Callable[[int], None] | None, rows_done: int, force: bool = False) -> None:
+    if on_progress and (force or rows_done % settings.EXPORT_CHUNK_SIZE == 0):
+        on_progress(rows_done)
+
+
+def iter_csv(
+    request: HttpRequest,
+    model_admins: list[tuple[str, admin.ModelAdmin]],
+    on_progress: Callable[[int], None] | None = None,
+) -> Iterator[bytes]:
+    """CSV построчно: заголовки из list_display, значения — как в XLSX."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows_done = 0
+
+    for _, model_admin in model_admins:
+        columns = compile_export_columns(request, model_admin)
+        writer.writerow([c.header for c in columns])
+        for row in iter_admin_rows(request, model_admin, columns):
+            writer.writerow(row)
+            rows_done += 1
+            _report(on_progress, rows_done)
+            if buffer.tell() >= STREAM_BUFFER_SIZE:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+    _report(on_progress, rows_done, force=True)
+
+
+def iter_ndjson(
+    request: HttpRequest,
+    model_admins: list[tuple[str, admin.ModelAdmin]],
+    on_progress: Callable[[int], None] | None = None,
+) -> Iterator[bytes]:
+    """
+    NDJSON: одна строка — один объект {"model": ..., <колонка list_display>: значение}.
+    Колонки те же, что в XLSX, но значения без локализованного форматирования.
+    """
+    parts: list[str] = []
+    size = 0
+    rows_done = 0
+
+    for model_label, model_admin in model_admins:
+        columns = compile_export_columns(request, model_admin)
+        cells = [(c.name, c.extract) for c in columns]
+        qs = export_queryset(request, model_admin, columns)
+        for obj in qs.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+            record = {"model": model_label}
+            for name, extract in cells:
+                record[name] = _json_value(extract(obj))
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            parts.append(line)
+            size += len(line)
+            rows_done += 1
+            _report(on_progress, rows_done)
+            if size >= STREAM_BUFFER_SIZE:
+                yield "".join(parts).encode("utf-8")
+                parts, size = [], 0
+
+    if parts:
+        yield "".join(parts).encode("utf-8")
+    _report(on_progress, rows_done, force=True)
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Сжимает поток на лету (формат gzip), не держа весь файл в памяти."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_export(
+    request: HttpRequest,
+    model_admins: list[tuple[str, admin.ModelAdmin]],
+    export_format: str,
+    compress: bool = False,
+    on_progress: Callable[[int], None] | None = None,
+) -> Iterator[bytes]:
+    """Потоковый экспорт в CSV/NDJSON (опционально gzip)."""
+    producers = {"csv": iter_csv, "ndjson": iter_ndjson}
+    chunks = producers[export_format](request, model_admins, on_progress)
+    return gzip_stream(chunks) if compress else chunks
+
+
+def export_filename(export_format: str, compress: bool = False, stem: str = "export") -> str:
+    extension, _ = EXPORT_FORMATS[export_format]
+    return f"{stem}.{extension}" + (".gz" if compress and export_format != "xlsx" else "")
+
+
+def export_content_type(export_format: str, compress: bool = False) -> str:
+    if compress and export_format != "xlsx":
+        return "application/gzip"
+    return EXPORT_FORMATS[export_format][1]
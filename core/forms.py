@@ -33,3 +33,33 @@ class AdminExportForm(forms.Form):
         widget=forms.CheckboxSelectMultiple,
         choices=[],
     )
+    format = forms.ChoiceField(
+        label="Формат",
+        choices=[
+            ("xlsx", "XLSX (Excel)"),
+            ("csv", "CSV (одна таблица)"),
+            ("ndjson", "NDJSON (JSON построчно)"),
+        ],
+        initial="xlsx",
+        required=False,
+        widget=forms.RadioSelect,
+    )
+    compress = forms.BooleanField(
+        label="Сжать gzip (CSV/NDJSON)",
+        required=False,
+    )
+    background = forms.BooleanField(
+        label="Выполнить в фоне (для больших таблиц)",
+        required=False,
+        help_text="Файл будет подготовлен отдельным процессом и появится в списке задач со ссылкой на скачивание.",
+    )
+
+    def clean_format(self) -> str:
+        return self.cleaned_data.get("format") or "xlsx"
+
+    def clean(self):
+        cleaned = super().clean()
+        # В CSV у каждой таблицы свои колонки — в одном файле их не смешиваем
+        if cleaned.get("format") == "csv" and len(cleaned.get("models") or []) > 1:
+            self.add_error("models", "Для CSV выберите одну таблицу (или используйте XLSX/NDJSON).")
+        return cleaned
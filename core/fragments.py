@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString, mark_safe
+
+from .models import Event
+
+CARD_TEMPLATE = "events/_event_card.html"
+CARD_KEY_PREFIX = "event_card:v1"
+
+
+def card_cache() -> BaseCache:
+    return caches[settings.EVENT_CARD_CACHE_ALIAS]
+
+
+def card_cache_key(event_id: int) -> str:
+    return f"{CARD_KEY_PREFIX}:{event_id}"
+
+
+def card_queryset() -> QuerySet:
+    """Всё, что нужно карточке, одним запросом."""
+    return Event.objects.select_related("category")
+
+
+def render_event_card(event: Event) -> SafeString:
+    return render_to_string(CARD_TEMPLATE, {"e": event})
+
+
+def get_event_cards(event_ids: list[int]) -> dict[int, SafeString]:
+    """
+    Отрендеренные карточки по id: сначала один get_many из кэша,
+    недостающие — одним запросом к БД, рендер и set_many.
+    """
+    if not event_ids:
+        return {}
+
+    cache = card_cache()
+    keys = {card_cache_key(pk): pk for pk in event_ids}
+    cards = {keys[key]: mark_safe(html) for key, html in cache.get_many(keys.keys()).items()}
+
+    missing = [pk for pk in event_ids if pk not in cards]
+    if missing:
+        fresh = {event.pk: render_event_card(event) for event in _missing_cards_queryset(missing)}
+        cache.set_many(_cache_entries(fresh), timeout=settings.EVENT_CARD_CACHE_TIMEOUT)
+        cards.update(fresh)
+    return cards
+
+
+async def aget_event_cards(event_ids: list[int]) -> dict[int, SafeString]:
+    """get_event_cards() для async-представлений: async API кэша и ORM."""
+    if not event_ids:
+        return {}
+
+    cache = card_cache()
+    keys = {card_cache_key(pk): pk for pk in event_ids}
+    cards = {keys[key]: mark_safe(html) for key, html in (await cache.aget_many(keys.keys())).items()}
+
+    missing = [pk for pk in event_ids if pk not in cards]
+    if missing:
+        fresh = {event.pk: render_event_card(event) async for event in _missing_cards_queryset(missing)}
+        await cache.aset_many(_cache_entries(fresh), timeout=settings.EVENT_CARD_CACHE_TIMEOUT)
+        cards.update(fresh)
+    return cards
+
+
+def _missing_cards_queryset(missing: list[int]) -> QuerySet:
+    # порядок задаёт вызывающий код — сортировка по Meta.ordering здесь не нужна
+    return card_queryset().filter(pk__in=missing).order_by()
+
+
+def _cache_entries(fresh: dict[int, SafeString]) -> dict[str, str]:
+    return {card_cache_key(pk): str(html) for pk, html in fresh.items()}
+
+
+def invalidate_event_cards(event_ids: Iterable[int]) -> None:
+    keys = [card_cache_key(pk) for pk in set(event_ids) if pk is not None]
+    if keys:
+        card_cache().delete_many(keys)
+
+
+def invalidate_event_cards_on_commit(event_ids: Iterable[int]) -> None:
+    # Сбрасываем сразу и ещё раз после коммита: иначе параллельный запрос
+    # может успеть закэшировать карточку со старыми (ещё не закоммиченными) данными.
+    event_ids = list(event_ids)
+    invalidate_event_cards(event_ids)
+    transaction.on_commit(lambda: invalidate_event_cards(event_ids))
+
+
+def warm_event_cards(queryset: QuerySet | None = None, *, chunk_size: int = 500) -> int:
+    """Рендерит и кладёт в кэш карточки (пачками). Возвращает число карточек."""
+    qs = card_queryset() if queryset is None else queryset
+    cache = card_cache()
+    total = 0
+    batch: dict[str, str] = {}
+    for event in qs.iterator(chunk_size=chunk_size):
+        batch[card_cache_key(event.pk)] = str(render_event_card(event))
+        if len(batch) >= chunk_size:
+            cache.set_many(batch, timeout=settings.EVENT_CARD_CACHE_TIMEOUT)
+            total += len(batch)
+            batch = {}
+    if batch:
+        cache.set_many(batch, timeout=settings.EVENT_CARD_CACHE_TIMEOUT)
+        total += len(batch)
+    return total
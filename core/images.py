@@ -0,0 +1,114 @@
+"""
+Уменьшенные копии Event.image для карточек и страницы мероприятия.
+
+При сохранении мероприятия с новой картинкой (сигнал в core.signals) из неё
+делаются копии WebP и JPEG нескольких ширин (EVENT_IMAGE_WIDTHS), они кладутся
+рядом с оригиналом в events/renditions/, а их список — в Event.image_renditions:
+
+    {"source": "events/photo.jpg", "width": 4000, "height": 3000,
+     "webp": [[320, 240, "events/renditions/photo-320w.webp"], ...],
+     "jpeg": [[320, 240, "events/renditions/photo-320w.jpeg"], ...]}
+
+Шаблонный тег {% event_image %} (core_extras) строит по ним <picture> с srcset,
+loading="lazy" и явными размерами. Для уже загруженных картинок —
+manage.py generate_thumbnails (пул процессов).
+"""
+
+from __future__ import annotations
+
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .fragments import invalidate_event_cards_on_commit
+from .models import Event
+from .thumbnails import FORMATS, render_renditions
+
+RENDITIONS_DIR = "events/renditions"
+
+
+def rendition_widths() -> tuple[int, ...]:
+    return tuple(settings.EVENT_IMAGE_WIDTHS)
+
+
+def needs_renditions(event: Event) -> bool:
+    source = event.image.name if event.image else None
+    return (event.image_renditions or {}).get("source") != source
+
+
+def read_source(name: str) -> bytes:
+    with default_storage.open(name, "rb") as fh:
+        return fh.read()
+
+
+def delete_renditions(info: dict | None) -> None:
+    for fmt in FORMATS:
+        for _w, _h, name in (info or {}).get(fmt, []):
+            default_storage.delete(name)
+
+
+def store_renditions(event_id: int, source: str, width: int, height: int, renditions) -> dict:
+    """Сохраняет файлы копий и их список в Event (UPDATE без сигналов). Возвращает список."""
+    stem = PurePosixPath(source).stem
+    info: dict = {"source": source, "width": width, "height": height, **{fmt: [] for fmt in FORMATS}}
+    for rendition in renditions:
+        name = f"{RENDITIONS_DIR}/{stem}-{rendition.width}w.{rendition.format}"
+        default_storage.delete(name)  # перегенерация: иначе хранилище добавит к имени суффикс
+        name = default_storage.save(name, ContentFile(rendition.data))
+        info[rendition.format].append([rendition.width, rendition.height, name])
+
+    previous = Event.objects.filter(pk=event_id).values_list("image_renditions", flat=True).first()
+    Event.objects.filter(pk=event_id).update(
+        image_renditions=info, image_width=width, image_height=height, updated_at=timezone.now()
+    )
+    if previous and previous.get("source") != source:
+        delete_renditions(previous)
+    invalidate_event_cards_on_commit([event_id])
+    return info
+
+
+def update_event_renditions(event: Event) -> dict:
+    """Делает копии текущей картинки мероприятия (или очищает список, если картинки нет)."""
+    if not event.image:
+        delete_renditions(event.image_renditions)
+        Event.objects.filter(pk=event.pk).update(image_renditions={}, updated_at=timezone.now())
+        event.image_renditions = {}
+        invalidate_event_cards_on_commit([event.pk])
+        return {}
+
+    width, height, renditions = render_renditions(read_source(event.image.name), rendition_widths())
+    event.image_renditions = store_renditions(event.pk, event.image.name, width, height, renditions)
+    return event.image_renditions
+
+
+def srcset(entries: list) -> str:
+    return ", ".join(f"{default_storage.url(name)} {width}w" for width, _height, name in entries)
+
+
+def image_context(event: Event) -> dict | None:
+    """Данные для <picture>: src/srcset по форматам и размеры. None — картинки нет."""
+    if not event.image:
+        return None
+    info = event.image_renditions or {}
+    jpeg = info.get("jpeg") or []
+    if info.get("source") != event.image.name or not jpeg:
+        # копии ещё не готовы — оригинал, но с размерами (если они известны)
+        return {
+            "src": event.image.url,
+            "width": event.image_width,
+            "height": event.image_height,
+            "webp_srcset": "",
+            "jpeg_srcset": "",
+        }
+    # src — средняя копия: её возьмут браузеры без поддержки srcset
+    width, height, name = jpeg[min(1, len(jpeg) - 1)]
+    return {
+        "src": default_storage.url(name),
+        "width": width,
+        "height": height,
+        "webp_srcset": srcset(info.get("webp") or []),
+        "jpeg_srcset": srcset(jpeg),
+    }
@@ -0,0 +1,96 @@
+"""
+Переключение лайка без SELECT перед записью.
+
+Опора — уникальность (user, event): сначала пытаемся удалить лайк, если удалять
+нечего — вставляем с ON CONFLICT DO NOTHING, так что двойной клик не упирается
+в IntegrityError. Счётчик Event.likes_count сдвигается в той же транзакции.
+
+- PostgreSQL: всё (удаление, вставка, счётчик) — один запрос с CTE.
+- Прочие БД (SQLite в тестах): те же шаги отдельными запросами в одной транзакции.
+
+Запросы сырые, поэтому сигналы EventLike не срабатывают — кэш карточки
+сбрасывается здесь же.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .counters import bump_event_counters
+from .fragments import invalidate_event_cards_on_commit
+from .models import Event, EventLike
+
+
+@dataclass(frozen=True)
+class LikeState:
+    liked: bool
+    likes_count: int
+
+
+_PG_TOGGLE_SQL = """
+    WITH del AS (
+        DELETE FROM {like} WHERE user_id = %(user)s AND event_id = %(event)s
+        RETURNING 1
+    ),
+    ins AS (
+        INSERT INTO {like} (user_id, event_id, created_at, updated_at)
+        SELECT %(user)s, e.id, now(), now() FROM {event} AS e
+        WHERE e.id = %(event)s AND NOT EXISTS (SELECT 1 FROM del)
+        ON CONFLICT (user_id, event_id) DO NOTHING
+        RETURNING 1
+    ),
+    upd AS (
+        UPDATE {event}
+        SET likes_count = GREATEST(likes_count + (SELECT count(*) FROM ins) - (SELECT count(*) FROM del), 0),
+            updated_at = now()
+        WHERE id = %(event)s
+        RETURNING likes_count
+    )
+    SELECT NOT EXISTS (SELECT 1 FROM del), likes_count FROM upd
+"""
+
+
+def _toggle_postgres(user_id: int, event_id: int) -> LikeState | None:
+    sql = _PG_TOGGLE_SQL.format(like=EventLike._meta.db_table, event=Event._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {"user": user_id, "event": event_id})
+        row = cursor.fetchone()
+    # Вставка, «проигравшая» параллельному клику (ON CONFLICT), тоже значит «лайк стоит»
+    return LikeState(liked=row[0], likes_count=row[1]) if row else None
+
+
+def _toggle_generic(user_id: int, event_id: int) -> LikeState | None:
+    like_table = EventLike._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {like_table} WHERE user_id = %s AND event_id = %s", [user_id, event_id])
+        delta = -cursor.rowcount
+        if not delta:
+            now = connection.ops.adapt_datetimefield_value(timezone.now())
+            cursor.execute(
+                f"""
+                INSERT INTO {like_table} (user_id, event_id, created_at, updated_at)
+                SELECT %s, id, %s, %s FROM {Event._meta.db_table} WHERE id = %s
+                ON CONFLICT (user_id, event_id) DO NOTHING
+                """,
+                [user_id, now, now, event_id],
+            )
+            delta = cursor.rowcount
+        bump_event_counters(event_id, likes=delta)
+        likes_count = Event.objects.filter(pk=event_id).values_list("likes_count", flat=True).first()
+    if likes_count is None:
+        return None
+    return LikeState(liked=delta >= 0, likes_count=likes_count)
+
+
+def toggle_event_like(user_id: int, event_id: int) -> LikeState | None:
+    """Ставит или снимает лайк. None — мероприятия нет."""
+    if connection.vendor == "postgresql":
+        state = _toggle_postgres(user_id, event_id)
+    else:
+        state = _toggle_generic(user_id, event_id)
+    if state is not None:
+        invalidate_event_cards_on_commit([event_id])
+    return state
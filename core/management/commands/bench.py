@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bench import (
+    BENCH_VIEWS,
+    CONNECTION_MODES,
+    bench_meta,
+    build_scenarios,
+    compare_results,
+    connection_mode,
+    connection_unsupported,
+    run_scenario,
+)
+from core.fragments import card_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет горячие страницы через тестовый клиент: p50/p95/p99 задержки, "
+        "число SQL-запросов и размер ответа. Запускать на засеянной БД (seed --users ...)."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--views",
+            default=",".join(BENCH_VIEWS),
+            help=f"Сценарии через запятую (по умолчанию все: {', '.join(BENCH_VIEWS)}).",
+        )
+        parser.add_argument("--iterations", type=int, default=20, help="Замеров на сценарий (по умолчанию 20).")
+        parser.add_argument("--warmup", type=int, default=2, help="Прогревочных запросов без учёта (по умолчанию 2).")
+        parser.add_argument(
+            "--cold-cache",
+            action="store_true",
+            help="Сбрасывать кэш карточек перед каждым запросом (худший случай).",
+        )
+        parser.add_argument(
+            "--connections",
+            help=(
+                f"Режимы соединения с БД через запятую ({', '.join(CONNECTION_MODES)}): каждый сценарий "
+                "замеряется в каждом режиме, соединение закрывается / возвращается в пул после запроса."
+            ),
+        )
+        parser.add_argument("--json", dest="json_path", help="Записать результаты в JSON-файл.")
+        parser.add_argument("--compare", help="JSON предыдущего запуска: показать изменения.")
+
+    def handle(self, *args, **options) -> None:
+        if options["iterations"] < 1:
+            raise CommandError("--iterations должно быть не меньше 1.")
+        views = tuple(v.strip() for v in options["views"].split(",") if v.strip())
+        scenarios, skipped = build_scenarios(views)
+        for reason in skipped:
+            self.stdout.write(self.style.WARNING(f"Пропущено: {reason}"))
+
+        modes: list[str | None] = [None]
+        if options["connections"]:
+            modes = []
+            for mode in (m.strip() for m in options["connections"].split(",") if m.strip()):
+                if reason := connection_unsupported(mode):
+                    self.stdout.write(self.style.WARNING(f"Пропущено: {reason}"))
+                else:
+                    modes.append(mode)
+
+        before_each = card_cache().clear if options["cold_cache"] else None
+        results = {}
+        self.stdout.write(f"{'сценарий':<30} {'p50 мс':>9} {'p95 мс':>9} {'p99 мс':>9} {'SQL':>5} {'байт':>10}")
+        for mode in modes:
+            with connection_mode(mode) if mode else nullcontext():
+                for scenario in scenarios:
+                    name = f"{scenario.name}[{mode}]" if mode else scenario.name
+                    try:
+                        result = run_scenario(
+                            scenario,
+                            iterations=options["iterations"],
+                            warmup=options["warmup"],
+                            before_each=before_each,
+                            recycle_connections=mode is not None,
+                        )
+                    except RuntimeError as exc:
+                        raise CommandError(str(exc)) from exc
+                    summary = results[name] = result.summary()
+                    self.stdout.write(
+                        f"{name:<30} {summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+                        f"{summary['p99_ms']:>9.1f} {summary['queries']:>5} {summary['bytes']:>10}"
+                    )
+
+        report = {
+            "meta": {
+                **bench_meta(),
+                "iterations": options["iterations"],
+                "cold_cache": options["cold_cache"],
+                "connections": [m for m in modes if m],
+            },
+            "results": results,
+        }
+        if options["json_path"]:
+            Path(options["json_path"]).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Результаты записаны в {options['json_path']}"))
+
+        if options["compare"]:
+            try:
+                old = json.loads(Path(options["compare"]).read_text(encoding="utf-8"))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Не удалось прочитать {options['compare']}: {exc}") from exc
+            self.stdout.write(f"\nСравнение с {old.get('meta', {}).get('revision') or options['compare']}:")
+            for name, metric, before, after, change in compare_results(old, report):
+                delta = f"{change:+.1f}%" if change is not None else "—"
+                self.stdout.write(f"{name:<30} {metric:<8} {before:>10} -> {after:<10} {delta}")
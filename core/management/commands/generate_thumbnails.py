@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.images import needs_renditions, read_source, rendition_widths, store_renditions
+from core.models import Event
+from core.thumbnails import render_renditions
+
+
+class Command(BaseCommand):
+    help = (
+        "Делает уменьшенные копии (WebP/JPEG) для уже загруженных картинок мероприятий. "
+        "Ресайз — в пуле процессов, чтение/запись файлов и БД — в основном процессе."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Процессов для ресайза (по умолчанию — число ядер; 1 — без пула).",
+        )
+        parser.add_argument("--force", action="store_true", help="Пересоздать копии и для актуальных картинок.")
+
+    def handle(self, *args, **options) -> None:
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers должно быть не меньше 1.")
+
+        events = (
+            Event.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .only("pk", "image", "image_renditions")
+            .order_by("pk")
+        )
+        todo = [(e.pk, e.image.name) for e in events.iterator() if options["force"] or needs_renditions(e)]
+        if not todo:
+            self.stdout.write(self.style.SUCCESS("Все копии актуальны."))
+            return
+
+        widths = rendition_widths()
+        started = time.monotonic()
+        done = failed = 0
+
+        def finish(event_id: int, source: str, result) -> None:
+            nonlocal done
+            width, height, renditions = result
+            store_renditions(event_id, source, width, height, renditions)
+            done += 1
+            if done % 50 == 0:
+                self.stdout.write(f"{done}/{len(todo)}")
+
+        def fail(event_id: int, exc: Exception) -> None:
+            nonlocal failed
+            failed += 1
+            self.stderr.write(f"#{event_id}: {exc}")
+
+        if workers == 1:
+            for event_id, source in todo:
+                try:
+                    finish(event_id, source, render_renditions(read_source(source), widths))
+                except Exception as exc:
+                    fail(event_id, exc)
+        else:
+            # spawn: дочерние процессы не наследуют соединения с БД; core.thumbnails не требует Django
+            context = multiprocessing.get_context("spawn")
+            pending: dict[Future, tuple[int, str]] = {}
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                queue = iter(todo)
+                while True:
+                    # Не больше 2 задач на процесс в полёте: исходники держим в памяти только для них
+                    while len(pending) < workers * 2:
+                        item = next(queue, None)
+                        if item is None:
+                            break
+                        event_id, source = item
+                        try:
+                            data = read_source(source)
+                        except OSError as exc:
+                            fail(event_id, exc)
+                            continue
+                        pending[pool.submit(render_renditions, data, widths)] = item
+                    if not pending:
+                        break
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        event_id, source = pending.pop(future)
+                        try:
+                            finish(event_id, source, future.result())
+                        except Exception as exc:
+                            fail(event_id, exc)
+
+        elapsed = time.monotonic() - started
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(f"Готово: {done} картинок за {elapsed:.1f} с, ошибок: {failed}."))
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.counters import find_counter_drift, rebuild_event_counters
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает (или проверяет) денормализованные счётчики лайков, заявок и занятых мест у мероприятий."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только проверить расхождения, ничего не меняя (код выхода 1, если они есть).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Сколько расхождений показать в --check (по умолчанию 20).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["check"]:
+            drift = find_counter_drift()
+            total = drift.count()
+            for event in drift[: options["limit"]]:
+                self.stdout.write(
+                    f"#{event.pk} {event.title}: "
+                    f"likes {event.likes_count} != {event.actual_likes_count}, "
+                    f"applications {event.applications_count} != {event.actual_applications_count}, "
+                    f"seats {event.seats_taken} != {event.actual_seats_taken}"
+                )
+            if total:
+                raise CommandError(f"Расхождения счётчиков: {total} мероприятий.")
+            self.stdout.write(self.style.SUCCESS("Счётчики в порядке."))
+            return
+
+        updated = rebuild_event_counters()
+        self.stdout.write(self.style.SUCCESS(f"Счётчики пересчитаны: {updated} мероприятий."))
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.export_jobs import claim_next_job, run_export_job
+from core.slowsql import capture_slow_queries
+
+
+class Command(BaseCommand):
+    help = "Воркер фоновых выгрузок из админки: берёт задачи ExportJob из очереди и выполняет их."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить все задачи, которые уже в очереди, и выйти.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Пауза между опросами пустой очереди, секунд (по умолчанию 2).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["sleep"])
+                continue
+
+            self.stdout.write(f"Export #{job.pk}: {', '.join(job.model_labels)}")
+            with capture_slow_queries(f"export job #{job.pk}"):
+                run_export_job(job)
+            style = self.style.SUCCESS if job.status == job.Status.DONE else self.style.ERROR
+            self.stdout.write(style(f"Export #{job.pk}: {job.get_status_display()} ({job.rows_done} строк)"))
@@ -1,20 +1,87 @@
 from __future__ import annotations
 
+import time
 from datetime import timedelta
 
 from django.contrib.auth.models import User
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils import timezone
 
+from core.counters import rebuild_event_counters
 from core.models import Category, Event, VolunteerApplication, EventLike
+from core.synthetic import SyntheticSeeder
 
 
 class Command(BaseCommand):
-    help = "Заполняет БД демо-данными (категории, мероприятия, пользователи, лайки, заявки)."
+    help = (
+        "Заполняет БД демо-данными (категории, мероприятия, пользователи, лайки, заявки). "
+        "С --users/--events/--likes/--applications — синтетические данные большого объёма."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--users", type=int, default=0, help="Сколько пользователей создать (режим объёма).")
+        parser.add_argument("--events", type=int, default=0, help="Сколько мероприятий создать.")
+        parser.add_argument("--likes", type=int, default=0, help="Сколько лайков создать (не больше users × events).")
+        parser.add_argument("--applications", type=int, default=0, help="Сколько заявок создать.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Размер пачки bulk_create (по умолчанию 5000).")
+        parser.add_argument("--seed", type=int, default=42, help="Зерно ГСЧ: одинаковое зерно — одинаковые данные.")
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Показатель Ципфа для популярности мероприятий (0 — равномерно, по умолчанию 1.1).",
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options) -> None:
+        if any(options[key] for key in ("users", "events", "likes", "applications")):
+            self._seed_scale(options)
+        else:
+            self._seed_demo()
+
+    def _seed_scale(self, options) -> None:
+        users, events = options["users"], options["events"]
+        for key in ("users", "events", "likes", "applications", "batch_size"):
+            if options[key] < 0 or (key == "batch_size" and options[key] == 0):
+                raise CommandError(f"--{key.replace('_', '-')}: ожидается положительное число.")
+        for key in ("likes", "applications"):
+            if options[key] > users * events:
+                raise CommandError(f"--{key}={options[key]} больше, чем users × events = {users * events}.")
+
+        last_report: dict[str, float] = {}
+
+        def report(label: str, done: int, total: int, elapsed: float) -> None:
+            # Не чаще раза в секунду, но последнюю пачку — всегда
+            now = time.monotonic()
+            if done < total and now - last_report.get(label, 0) < 1:
+                return
+            last_report[label] = now
+            rate = done / elapsed if elapsed else 0
+            percent = done * 100 // total if total else 100
+            self.stdout.write(f"{label}: {done}/{total} ({percent}%), {rate:,.0f} строк/с")
+
+        seeder = SyntheticSeeder(
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            skew=options["skew"],
+            on_progress=report,
+        )
+        started = time.monotonic()
+        result = seeder.run(
+            users=users,
+            events=events,
+            likes=options["likes"],
+            applications=options["applications"],
+        )
+        elapsed = time.monotonic() - started
+        rows = sum(result.values())
+        summary = ", ".join(f"{key}={value}" for key, value in result.items())
+        self.stdout.write(
+            self.style.SUCCESS(f"Готово за {elapsed:.1f} с: {summary} ({rows / elapsed if elapsed else 0:,.0f} строк/с).")
+        )
+
+    @transaction.atomic
+    def _seed_demo(self) -> None:
         self.stdout.write(self.style.WARNING("Seeding demo data..."))
 
         # 1) Categories
@@ -148,5 +215,8 @@ class Command(BaseCommand):
             defaults={"motivation": "Есть опыт волонтёрства, готов помогать людям.", "status": VolunteerApplication.Status.APPROVED},
         )
 
+        # Лайки/заявки созданы напрямую через ORM — выравниваем денормализованные счётчики
+        rebuild_event_counters(Event.objects.filter(pk__in=[ev.pk for ev in created_events]))
+
         self.stdout.write(self.style.SUCCESS("Done! Demo data created/updated."))
         self.stdout.write(self.style.WARNING("Demo users: admin/admin12345, user1/user12345, user2/user12345"))
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.fragments import card_queryset, warm_event_cards
+
+
+class Command(BaseCommand):
+    help = "Прогревает кэш отрендеренных карточек мероприятий (запускать после деплоя)."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Прогреть только первые N карточек в порядке списка (по умолчанию — все).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500, help="Размер пачки (по умолчанию 500).")
+
+    def handle(self, *args, **options) -> None:
+        qs = card_queryset().order_by("-event_date", "-pk")
+        if options["limit"]:
+            qs = qs[: options["limit"]]
+
+        started = time.perf_counter()
+        total = warm_event_cards(qs, chunk_size=options["chunk_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Прогрето карточек: {total} за {elapsed:.1f} с."))
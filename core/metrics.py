@@ -0,0 +1,362 @@
+"""
+Метрики запросов по представлениям в текстовом формате Prometheus.
+
+MetricsMiddleware на каждый запрос пишет (метка view — имя URL, например
+"event_list" или "admin:export_xlsx"):
+
+- volunteer_http_requests_total{view, method, status}
+- volunteer_http_request_duration_seconds{view, method} — гистограмма
+- volunteer_http_response_size_bytes{view} — гистограмма (для потоковых ответов —
+  когда ответ дочитан до конца)
+- volunteer_db_queries_total{view} и volunteer_db_query_duration_seconds_total{view}
+
+Накопление — в памяти процесса под блокировкой (дёшево). Раз в
+METRICS_FLUSH_INTERVAL секунд процесс сбрасывает свой снимок в
+METRICS_DIR/metrics-<pid>.json (атомарный rename); по умолчанию каталог в
+/dev/shm, то есть в общей памяти. Эндпоинт /metrics/ суммирует снимки всех
+процессов, так что при нескольких воркерах gunicorn видно общую картину.
+Снимки завершившихся процессов при сборе сливаются в один metrics-dead.json:
+каталог не растёт после перезапусков воркеров, а суммы (счётчики Prometheus)
+не уменьшаются.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+
+from .async_support import aexecute_wrapper
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+COUNTERS = {
+    "volunteer_http_requests_total": "Запросы по представлению, методу и статусу.",
+    "volunteer_db_queries_total": "SQL-запросы, выполненные при обработке запросов.",
+    "volunteer_db_query_duration_seconds_total": "Суммарное время SQL-запросов, секунды.",
+}
+HISTOGRAMS = {
+    "volunteer_http_request_duration_seconds": ("Время обработки запроса, секунды.", DURATION_BUCKETS),
+    "volunteer_http_response_size_bytes": ("Размер ответа, байты.", SIZE_BUCKETS),
+}
+
+UNRESOLVED_VIEW = "<unresolved>"
+
+
+def _labels_key(labels: dict[str, str]) -> str:
+    return json.dumps(labels, sort_keys=True, ensure_ascii=False)
+
+
+DEAD_SNAPSHOT = "metrics-dead.json"
+_SNAPSHOT_RE = re.compile(r"^metrics-(\d+)\.json$")
+
+try:
+    import fcntl
+except ImportError:  # не POSIX: снимки мёртвых процессов не сливаются
+    fcntl = None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # процесс есть, но чужой
+    return True
+
+
+def _write_json(path: Path, data: dict) -> None:
+    """Атомарная запись: читатели видят либо старый файл, либо новый целиком."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".metrics-", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _merge(into: dict, data: dict) -> None:
+    for name, series in data.get("counters", {}).items():
+        target = into["counters"].setdefault(name, {})
+        for key, value in series.items():
+            target[key] = target.get(key, 0) + value
+    for name, series in data.get("histograms", {}).items():
+        target = into["histograms"].setdefault(name, {})
+        for key, hist in series.items():
+            existing = target.get(key)
+            if existing is None:
+                target[key] = hist
+                continue
+            existing["buckets"] = [a + b for a, b in zip(existing["buckets"], hist["buckets"])]
+            existing["sum"] += hist["sum"]
+            existing["count"] += hist["count"]
+
+
+class MetricsRegistry:
+    """Метрики одного процесса + чтение снимков остальных из общего каталога."""
+
+    def __init__(self, directory: str | Path, flush_interval: float = 5.0) -> None:
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._counters: dict[str, dict[str, float]] = {}
+        self._histograms: dict[str, dict[str, dict]] = {}
+        self._last_flush = time.monotonic()
+
+    def _check_fork(self) -> None:
+        # После fork (gunicorn --preload) дочерний процесс не должен повторно отдавать данные родителя
+        if os.getpid() != self._pid:
+            self._reset()
+
+    def inc(self, name: str, labels: dict[str, str], value: float = 1) -> None:
+        key = _labels_key(labels)
+        with self._lock:
+            self._check_fork()
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, labels: dict[str, str], value: float) -> None:
+        buckets = HISTOGRAMS[name][1]
+        key = _labels_key(labels)
+        with self._lock:
+            self._check_fork()
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {"buckets": [0] * (len(buckets) + 1), "sum": 0.0, "count": 0}
+            # последняя корзина — +Inf; хранятся некумулятивные счётчики
+            hist["buckets"][bisect_left(buckets, value)] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._check_fork()
+            return json.loads(json.dumps({"counters": self._counters, "histograms": self._histograms}))
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"metrics-{os.getpid()}.json"
+
+    def flush(self) -> None:
+        data = self.snapshot()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _write_json(self.path, data)
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self) -> None:
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            try:
+                self.flush()
+            except OSError:
+                # Метрики не должны ронять запросы; следующая попытка — через интервал
+                self._last_flush = time.monotonic()
+
+    @contextmanager
+    def _directory_lock(self):
+        with open(self.directory / ".fold.lock", "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def fold_dead_snapshots(self) -> int:
+        """Сливает снимки завершившихся процессов в DEAD_SNAPSHOT. Возвращает число слитых."""
+        if fcntl is None:
+            return 0
+        dead = []
+        for path in self.directory.glob("metrics-*.json"):
+            match = _SNAPSHOT_RE.match(path.name)
+            if match and int(match.group(1)) != os.getpid() and not _pid_alive(int(match.group(1))):
+                dead.append(path)
+        if not dead:
+            return 0
+
+        dead_path = self.directory / DEAD_SNAPSHOT
+        folded = 0
+        # Под блокировкой каталога: два процесса, собирающих метрики, не сольют один снимок дважды
+        with self._directory_lock():
+            try:
+                merged = json.loads(dead_path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                merged = {"counters": {}, "histograms": {}}
+            merged.setdefault("counters", {})
+            merged.setdefault("histograms", {})
+            for path in dead:
+                try:
+                    _merge(merged, json.loads(path.read_text(encoding="utf-8")))
+                except FileNotFoundError:
+                    continue  # уже слит другим процессом
+                except ValueError:
+                    pass  # битый снимок не сохранить — просто убираем
+                folded += 1
+            _write_json(dead_path, merged)
+            for path in dead:
+                path.unlink(missing_ok=True)
+        return folded
+
+    def collect(self) -> dict:
+        """Сумма снимков всех процессов (текущий — в актуальном состоянии)."""
+        self.flush()
+        try:
+            self.fold_dead_snapshots()
+        except OSError:
+            pass  # не удалось — снимки просто прочитаются по отдельности
+        merged: dict = {"counters": {}, "histograms": {}}
+        for path in sorted(self.directory.glob("metrics-*.json")):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            _merge(merged, data)
+        return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render_prometheus(data: dict) -> str:
+    lines: list[str] = []
+    for name, help_text in COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for key, value in sorted(data["counters"].get(name, {}).items()):
+            lines.append(f"{name}{_format_labels(json.loads(key))} {_format_number(value)}")
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for key, hist in sorted(data["histograms"].get(name, {}).items()):
+            labels = json.loads(key)
+            cumulative = 0
+            for bound, count in zip([*buckets, "+Inf"], hist["buckets"]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_number(bound)
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': le})} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(hist['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+_registry: MetricsRegistry | None = None
+
+
+def get_registry() -> MetricsRegistry:
+    global _registry
+    directory = Path(settings.METRICS_DIR)
+    if _registry is None or _registry.directory != directory:
+        _registry = MetricsRegistry(directory, settings.METRICS_FLUSH_INTERVAL)
+    return _registry
+
+
+def _view_label(request: HttpRequest) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else UNRESOLVED_VIEW
+
+
+class _QueryTimer:
+    """execute_wrapper: число и суммарное время SQL-запросов."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        timer = _QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        return self._record(request, response, timer, started)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        timer = _QueryTimer()
+        started = time.perf_counter()
+        async with aexecute_wrapper(timer):
+            response = await self.get_response(request)
+        return self._record(request, response, timer, started)
+
+    def _record(self, request: HttpRequest, response: HttpResponse, timer: _QueryTimer, started: float) -> HttpResponse:
+        elapsed = time.perf_counter() - started
+        registry = get_registry()
+        view = _view_label(request)
+        registry.inc(
+            "volunteer_http_requests_total",
+            {"view": view, "method": request.method, "status": str(response.status_code)},
+        )
+        registry.observe("volunteer_http_request_duration_seconds", {"view": view, "method": request.method}, elapsed)
+        if response.streaming and not getattr(response, "is_async", False):
+            # Потоковый ответ (экспорт) читает БД уже после возврата из middleware —
+            # запросы, время и размер досчитываются, когда поток дочитан
+            response.streaming_content = self._count_stream(registry, view, response.streaming_content, timer)
+        else:
+            self._record_db(registry, view, timer)
+            if not response.streaming:
+                registry.observe("volunteer_http_response_size_bytes", {"view": view}, len(response.content))
+        registry.maybe_flush()
+        return response
+
+    @staticmethod
+    def _record_db(registry: MetricsRegistry, view: str, timer: _QueryTimer) -> None:
+        registry.inc("volunteer_db_queries_total", {"view": view}, timer.count)
+        registry.inc("volunteer_db_query_duration_seconds_total", {"view": view}, timer.seconds)
+
+    @classmethod
+    def _count_stream(cls, registry: MetricsRegistry, view: str, chunks, timer: _QueryTimer):
+        size = 0
+        with connection.execute_wrapper(timer):
+            for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+        cls._record_db(registry, view, timer)
+        registry.observe("volunteer_http_response_size_bytes", {"view": view}, size)
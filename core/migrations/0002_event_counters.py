@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:01
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Event = apps.get_model("core", "Event")
+    EventLike = apps.get_model("core", "EventLike")
+    VolunteerApplication = apps.get_model("core", "VolunteerApplication")
+
+    def actual(model):
+        counted = (
+            model.objects.filter(event=OuterRef("pk"))
+            .order_by()
+            .values("event")
+            .annotate(n=Count("pk"))
+            .values("n")
+        )
+        return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+    Event.objects.update(likes_count=actual(EventLike), applications_count=actual(VolunteerApplication))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Заявок'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Лайков'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
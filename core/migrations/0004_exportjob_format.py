@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='compress',
+            field=models.BooleanField(default=False, verbose_name='gzip'),
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='export_format',
+            field=models.CharField(default='xlsx', max_length=10, verbose_name='Формат'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import migrations
+
+# Схема полнотекстового поиска зависит от СУБД (см. core/search.py),
+# поэтому создаётся вручную, а не через поле модели.
+# Конфигурация — та же, что у запросов (settings.SEARCH_CONFIG): иначе векторы
+# и to_tsquery разойдутся. После смены SEARCH_CONFIG — manage.py rebuild_search_index.
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.execute("ALTER TABLE core_event ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS core_event_search_gin ON core_event USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            """
+            UPDATE core_event AS e SET search_vector =
+                setweight(to_tsvector(%(config)s::regconfig, coalesce(e.title, '')), 'A') ||
+                setweight(to_tsvector(%(config)s::regconfig, coalesce(c.name, '')), 'B') ||
+                setweight(to_tsvector(%(config)s::regconfig, coalesce(e.location, '')), 'B') ||
+                setweight(to_tsvector(%(config)s::regconfig, coalesce(e.description, '')), 'C')
+            FROM core_category AS c
+            WHERE c.id = e.category_id
+            """,
+            {"config": settings.SEARCH_CONFIG},
+        )
+    elif connection.vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS core_event_fts "
+            "USING fts5(title, description, location, category, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            """
+            INSERT INTO core_event_fts (rowid, title, description, location, category)
+            SELECT e.id, e.title, e.description, e.location, c.name
+            FROM core_event AS e JOIN core_category AS c ON c.id = e.category_id
+            """
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS core_event_search_gin")
+        schema_editor.execute("ALTER TABLE core_event DROP COLUMN IF EXISTS search_vector")
+    elif connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS core_event_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_exportjob_format'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_event_image_renditions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='volunteerapplication',
+            name='decided_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата решения'),
+        ),
+        migrations.AddField(
+            model_name='volunteerapplication',
+            name='decided_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='decided_applications', to=settings.AUTH_USER_MODEL, verbose_name='Решение принял'),
+        ),
+    ]
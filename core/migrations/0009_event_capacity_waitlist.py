@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:52
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_seats(apps, schema_editor):
+    Event = apps.get_model("core", "Event")
+    VolunteerApplication = apps.get_model("core", "VolunteerApplication")
+    counted = (
+        VolunteerApplication.objects.filter(event=OuterRef("pk"), status__in=("new", "approved"))
+        .order_by()
+        .values("event")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    Event.objects.update(seats_taken=Coalesce(Subquery(counted, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_application_decision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Мест'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Мест занято'),
+        ),
+        migrations.AlterField(
+            model_name='volunteerapplication',
+            name='status',
+            field=models.CharField(choices=[('new', 'Новая'), ('approved', 'Одобрена'), ('rejected', 'Отклонена'), ('waitlisted', 'В листе ожидания'), ('withdrawn', 'Отозвана')], default='new', max_length=20, verbose_name='Статус'),
+        ),
+        migrations.RunPython(backfill_seats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:16
+
+import shutil
+from pathlib import Path
+
+import core.storage
+from django.conf import settings
+from django.db import migrations, models
+
+
+def move_exports(apps, schema_editor):
+    """Уже готовые выгрузки переносим из публичного MEDIA_ROOT в EXPORT_ROOT."""
+    ExportJob = apps.get_model("core", "ExportJob")
+    for name in ExportJob.objects.exclude(file="").values_list("file", flat=True):
+        source = Path(settings.MEDIA_ROOT) / name
+        if source.is_file():
+            target = Path(settings.EXPORT_ROOT) / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(source, target)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_event_capacity_waitlist'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=models.FileField(blank=True, storage=core.storage.export_storage, upload_to='exports/', verbose_name='Файл'),
+        ),
+        migrations.RunPython(move_exports, migrations.RunPython.noop),
+    ]
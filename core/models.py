@@ -3,6 +3,8 @@ from __future__ import annotations
 from django.conf import settings
 from django.db import models
 
+from .storage import export_storage
+
 class TimeStampedModel(models.Model):
     """Абстрактная базовая модель: общие поля created_at/updated_at."""
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
@@ -30,11 +32,30 @@ class Event(TimeStampedModel):
     event_date = models.DateTimeField(verbose_name="Дата и время")
     location = models.CharField(max_length=200, verbose_name="Место")
     image = models.ImageField(upload_to="events/", blank=True, null=True, verbose_name="Изображение")
+    # Размеры оригинала и уменьшенные копии WebP/JPEG — заполняет core.images
+    # (не width_field/height_field: те читают файл при каждой загрузке модели без размеров)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Ширина изображения")
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Высота изображения")
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Копии изображения")
+
+    # Денормализованные счётчики: обновляются атомарно (F-выражения) в core.counters,
+    # пересчитываются командой `manage.py recount_counters`.
+    likes_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Лайков")
+    applications_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Заявок")
+
+    # Сколько волонтёров нужно (пусто — без ограничений) и сколько заявок занимают место
+    # (VolunteerApplication.SEAT_STATUSES). seats_taken меняется только в core.seats.
+    capacity = models.PositiveIntegerField(null=True, blank=True, verbose_name="Мест")
+    seats_taken = models.PositiveIntegerField(default=0, editable=False, verbose_name="Мест занято")
 
     class Meta:
         verbose_name = "Мероприятие"
         verbose_name_plural = "Мероприятия"
         ordering = ["-event_date"]
+        indexes = [
+            # список/keyset-пагинация: ORDER BY event_date DESC, id DESC
+            models.Index(fields=["-event_date", "-id"], name="event_date_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -45,16 +66,38 @@ class VolunteerApplication(TimeStampedModel):
         NEW = "new", "Новая"
         APPROVED = "approved", "Одобрена"
         REJECTED = "rejected", "Отклонена"
+        WAITLISTED = "waitlisted", "В листе ожидания"
+        WITHDRAWN = "withdrawn", "Отозвана"
+
+    # Заявки в этих статусах занимают место на мероприятии (Event.seats_taken)
+    SEAT_STATUSES = (Status.NEW, Status.APPROVED)
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="volunteer_applications")
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="applications")
     motivation = models.TextField(verbose_name="Комментарий / мотивация")
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.NEW, verbose_name="Статус")
+    # Кто и когда последним менял статус (админка, core.applications)
+    decided_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="decided_applications",
+        verbose_name="Решение принял",
+    )
+    decided_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Дата решения")
 
     class Meta:
         verbose_name = "Заявка волонтёра"
         verbose_name_plural = "Заявки волонтёров"
         unique_together = ("user", "event")  # один пользователь — одна заявка на мероприятие
+        indexes = [
+            # личный кабинет: заявки пользователя, новые сверху
+            models.Index(fields=["user", "-created_at"], name="application_user_created_idx"),
+            # админка: фильтр по статусу и мероприятию
+            models.Index(fields=["status", "event"], name="application_status_event_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user} -> {self.event} ({self.status})"
@@ -68,6 +111,56 @@ class EventLike(TimeStampedModel):
         verbose_name = "Лайк"
         verbose_name_plural = "Лайки"
         unique_together = ("user", "event")
+        indexes = [
+            # личный кабинет: лайки пользователя, новые сверху
+            models.Index(fields=["user", "-created_at"], name="like_user_created_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user} likes {self.event}"
+
+
+class ExportJob(TimeStampedModel):
+    """Фоновая выгрузка из админки: ставится в очередь, выполняется командой run_export_jobs."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "В очереди"
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Готово"
+        FAILED = "failed", "Ошибка"
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="export_jobs",
+        verbose_name="Автор",
+    )
+    model_labels = models.JSONField(default=list, verbose_name="Таблицы (модели)")
+    export_format = models.CharField(max_length=10, default="xlsx", verbose_name="Формат")
+    compress = models.BooleanField(default=False, verbose_name="gzip")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED, verbose_name="Статус")
+    rows_total = models.PositiveBigIntegerField(default=0, verbose_name="Всего строк")
+    rows_done = models.PositiveBigIntegerField(default=0, verbose_name="Выгружено строк")
+    file = models.FileField(upload_to="exports/", storage=export_storage, blank=True, verbose_name="Файл")
+    error = models.TextField(blank=True, verbose_name="Ошибка")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Начато")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершено")
+
+    class Meta:
+        verbose_name = "Задача экспорта"
+        verbose_name_plural = "Задачи экспорта"
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self) -> str:
+        return f"Экспорт #{self.pk} ({self.status})"
+
+    @property
+    def progress(self) -> int:
+        """Прогресс в процентах (0..100)."""
+        if self.status == self.Status.DONE:
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(100, int(self.rows_done * 100 / self.rows_total))
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import BigIntegerField, Q, QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Позиция в выдаче: значение ключа сортировки + pk (для однозначности при равных датах)."""
+    value: datetime
+    pk: int
+
+    def encode(self) -> str:
+        raw = f"{self.value.isoformat()}|{self.pk}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str | None) -> Cursor | None:
+        """Некорректный/подделанный курсор не ошибка — просто начинаем с первой страницы."""
+        if not token:
+            return None
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+            value, pk = raw.rsplit("|", 1)
+            cursor = cls(value=datetime.fromisoformat(value), pk=int(pk))
+        except (ValueError, UnicodeError, binascii.Error):
+            return None
+        # Сами мы такие не выдаём: pk вне bigint роняет запрос (DataError в PostgreSQL),
+        # наивная дата при USE_TZ — RuntimeWarning в фильтре
+        if abs(cursor.pk) > BigIntegerField.MAX_BIGINT or timezone.is_naive(cursor.value) == settings.USE_TZ:
+            return None
+        return cursor
+
+
+@dataclass
+class KeysetPage:
+    items: list[Any]
+    next_cursor: str | None
+    prev_cursor: str | None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class KeysetPaginator:
+    """
+    Keyset (cursor) пагинация по убыванию (key, pk).
+
+    В отличие от OFFSET, стоимость любой страницы одинакова: БД сразу
+    находит позицию по индексу и читает только page_size + 1 строк.
+    COUNT(*) не выполняется вовсе.
+    """
+
+    def __init__(self, queryset: QuerySet, *, key: str, page_size: int):
+        self.queryset = queryset
+        self.key = key
+        self.page_size = max(1, int(page_size))
+
+    def _cursor_for(self, obj: Any) -> str:
+        if isinstance(obj, dict):  # queryset.values(): ключ и pk должны быть среди колонок
+            return Cursor(value=obj[self.key], pk=obj[self.queryset.model._meta.pk.attname]).encode()
+        return Cursor(value=getattr(obj, self.key), pk=obj.pk).encode()
+
+    def _rows_query(self, after: str | None, before: str | None) -> tuple[QuerySet, Cursor | None, Cursor | None]:
+        key = self.key
+        after_cursor = Cursor.decode(after)
+        before_cursor = None if after_cursor else Cursor.decode(before)
+
+        if before_cursor is not None:
+            # Идём «назад»: берём строки выше курсора в прямом порядке и разворачиваем.
+            qs = self.queryset.filter(
+                Q(**{f"{key}__gt": before_cursor.value})
+                | Q(**{key: before_cursor.value, "pk__gt": before_cursor.pk})
+            ).order_by(key, "pk")
+        else:
+            qs = self.queryset
+            if after_cursor is not None:
+                qs = qs.filter(
+                    Q(**{f"{key}__lt": after_cursor.value})
+                    | Q(**{key: after_cursor.value, "pk__lt": after_cursor.pk})
+                )
+            qs = qs.order_by(f"-{key}", "-pk")
+        return qs[: self.page_size + 1], after_cursor, before_cursor
+
+    def _build_page(self, rows: list, after_cursor: Cursor | None, before_cursor: Cursor | None) -> KeysetPage:
+        size = self.page_size
+        if before_cursor is not None:
+            has_prev = len(rows) > size
+            items = list(reversed(rows[:size]))
+            has_next = True
+        else:
+            has_next = len(rows) > size
+            items = rows[:size]
+            has_prev = after_cursor is not None
+
+        if not items:
+            return KeysetPage(items=[], next_cursor=None, prev_cursor=None)
+
+        return KeysetPage(
+            items=items,
+            next_cursor=self._cursor_for(items[-1]) if has_next else None,
+            prev_cursor=self._cursor_for(items[0]) if has_prev else None,
+        )
+
+    def page(self, *, after: str | None = None, before: str | None = None) -> KeysetPage:
+        qs, after_cursor, before_cursor = self._rows_query(after, before)
+        return self._build_page(list(qs), after_cursor, before_cursor)
+
+    async def apage(self, *, after: str | None = None, before: str | None = None) -> KeysetPage:
+        """page() для async-представлений (async ORM)."""
+        qs, after_cursor, before_cursor = self._rows_query(after, before)
+        return self._build_page([row async for row in qs], after_cursor, before_cursor)
+
+
+def estimated_row_count(queryset: QuerySet) -> int | None:
+    """
+    Число строк таблицы по статистике БД, без COUNT(*). None — оценки нет:
+    в запросе есть фильтры, таблицу ещё не анализировали или БД не умеет.
+
+    - PostgreSQL: pg_class.reltuples (обновляют autovacuum/ANALYZE).
+    - SQLite: sqlite_stat1 (только после ANALYZE).
+    """
+    if queryset.query.has_filters() or queryset.query.distinct:
+        return None
+    table = queryset.model._meta.db_table
+    connection = connections[queryset.db]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            elif connection.vendor == "sqlite":
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:  # sqlite_stat1 нет, пока не было ANALYZE
+        return None
+    if row is None:
+        return None
+    # reltuples = -1: таблицу ещё не анализировали; в sqlite_stat1 первое число — строк в таблице
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для админки больших таблиц: без фильтров число строк берётся из
+    статистики БД (estimated_row_count), если она не меньше
+    ADMIN_ESTIMATED_COUNT_THRESHOLD. Иначе — обычный COUNT(*).
+
+    Оценка приблизительная: последние страницы могут оказаться пустыми или
+    недоступными до следующего ANALYZE — для списков на миллионы строк это
+    лучше, чем полный проход по таблице при каждом открытии.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimated_row_count(self.object_list)
+            if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
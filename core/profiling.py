@@ -0,0 +1,222 @@
+"""
+Профилирование одного запроса по требованию (cProfile).
+
+Staff-пользователь добавляет к любому запросу ?_profile=1 или заголовок
+"X-Profile: 1" — ProfileMiddleware профилирует этот запрос (для потоковых
+ответов, например экспорта, — до конца выдачи) и сохраняет дамп pstats в
+PROFILE_DIR. Каталог ограничен PROFILE_MAX_FILES файлами: старые удаляются.
+Имя дампа возвращается в заголовке X-Profile-Id; список с самыми «дорогими»
+по cumulative функциями — /admin/profiles/, дамп можно скачать и открыть
+в snakeviz / pstats.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import pstats
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from django.utils.text import slugify
+
+logger = logging.getLogger(__name__)
+
+QUERY_FLAG = "_profile"
+HEADER = "X-Profile"
+DUMP_SUFFIX = ".prof"
+_NAME_RE = re.compile(r"^[\w.-]+\.prof$")
+
+
+@dataclass(frozen=True)
+class FunctionStat:
+    function: str
+    calls: int
+    tottime: float
+    cumtime: float
+
+
+@dataclass(frozen=True)
+class ProfileDump:
+    name: str
+    meta: dict
+    top: list[FunctionStat]
+
+
+def profile_dir() -> Path:
+    return Path(settings.PROFILE_DIR)
+
+
+def _profile_requested(request: HttpRequest) -> bool:
+    if not settings.PROFILE_ENABLED:
+        return False
+    return request.GET.get(QUERY_FLAG) == "1" or request.headers.get(HEADER) == "1"
+
+
+def _is_staff(user) -> bool:
+    return bool(user and user.is_authenticated and user.is_staff)
+
+
+def dump_path(name: str) -> Path | None:
+    """Путь к дампу по имени (только внутри PROFILE_DIR)."""
+    if not _NAME_RE.match(name):
+        return None
+    path = profile_dir() / name
+    return path if path.is_file() else None
+
+
+def _prune(directory: Path, keep: int) -> None:
+    dumps = sorted(directory.glob(f"*{DUMP_SUFFIX}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in dumps[keep:]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".json").unlink(missing_ok=True)
+
+
+def new_dump_name(view: str | None) -> str:
+    stamp = timezone.now().strftime("%Y%m%d-%H%M%S-%f")
+    return f"{stamp}-{slugify(view or 'request')[:40]}{DUMP_SUFFIX}"
+
+
+def save_profile(profiler: cProfile.Profile, meta: dict, name: str) -> None:
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / name
+    profiler.dump_stats(path)
+    path.with_suffix(".json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    _prune(directory, settings.PROFILE_MAX_FILES)
+
+
+def top_functions(path: Path, limit: int = 15) -> list[FunctionStat]:
+    stats = pstats.Stats(str(path))
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    top = []
+    for func in stats.fcn_list[:limit]:
+        _cc, calls, tottime, cumtime, _callers = stats.stats[func]
+        top.append(FunctionStat(pstats.func_std_string(func), calls, tottime, cumtime))
+    return top
+
+
+def list_profiles(limit: int = 10) -> list[ProfileDump]:
+    """Сохранённые дампы, новые сверху, с top-`limit` функций по cumulative."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    dumps = []
+    for path in sorted(directory.glob(f"*{DUMP_SUFFIX}"), key=lambda p: p.stat().st_mtime, reverse=True):
+        meta_path = path.with_suffix(".json")
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+            dumps.append(ProfileDump(path.name, meta, top_functions(path, limit)))
+        except (OSError, ValueError, TypeError, EOFError):
+            logger.warning("Повреждённый дамп профиля %s", path)
+    return dumps
+
+
+class ProfileMiddleware:
+    """
+    Ставить после AuthenticationMiddleware: нужен request.user.
+
+    Работает и в ASGI. Там профиль снимается с потока event loop: SQL async ORM
+    и прочий sync_to_async идут в других потоках (в профиле — только ожидание),
+    а код параллельных запросов того же процесса в профиль попадает.
+    Под WSGI тело async-представления (список и карточка мероприятия, кабинет)
+    в профиле есть.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.is_async:
+            return self.__acall__(request)
+        if not (_profile_requested(request) and _is_staff(getattr(request, "user", None))):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # В процессе уже работает другой профилировщик (например, coverage)
+            logger.warning("cProfile недоступен: активен другой профилировщик")
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        return self._finish(request, response, request.user, profiler, started)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not _profile_requested(request):
+            return await self.get_response(request)
+        user = await request.auser()
+        if not _is_staff(user):
+            return await self.get_response(request)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            logger.warning("cProfile недоступен: активен другой профилировщик")
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+        return self._finish(request, response, user, profiler, started)
+
+    def _finish(self, request, response, user, profiler: cProfile.Profile, started: float) -> HttpResponse:
+        meta = {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": request.resolver_match.view_name if request.resolver_match else None,
+            "user": user.get_username(),
+            "status": response.status_code,
+            "at": timezone.now().isoformat(),
+        }
+        name = new_dump_name(meta["view"])
+        response[f"{HEADER}-Id"] = name
+        if response.streaming and not getattr(response, "is_async", False):
+            # Экспорт и другие потоковые ответы: основная работа — при выдаче
+            response.streaming_content = self._profile_stream(response.streaming_content, profiler, meta, name, started)
+        else:
+            self._save(profiler, meta, name, started)
+        return response
+
+    @staticmethod
+    def _save(profiler: cProfile.Profile, meta: dict, name: str, started: float) -> None:
+        meta["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        try:
+            save_profile(profiler, meta, name)
+        except OSError:
+            logger.exception("Не удалось сохранить профиль запроса %s", meta["path"])
+
+    @classmethod
+    def _profile_stream(cls, chunks, profiler: cProfile.Profile, meta: dict, name: str, started: float):
+        iterator = iter(chunks)
+        try:
+            while True:
+                profiler.enable()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    profiler.disable()
+                yield chunk
+        finally:
+            cls._save(profiler, meta, name, started)
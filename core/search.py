@@ -0,0 +1,148 @@
+"""
+Полнотекстовый поиск по мероприятиям (название, описание, место, категория).
+
+- PostgreSQL: колонка core_event.search_vector (tsvector) + GIN-индекс,
+  конфигурация SEARCH_CONFIG (по умолчанию "russian"), ранжирование ts_rank.
+- SQLite (тесты): виртуальная таблица FTS5 core_event_fts, ранжирование bm25.
+- Прочие БД: icontains по тем же полям (без ранжирования).
+
+Схема создаётся миграцией 0005_event_search; индекс обновляется по сигналам
+(core.signals) для каждого сохранённого Event/Category.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import Event
+
+FTS_TABLE = "core_event_fts"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_PG_VECTOR_SQL = """
+    setweight(to_tsvector(%(config)s::regconfig, coalesce(e.title, '')), 'A') ||
+    setweight(to_tsvector(%(config)s::regconfig, coalesce(c.name, '')), 'B') ||
+    setweight(to_tsvector(%(config)s::regconfig, coalesce(e.location, '')), 'B') ||
+    setweight(to_tsvector(%(config)s::regconfig, coalesce(e.description, '')), 'C')
+"""
+
+
+def _vendor() -> str:
+    return connection.vendor
+
+
+def _chunks(ids: list[int], size: int = 500) -> Iterable[list[int]]:
+    for i in range(0, len(ids), size):
+        yield ids[i : i + size]
+
+
+def index_events(event_ids: Iterable[int]) -> None:
+    """Пересчитывает поисковый индекс для указанных мероприятий."""
+    ids = [pk for pk in set(event_ids) if pk is not None]
+    if not ids:
+        return
+
+    vendor = _vendor()
+    with connection.cursor() as cursor:
+        for chunk in _chunks(ids):
+            if vendor == "postgresql":
+                cursor.execute(
+                    f"""
+                    UPDATE core_event AS e SET search_vector = {_PG_VECTOR_SQL}
+                    FROM core_category AS c
+                    WHERE c.id = e.category_id AND e.id = ANY(%(ids)s)
+                    """,
+                    {"config": settings.SEARCH_CONFIG, "ids": chunk},
+                )
+            elif vendor == "sqlite":
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+                cursor.execute(
+                    f"""
+                    INSERT INTO {FTS_TABLE} (rowid, title, description, location, category)
+                    SELECT e.id, e.title, e.description, e.location, c.name
+                    FROM core_event AS e JOIN core_category AS c ON c.id = e.category_id
+                    WHERE e.id IN ({placeholders})
+                    """,
+                    chunk,
+                )
+
+
+def unindex_events(event_ids: Iterable[int]) -> None:
+    """Удаляет мероприятия из индекса (в Postgres вектор удаляется вместе со строкой)."""
+    ids = [pk for pk in set(event_ids) if pk is not None]
+    if not ids or _vendor() != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(ids):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+
+
+def rebuild_index(chunk_size: int = 2000) -> int:
+    """Полная перестройка индекса (после bulk_create / восстановления БД)."""
+    ids = list(Event.objects.order_by("pk").values_list("pk", flat=True))
+    if _vendor() == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    for chunk in _chunks(ids, chunk_size):
+        index_events(chunk)
+    return len(ids)
+
+
+def _fts5_query(query: str) -> str:
+    """Пользовательский ввод -> безопасный запрос FTS5: все слова, по префиксу."""
+    return " ".join(f'"{word}"*' for word in _WORD_RE.findall(query))
+
+
+def search_event_ids(query: str, *, offset: int = 0, limit: int = 20) -> list[int]:
+    """id мероприятий по релевантности (при равной — как в общем списке)."""
+    query = query.strip()
+    if not query:
+        return []
+
+    vendor = _vendor()
+    if vendor == "postgresql":
+        sql = """
+            SELECT e.id
+            FROM core_event AS e, websearch_to_tsquery(%(config)s::regconfig, %(query)s) AS q
+            WHERE e.search_vector @@ q
+            ORDER BY ts_rank(e.search_vector, q) DESC, e.event_date DESC, e.id DESC
+            LIMIT %(limit)s OFFSET %(offset)s
+        """
+        params = {"config": settings.SEARCH_CONFIG, "query": query, "limit": limit, "offset": offset}
+    elif vendor == "sqlite":
+        match = _fts5_query(query)
+        if not match:
+            return []
+        # веса колонок bm25: title, description, location, category
+        sql = f"""
+            SELECT {FTS_TABLE}.rowid
+            FROM {FTS_TABLE} JOIN core_event AS e ON e.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s
+            ORDER BY bm25({FTS_TABLE}, 10.0, 1.0, 4.0, 4.0), e.event_date DESC, e.id DESC
+            LIMIT %s OFFSET %s
+        """
+        params = [match, limit, offset]
+    else:
+        words = _WORD_RE.findall(query)
+        cond = Q()
+        for word in words:
+            cond &= (
+                Q(title__icontains=word)
+                | Q(description__icontains=word)
+                | Q(location__icontains=word)
+                | Q(category__name__icontains=word)
+            )
+        qs = Event.objects.filter(cond).order_by("-event_date", "-pk").values_list("pk", flat=True)
+        return list(qs[offset : offset + limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,203 @@
+"""
+Места на мероприятии и лист ожидания.
+
+Event.capacity — сколько волонтёров нужно (пусто — без ограничений),
+Event.seats_taken — сколько заявок занимают место (VolunteerApplication.SEAT_STATUSES).
+
+Любая смена мест начинается с блокировки строки мероприятия (lock_events,
+SELECT ... FOR UPDATE) и только потом трогает заявки — порядок блокировок везде
+один, взаимных блокировок нет. Под этой блокировкой статусы заявок мероприятия
+не меняются, так что проверки (есть ли очередь, кто первый) не устаревают.
+
+Место берётся условным UPDATE:
+
+    UPDATE core_event SET seats_taken = seats_taken + 1
+    WHERE id = %s AND (capacity IS NULL OR seats_taken < capacity)
+
+Не хватило места — заявка встаёт в лист ожидания (WAITLISTED), очередь — по id (FIFO).
+Отозвавший заявку может подать её снова (resubmit_application) — в конец очереди.
+Когда заявка перестаёт занимать место (отклонена, отозвана, удалена), в той же
+транзакции место отдаётся первому в очереди — он получает статус NEW.
+seats_taken меняется только сдвигами под блокировкой (вместе с updated_at — для
+ETag страниц, core.conditional); полный пересчёт — recount_counters.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .counters import bump_event_counters
+from .fragments import invalidate_event_cards_on_commit
+from .models import Event, EventLike, VolunteerApplication
+
+Status = VolunteerApplication.Status
+
+
+def lock_events(event_ids: Iterable[int]) -> None:
+    """Блокирует строки мероприятий до конца транзакции, по возрастанию id."""
+    event_ids = sorted(set(event_ids))
+    if event_ids:
+        list(Event.objects.select_for_update().filter(pk__in=event_ids).order_by("pk").values_list("pk", flat=True))
+
+
+def lock_application_events(application_pk: int, *event_ids: int) -> tuple[int, str] | None:
+    """
+    Блокирует мероприятие заявки (и event_ids) и возвращает её (event_id, status),
+    прочитанные уже под блокировкой; None — заявки нет.
+    """
+    while True:
+        current = VolunteerApplication.objects.filter(pk=application_pk).values_list("event_id", flat=True).first()
+        locked = {*event_ids, *([current] if current is not None else [])}
+        lock_events(locked)
+        state = VolunteerApplication.objects.filter(pk=application_pk).values_list("event_id", "status").first()
+        if state is None or state[0] in locked:
+            return state
+        # заявку успели перенести на другое мероприятие — блокируем и его
+
+
+def take_seat(event_id: int) -> bool:
+    """Занимает место, если оно есть. False — мест нет (или мероприятия нет). Вызывать под lock_events."""
+    has_room = Q(capacity__isnull=True) | Q(seats_taken__lt=F("capacity"))
+    return bool(
+        Event.objects.filter(has_room, pk=event_id).update(
+            seats_taken=F("seats_taken") + 1, updated_at=timezone.now()
+        )
+    )
+
+
+def shift_seats(event_id: int, delta: int) -> None:
+    """Безусловный сдвиг: решение организатора может и превысить capacity. Вызывать под lock_events."""
+    if delta:
+        Event.objects.filter(pk=event_id).update(
+            seats_taken=Greatest(F("seats_taken") + delta, Value(0)), updated_at=timezone.now()
+        )
+
+
+def promote_waitlist(event_id: int) -> list[int]:
+    """Отдаёт свободные места первым в листе ожидания. Возвращает id поднятых заявок."""
+    waiting = VolunteerApplication.objects.filter(event_id=event_id, status=Status.WAITLISTED)
+    promoted = []
+    with transaction.atomic():
+        lock_events([event_id])
+        while True:
+            head = waiting.order_by("pk").values_list("pk", flat=True).first()
+            if head is None or not take_seat(event_id):
+                break
+            if waiting.filter(pk=head).update(status=Status.NEW, updated_at=timezone.now()):
+                promoted.append(head)
+            else:
+                # Заявку изменили в обход блокировки мероприятия — место возвращаем
+                shift_seats(event_id, -1)
+    if promoted:
+        invalidate_event_cards_on_commit([event_id])
+    return promoted
+
+
+def sync_seat(before: tuple[int, str] | None, after: tuple[int, str] | None) -> list[int]:
+    """
+    Поправляет seats_taken после смены (мероприятия, статуса) заявки; None — заявки нет
+    (создана / удалена). Освободившееся место уходит листу ожидания.
+    Вызывать в транзакции изменения заявки, начатой с lock_events / lock_application_events.
+    Возвращает id поднятых из очереди.
+    """
+    held_before = before is not None and before[1] in VolunteerApplication.SEAT_STATUSES
+    held_after = after is not None and after[1] in VolunteerApplication.SEAT_STATUSES
+    if held_before and held_after and before[0] == after[0]:
+        return []
+    if held_after:
+        shift_seats(after[0], 1)
+    if held_before:
+        shift_seats(before[0], -1)
+        return promote_waitlist(before[0])
+    return []
+
+
+def submit_application(application: VolunteerApplication) -> VolunteerApplication:
+    """
+    Сохраняет новую заявку: на свободное место (NEW) или в лист ожидания (WAITLISTED).
+    Повторная заявка того же пользователя — IntegrityError, место при этом не занимается.
+    """
+    with transaction.atomic():
+        # Блокировка и для листа ожидания: иначе заявка могла бы встать в очередь
+        # рядом с местом, которое как раз освобождается
+        lock_events([application.event_id])
+        application.status = Status.NEW if take_seat(application.event_id) else Status.WAITLISTED
+        application.save()
+        bump_event_counters(application.event_id, applications=1)
+    return application
+
+
+def resubmit_application(application: VolunteerApplication) -> bool:
+    """
+    Повторная заявка того же пользователя после отзыва. Отозванная строка заменяется
+    новой: очередь идёт по id, и прежний id поставил бы заявку впереди тех, кто
+    встал в лист ожидания после неё. False — отозванной заявки нет (её успели изменить).
+    """
+    with transaction.atomic():
+        lock_events([application.event_id])
+        withdrawn = VolunteerApplication.objects.filter(
+            user_id=application.user_id, event_id=application.event_id, status=Status.WITHDRAWN
+        )
+        if not withdrawn.delete()[0]:
+            return False
+        # Отозванная место не занимала, applications_count не меняется: одна заявка сменила другую
+        application.status = Status.NEW if take_seat(application.event_id) else Status.WAITLISTED
+        application.save()
+    return True
+
+
+def change_status(application: VolunteerApplication, status: str) -> list[int]:
+    """
+    Переводит одну заявку в status (например, отзыв участником). Если заявку успели
+    изменить параллельно — ничего не делает. Возвращает id поднятых из очереди.
+    """
+    with transaction.atomic():
+        before = lock_application_events(application.pk, application.event_id)
+        if before != (application.event_id, application.status):
+            return []
+        VolunteerApplication.objects.filter(pk=application.pk).update(status=status, updated_at=timezone.now())
+        application.status = status
+        return sync_seat(before, (application.event_id, status))
+
+
+def release_seats(held: dict[int, int]) -> None:
+    """
+    После массового удаления / смены статуса: event_id -> сколько мест освободилось
+    (отрицательное — занято). Вызывать в той же транзакции, под lock_events.
+    """
+    for event_id, n in sorted(held.items()):
+        shift_seats(event_id, -n)
+    for event_id, n in sorted(held.items()):
+        if n > 0:
+            promote_waitlist(event_id)
+
+
+def release_user_rows(user_id: int) -> list[int]:
+    """
+    Перед удалением пользователя: его лайки и заявки удалит каскад — мимо счётчиков.
+    Сдвигает likes_count / applications_count / seats_taken заранее, в транзакции удаления.
+    Возвращает мероприятия, где освободились места (очередь поднять после удаления).
+    """
+    likes = dict(EventLike.objects.filter(user_id=user_id).order_by().values_list("event_id").annotate(n=Count("pk")))
+    applications = {
+        row["event_id"]: (row["n"], row["held"])
+        for row in VolunteerApplication.objects.filter(user_id=user_id)
+        .order_by()
+        .values("event_id")
+        .annotate(n=Count("pk"), held=Count("pk", filter=Q(status__in=VolunteerApplication.SEAT_STATUSES)))
+    }
+    event_ids = sorted(likes.keys() | applications.keys())
+    lock_events(event_ids)
+    released = []
+    for event_id in event_ids:
+        n, held = applications.get(event_id, (0, 0))
+        bump_event_counters(event_id, likes=-likes.get(event_id, 0), applications=-n)
+        shift_seats(event_id, -held)
+        if held:
+            released.append(event_id)
+    return released
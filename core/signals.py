@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from PIL import Image
+
+from .fragments import invalidate_event_cards_on_commit
+from .images import delete_renditions, needs_renditions, update_event_renditions
+from .models import Category, Event, EventLike, VolunteerApplication
+from .search import index_events, unindex_events
+from .seats import promote_waitlist, release_user_rows
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance: Event, **kwargs) -> None:
+    invalidate_event_cards_on_commit([instance.pk])
+    index_events([instance.pk])
+    if needs_renditions(instance):
+        try:
+            update_event_renditions(instance)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # Битый или слишком большой (больше Image.MAX_IMAGE_PIXELS) файл не должен мешать
+            # сохранению: на странице будет оригинал
+            logger.exception("Не удалось сделать копии изображения мероприятия #%s", instance.pk)
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance: Event, **kwargs) -> None:
+    invalidate_event_cards_on_commit([instance.pk])
+    unindex_events([instance.pk])
+    if instance.image_renditions:
+        # Файлы — только после фиксации: при откате удаления копии ещё нужны
+        renditions = instance.image_renditions
+        transaction.on_commit(lambda: delete_renditions(renditions))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance: Category, **kwargs) -> None:
+    # Название категории есть в карточке и в поисковом индексе — обновляем только её мероприятия
+    events = Event.objects.filter(category_id=instance.pk)
+    event_ids = list(events.values_list("pk", flat=True))
+    # Название категории — часть страниц мероприятий: сдвигаем их updated_at (core.conditional)
+    events.update(updated_at=timezone.now())
+    invalidate_event_cards_on_commit(event_ids)
+    index_events(event_ids)
+
+
+@receiver(post_save, sender=EventLike)
+@receiver(post_delete, sender=EventLike)
+@receiver(post_save, sender=VolunteerApplication)
+@receiver(post_delete, sender=VolunteerApplication)
+def event_counter_changed(sender, instance, **kwargs) -> None:
+    invalidate_event_cards_on_commit([instance.event_id])
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleting(sender, instance, **kwargs) -> None:
+    # Каскад удалит лайки и заявки пользователя без bump_event_counters — сдвигаем счётчики
+    # здесь (та же транзакция), освободившиеся места отдаём очереди уже после удаления заявок
+    instance._released_seat_events = release_user_rows(instance.pk)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleted(sender, instance, **kwargs) -> None:
+    for event_id in getattr(instance, "_released_seat_events", ()):
+        promote_waitlist(event_id)
@@ -0,0 +1,197 @@
+"""
+Журнал медленных SQL-запросов (включается SLOW_SQL_ENABLED=1).
+
+SlowQueryMiddleware оборачивает выполнение запросов к БД на время обработки
+HTTP-запроса. Всё, что дольше SLOW_SQL_THRESHOLD_MS, попадает в кольцевой буфер
+вместе с представлением, параметрами и планом EXPLAIN (снимается сразу, в
+точке записи; сам запрос EXPLAIN не выполняет).
+
+Буфер лежит в кэше (SLOW_SQL_CACHE_ALIAS): номер записи берётся через
+cache.incr, слот — номер по модулю SLOW_SQL_BUFFER_SIZE, так что буфер
+общий для всех процессов и никогда не растёт. Кэш для этого нужен общий
+(Redis, Memcached, БД): с LocMemCache у каждого воркера свой буфер, и страница
+показывает только запросы процесса, который её отдал — об этом предупреждают
+системная проверка core.W001 и сама страница.
+Просмотр — /admin/slow-sql/ (только суперпользователь: в параметрах бывают
+персональные данные).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DatabaseError, connection, transaction
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+from .async_support import aexecute_wrapper
+
+logger = logging.getLogger(__name__)
+
+SEQ_KEY = "slow_sql:seq"
+SLOT_KEY = "slow_sql:slot:{}"
+MAX_SQL_LENGTH = 10_000
+MAX_PARAMS_LENGTH = 2_000
+# Планы снимаем только для чтения/изменения данных; DDL и служебные команды не трогаем
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+_capturing = contextvars.ContextVar("slow_sql_capturing", default=False)
+
+
+def _cache() -> BaseCache:
+    return caches[settings.SLOW_SQL_CACHE_ALIAS]
+
+
+def buffer_is_process_local() -> bool:
+    """Буфер виден только текущему процессу (кэш в памяти процесса или заглушка)."""
+    return isinstance(_cache(), (LocMemCache, DummyCache))
+
+
+@checks.register()
+def check_slow_sql_cache(app_configs, **kwargs) -> list[checks.Warning]:
+    if settings.SLOW_SQL_ENABLED and buffer_is_process_local():
+        return [
+            checks.Warning(
+                f"Журнал медленных SQL хранится в кэше процесса ({settings.SLOW_SQL_CACHE_ALIAS!r}): "
+                "у каждого воркера свой буфер, /admin/slow-sql/ покажет только один из них.",
+                hint="Укажите в SLOW_SQL_CACHE_ALIAS общий кэш (Redis, Memcached, БД).",
+                id="core.W001",
+            )
+        ]
+    return []
+
+
+def explain_sql(sql: str, params) -> str:
+    """План запроса текстом или пустая строка, если снять его не удалось."""
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return ""
+    prefix = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}.get(connection.vendor, "EXPLAIN ")
+    token = _capturing.set(True)  # сам EXPLAIN в журнал не пишем
+    try:
+        # Савепоинт: ошибка EXPLAIN не должна ломать транзакцию вызывающего кода
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except DatabaseError:
+        logger.debug("EXPLAIN не удался", exc_info=True)
+        return ""
+    finally:
+        _capturing.reset(token)
+    return "\n".join(" ".join(str(col) for col in row) if len(row) > 1 else str(row[0]) for row in rows)
+
+
+def record_slow_query(record: dict) -> None:
+    cache = _cache()
+    cache.add(SEQ_KEY, 0, timeout=None)
+    try:
+        seq = cache.incr(SEQ_KEY)
+    except ValueError:  # ключ вытеснен между add и incr
+        cache.set(SEQ_KEY, 1, timeout=None)
+        seq = 1
+    cache.set(SLOT_KEY.format(seq % settings.SLOW_SQL_BUFFER_SIZE), {**record, "seq": seq}, timeout=None)
+
+
+def recent_slow_queries() -> list[dict]:
+    """Записи буфера, новые сверху."""
+    keys = [SLOT_KEY.format(i) for i in range(settings.SLOW_SQL_BUFFER_SIZE)]
+    records = _cache().get_many(keys).values()
+    return sorted(records, key=lambda r: r["seq"], reverse=True)
+
+
+def clear_slow_queries() -> None:
+    cache = _cache()
+    cache.delete_many([SLOT_KEY.format(i) for i in range(settings.SLOW_SQL_BUFFER_SIZE)])
+    cache.delete(SEQ_KEY)
+
+
+class SlowQueryRecorder:
+    """execute_wrapper: пишет в буфер запросы дольше порога."""
+
+    def __init__(self, source: str, threshold_ms: float) -> None:
+        self.source = source
+        self.threshold_ms = threshold_ms
+
+    def __call__(self, execute, sql, params, many, context):
+        if _capturing.get():
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= self.threshold_ms:
+            self._record(sql, params, many, duration_ms)
+        return result
+
+    def _record(self, sql: str, params, many: bool, duration_ms: float) -> None:
+        try:
+            record_slow_query(
+                {
+                    "at": timezone.now().isoformat(),
+                    "source": self.source,
+                    "duration_ms": round(duration_ms, 2),
+                    "sql": sql[:MAX_SQL_LENGTH],
+                    "params": repr(params)[:MAX_PARAMS_LENGTH],
+                    "many": many,
+                    "plan": "" if many else explain_sql(sql, params),
+                }
+            )
+        except Exception:
+            # Журнал — вспомогательный: его сбой не должен ронять запрос
+            logger.exception("Не удалось записать медленный запрос")
+
+
+@contextmanager
+def capture_slow_queries(source: str):
+    """Включает запись медленных запросов в блоке (если SLOW_SQL_ENABLED)."""
+    if not settings.SLOW_SQL_ENABLED:
+        yield
+        return
+    with connection.execute_wrapper(SlowQueryRecorder(source, settings.SLOW_SQL_THRESHOLD_MS)):
+        yield
+
+
+class SlowQueryMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _recorder(request: HttpRequest) -> SlowQueryRecorder:
+        recorder = request._slow_sql_recorder = SlowQueryRecorder(
+            f"{request.method} {request.path}", settings.SLOW_SQL_THRESHOLD_MS
+        )
+        return recorder
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.SLOW_SQL_ENABLED:
+            return self.get_response(request)
+        with connection.execute_wrapper(self._recorder(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.SLOW_SQL_ENABLED:
+            return await self.get_response(request)
+        async with aexecute_wrapper(self._recorder(request)):
+            return await self.get_response(request)
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs) -> None:
+        # URL уже разобран — дальше запросы подписываем именем представления
+        recorder = getattr(request, "_slow_sql_recorder", None)
+        if recorder is not None and request.resolver_match is not None:
+            recorder.source = f"{request.resolver_match.view_name} ({request.method} {request.path})"
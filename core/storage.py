@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+
+class PrivateExportStorage(FileSystemStorage):
+    """
+    Готовые фоновые выгрузки: каталог EXPORT_ROOT вне MEDIA_ROOT и без публичного URL.
+    Отдаются только через export_job_download_view (автор или суперпользователь).
+    """
+
+    @property
+    def base_location(self):
+        return settings.EXPORT_ROOT
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    def url(self, name):
+        raise ValueError("У файлов экспорта нет публичного URL")
+
+
+_export_storage = PrivateExportStorage()
+
+
+def export_storage() -> PrivateExportStorage:
+    # Вызываемый объект, а не экземпляр: в миграцию попадает ссылка, а не путь каталога
+    return _export_storage
@@ -0,0 +1,182 @@
+"""
+Синтетические данные «продового» объёма для нагрузочных замеров (manage.py seed --users ...).
+
+- Всё пишется через bulk_create пачками по batch_size, каждая пачка — своя транзакция.
+- ГСЧ детерминирован (seed): один и тот же запуск даёт одинаковые данные.
+- Популярность мероприятий распределена по Ципфу (skew): немного «хитов»
+  с тысячами лайков и длинный хвост почти без активности.
+- Сигналы при bulk_create не срабатывают — счётчики и поисковый индекс
+  пересчитываются одним проходом в конце.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable, Iterable, Iterator
+from datetime import timedelta
+from itertools import batched
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import models, transaction
+from django.utils import timezone
+
+from .counters import rebuild_event_counters
+from .models import Category, Event, EventLike, VolunteerApplication
+from .search import rebuild_index
+
+CATEGORY_NAMES = [
+    "Экология",
+    "Социальная помощь",
+    "Образование",
+    "Культура и события",
+    "Животные",
+    "Спорт",
+    "Здоровье",
+    "Городская среда",
+]
+
+_TITLE_VERBS = ["Помощь", "Субботник", "Сбор", "Мастер-класс", "Акция", "Уборка", "Встреча", "Праздник"]
+_TITLE_OBJECTS = ["в парке", "для приюта", "в библиотеке", "у реки", "в школе", "для пожилых", "на площади", "в больнице"]
+_LOCATIONS = ["Центральный парк", "Городская библиотека", "Дом культуры", "Набережная", "Школа №5", "Приют «Лапа»"]
+
+# Распределение статусов заявок: новые / одобренные / отклонённые
+_STATUS_WEIGHTS = [
+    (VolunteerApplication.Status.NEW, 6),
+    (VolunteerApplication.Status.APPROVED, 3),
+    (VolunteerApplication.Status.REJECTED, 1),
+]
+
+ProgressCallback = Callable[[str, int, int, float], None]
+
+
+def zipf_counts(total: int, buckets: int, *, skew: float, cap: int, rng: random.Random) -> list[int]:
+    """
+    Раскладывает total по buckets с весами 1/rank**skew (ранги перемешаны),
+    не больше cap в одной корзине. Сумма может быть меньше total, если cap не пускает.
+    """
+    if not buckets or total <= 0:
+        return [0] * buckets
+    ranks = list(range(1, buckets + 1))
+    rng.shuffle(ranks)
+    weights = [1 / rank**skew for rank in ranks]
+    scale = total / sum(weights)
+    counts = [min(cap, int(w * scale)) for w in weights]
+
+    # Остаток от округления — самым «тяжёлым» корзинам, у которых ещё есть место
+    rest = total - sum(counts)
+    for i in sorted(range(buckets), key=weights.__getitem__, reverse=True):
+        if rest <= 0:
+            break
+        add = min(rest, cap - counts[i])
+        counts[i] += add
+        rest -= add
+    return counts
+
+
+class SyntheticSeeder:
+    def __init__(
+        self,
+        *,
+        seed: int = 42,
+        batch_size: int = 5000,
+        skew: float = 1.1,
+        on_progress: ProgressCallback | None = None,
+    ) -> None:
+        self.seed = seed
+        self.batch_size = batch_size
+        self.skew = skew
+        self.rng = random.Random(seed)
+        self.on_progress = on_progress
+
+    def _bulk_insert(
+        self, label: str, model: type[models.Model], rows: Iterable, total: int, *, return_pks: bool = False, **kwargs
+    ) -> list[int]:
+        """Вставка пачками. pk вставленных — только по return_pks: миллионы объектов в памяти не держим."""
+        pks: list[int] = []
+        done = 0
+        started = time.monotonic()
+        for batch in batched(rows, self.batch_size):
+            with transaction.atomic():
+                created = model.objects.bulk_create(batch, **kwargs)
+            if return_pks:
+                pks.extend(obj.pk for obj in created)
+            done += len(batch)
+            if self.on_progress:
+                self.on_progress(label, done, total, time.monotonic() - started)
+        return pks
+
+    def create_users(self, count: int) -> list[int]:
+        User = get_user_model()
+        prefix = f"load{self.seed}_"
+        # Один хеш на всех: хешировать пароль на каждого пользователя слишком долго
+        password = make_password("load12345")
+        rows = (User(username=f"{prefix}{i:07d}", email=f"{prefix}{i}@example.com", password=password) for i in range(count))
+        self._bulk_insert("users", User, rows, count, ignore_conflicts=True)
+        return list(User.objects.filter(username__startswith=prefix).order_by("pk").values_list("pk", flat=True)[:count])
+
+    def create_events(self, count: int) -> list[int]:
+        categories = [Category.objects.get_or_create(name=name)[0] for name in CATEGORY_NAMES]
+        now = timezone.now()
+        rng = self.rng
+
+        def rows() -> Iterator[Event]:
+            for i in range(count):
+                title = f"{rng.choice(_TITLE_VERBS)} {rng.choice(_TITLE_OBJECTS)} #{i}"
+                yield Event(
+                    category=rng.choice(categories),
+                    title=title,
+                    description=f"{title}. Нужны волонтёры, инструктаж на месте.",
+                    location=rng.choice(_LOCATIONS),
+                    event_date=now + timedelta(minutes=rng.randint(-365 * 24 * 60, 365 * 24 * 60)),
+                )
+
+        return self._bulk_insert("events", Event, rows(), count, return_pks=True)
+
+    def _pairs(self, user_ids: list[int], event_ids: list[int], total: int) -> tuple[Iterator[tuple[int, int]], int]:
+        """(user_id, event_id) без повторов, популярность событий — по Ципфу."""
+        counts = zipf_counts(total, len(event_ids), skew=self.skew, cap=len(user_ids), rng=self.rng)
+        rng = self.rng
+
+        def pairs() -> Iterator[tuple[int, int]]:
+            for event_id, n in zip(event_ids, counts):
+                for user_id in rng.sample(user_ids, n):
+                    yield user_id, event_id
+
+        return pairs(), sum(counts)
+
+    def create_likes(self, user_ids: list[int], event_ids: list[int], total: int) -> int:
+        pairs, planned = self._pairs(user_ids, event_ids, total)
+        rows = (EventLike(user_id=u, event_id=e) for u, e in pairs)
+        self._bulk_insert("likes", EventLike, rows, planned, ignore_conflicts=True)
+        return planned
+
+    def create_applications(self, user_ids: list[int], event_ids: list[int], total: int) -> int:
+        pairs, planned = self._pairs(user_ids, event_ids, total)
+        statuses = [status for status, _ in _STATUS_WEIGHTS]
+        weights = [weight for _, weight in _STATUS_WEIGHTS]
+        rows = (
+            VolunteerApplication(
+                user_id=u,
+                event_id=e,
+                motivation="Хочу помочь.",
+                status=self.rng.choices(statuses, weights)[0],
+            )
+            for u, e in pairs
+        )
+        self._bulk_insert("applications", VolunteerApplication, rows, planned, ignore_conflicts=True)
+        return planned
+
+    def run(self, *, users: int, events: int, likes: int = 0, applications: int = 0) -> dict[str, int]:
+        user_ids = self.create_users(users)
+        event_ids = self.create_events(events)
+        result = {"users": len(user_ids), "events": len(event_ids), "likes": 0, "applications": 0}
+        if user_ids and event_ids:
+            result["likes"] = self.create_likes(user_ids, event_ids, likes)
+            result["applications"] = self.create_applications(user_ids, event_ids, applications)
+
+        if event_ids:
+            rebuild_event_counters(Event.objects.filter(pk__gte=min(event_ids)))
+            rebuild_index()
+        return result
@@ -1,8 +1,16 @@
 from django import template
 
+from core.images import image_context
+
 register = template.Library()
 
 @register.filter
 def has_group(user, group_name: str) -> bool:
     """Пример расширения прав (не обязателен): проверка группы."""
     return user.is_authenticated and user.groups.filter(name=group_name).exists()
+
+
+@register.inclusion_tag("events/_event_image.html")
+def event_image(event, sizes: str = "100vw", eager: bool = False) -> dict:
+    """<picture> с WebP/JPEG srcset и размерами; eager=True — для картинки на первом экране."""
+    return {"img": image_context(event), "sizes": sizes, "eager": eager}
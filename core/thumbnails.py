@@ -0,0 +1,56 @@
+"""
+Ресайз изображений в WebP/JPEG (только Pillow, без Django).
+
+Модуль намеренно не импортирует Django: его функции выполняются в процессах
+пула команды generate_thumbnails, которые не настраивают Django и не держат
+соединений с БД. Работа с хранилищем и моделями — в core.images.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# формат -> (имя для Pillow, параметры сохранения)
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+@dataclass(frozen=True)
+class Rendition:
+    format: str
+    width: int
+    height: int
+    data: bytes
+
+
+def target_widths(original_width: int, widths: tuple[int, ...]) -> list[int]:
+    """Ширины не больше оригинала; маленький оригинал — одна копия в исходном размере."""
+    fitting = sorted(w for w in set(widths) if w < original_width)
+    if not fitting or max(widths) >= original_width:
+        fitting.append(original_width)
+    return fitting
+
+
+def render_renditions(source: bytes, widths: tuple[int, ...]) -> tuple[int, int, list[Rendition]]:
+    """(ширина и высота оригинала, копии во всех FORMATS для каждой ширины)."""
+    with Image.open(BytesIO(source)) as opened:
+        image = ImageOps.exif_transpose(opened)  # фото с телефона: поворот из EXIF
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        original_width, original_height = image.size
+
+        renditions = []
+        for width in target_widths(original_width, widths):
+            height = max(1, round(original_height * width / original_width))
+            resized = image if width == original_width else image.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt, (pil_format, options) in FORMATS.items():
+                frame = resized.convert("RGB") if pil_format == "JPEG" and resized.mode != "RGB" else resized
+                buffer = BytesIO()
+                frame.save(buffer, pil_format, **options)
+                renditions.append(Rendition(fmt, width, height, buffer.getvalue()))
+    return original_width, original_height, renditions
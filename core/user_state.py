@@ -0,0 +1,85 @@
+"""
+Персональное состояние посетителя по мероприятиям: «лайкнул» и «подал заявку».
+
+Карточки мероприятий общие для всех и лежат в кэше (core.fragments), поэтому
+бейджи пользователя рисуются поверх них. Загрузчик живёт один на запрос и
+достаёт состояние сразу для пачки мероприятий — по одному запросу на лайки
+и на заявки, сколько бы карточек ни было на странице.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from django.http import HttpRequest
+
+from .models import EventLike, VolunteerApplication
+
+
+@dataclass(frozen=True)
+class EventUserState:
+    liked: bool = False
+    application: VolunteerApplication | None = None
+
+
+ANONYMOUS_STATE = EventUserState()
+
+
+class EventUserStateLoader:
+    def __init__(self, user) -> None:
+        self.user = user
+        self._states: dict[int, EventUserState] = {}
+
+    def _queries(self, missing: set[int]):
+        likes = EventLike.objects.filter(user=self.user, event_id__in=missing).values_list("event_id", flat=True)
+        applications = VolunteerApplication.objects.filter(user=self.user, event_id__in=missing).only(
+            "pk", "event_id", "status", "updated_at"
+        )
+        return likes, applications
+
+    def _store(self, missing: set[int], liked: set[int], applications: list[VolunteerApplication]) -> None:
+        by_event = {app.event_id: app for app in applications}
+        for pk in missing:
+            self._states[pk] = EventUserState(liked=pk in liked, application=by_event.get(pk))
+
+    def load(self, event_ids: Iterable[int]) -> dict[int, EventUserState]:
+        """Состояние для всех event_ids; из БД догружаются только ещё не загруженные."""
+        event_ids = list(event_ids)
+        if not self.user.is_authenticated:
+            return {pk: ANONYMOUS_STATE for pk in event_ids}
+
+        missing = {pk for pk in event_ids if pk not in self._states}
+        if missing:
+            likes, applications = self._queries(missing)
+            self._store(missing, set(likes), list(applications))
+        return {pk: self._states[pk] for pk in event_ids}
+
+    async def aload(self, event_ids: Iterable[int]) -> dict[int, EventUserState]:
+        """load() для async-представлений (async ORM)."""
+        event_ids = list(event_ids)
+        if not self.user.is_authenticated:
+            return {pk: ANONYMOUS_STATE for pk in event_ids}
+
+        missing = {pk for pk in event_ids if pk not in self._states}
+        if missing:
+            likes, applications = self._queries(missing)
+            self._store(missing, {pk async for pk in likes}, [app async for app in applications])
+        return {pk: self._states[pk] for pk in event_ids}
+
+    def get(self, event_id: int) -> EventUserState:
+        return self.load([event_id])[event_id]
+
+    async def aget(self, event_id: int) -> EventUserState:
+        return (await self.aload([event_id]))[event_id]
+
+
+def event_user_states(request: HttpRequest) -> EventUserStateLoader:
+    """
+    Загрузчик текущего запроса (создаётся при первом обращении).
+    В async-представлении request.user должен быть уже получен (await request.auser()).
+    """
+    loader = getattr(request, "_event_user_states", None)
+    if loader is None:
+        loader = request._event_user_states = EventUserStateLoader(request.user)
+    return loader
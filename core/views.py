@@ -1,71 +1,135 @@
 from __future__ import annotations
 
+import hmac
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import get_object_or_404, redirect, render
+from django.db import IntegrityError
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
+from django.utils.http import urlencode
 from django.views.decorators.http import require_POST
 
+from .conditional import page_validators
 from .forms import SignUpForm, VolunteerApplicationForm
+from .fragments import aget_event_cards
+from .likes import toggle_event_like
+from .metrics import get_registry, render_prometheus
 from .models import Event, VolunteerApplication, EventLike
+from .pagination import KeysetPaginator
+from .search import search_event_ids
+from .seats import change_status, resubmit_application, submit_application
+from .user_state import event_user_states
+
+
+# Из чего складывается валидатор страницы (core.conditional.page_validators)
+VALIDATOR_FIELDS = ("pk", "updated_at", "likes_count", "applications_count")
+
+
+def _page_number(request: HttpRequest, max_page: int) -> int:
+    try:
+        number = max(1, int(request.GET.get("page", "1")))
+    except ValueError:
+        return 1
+    # Без потолка огромный номер даёт OFFSET за пределами bigint (500) или глубокий скан выдачи
+    if number > max_page:
+        raise Http404("Нет такой страницы")
+    return number
 
 
-def event_list(request: HttpRequest) -> HttpResponse:
-    # Гость может смотреть список
-    events = (
-        Event.objects
-        .select_related("category")
-        .annotate(
-            likes_count=Count("likes", distinct=True),
-            applications_count=Count("applications", distinct=True),
-        )
-        .order_by("-event_date")
+async def _resolve_user(request: HttpRequest) -> None:
+    # Ленивый request.user в async-коде не трогаем (синхронный запрос к БД): берём пользователя
+    # заранее, и шаблоны, формы и core.user_state получают уже готовый объект
+    request.user = await request.auser()
+
+
+async def event_list(request: HttpRequest) -> HttpResponse:
+    # Гость может смотреть список.
+    # Страница выбирается по узкому запросу (pk, event_date) или по поисковому индексу,
+    # сами карточки берутся из кэша фрагментов; из БД догружаются только промахи.
+    # Повторный визит с тем же ETag получает 304 без рендера (core.conditional).
+    # Async (для ASGI): медленный клиент не держит поток, SQL — через async ORM.
+    await _resolve_user(request)
+    query = request.GET.get("q", "").strip()
+    size = settings.EVENT_LIST_PAGE_SIZE
+    page = None
+
+    if query:
+        # Поиск ранжирован по релевантности — здесь обычная постраничная навигация.
+        # search_event_ids — сырой SQL, у которого нет async-API: отдельным потоком.
+        number = _page_number(request, settings.SEARCH_MAX_PAGE)
+        event_ids = await sync_to_async(search_event_ids)(query, offset=(number - 1) * size, limit=size + 1)
+        has_next = len(event_ids) > size and number < settings.SEARCH_MAX_PAGE
+        event_ids = event_ids[:size]
+        prev_query = urlencode({"q": query, "page": number - 1}) if number > 1 else None
+        next_query = urlencode({"q": query, "page": number + 1}) if has_next else None
+        rows = [row async for row in Event.objects.filter(pk__in=event_ids).order_by("pk").values_list(*VALIDATOR_FIELDS)]
+    else:
+        events = Event.objects.only("event_date", *VALIDATOR_FIELDS)
+        paginator = KeysetPaginator(events, key="event_date", page_size=size)
+        page = await paginator.apage(after=request.GET.get("after"), before=request.GET.get("before"))
+        event_ids = [e.pk for e in page]
+        prev_query = urlencode({"before": page.prev_cursor}) if page.has_previous else None
+        next_query = urlencode({"after": page.next_cursor}) if page.has_next else None
+        rows = [tuple(getattr(e, f) for f in VALIDATOR_FIELDS) for e in page]
+
+    states = await event_user_states(request).aload(event_ids)
+    validators = page_validators(
+        request, rows, states, query, event_ids, prev_query, next_query, with_last_modified=False
     )
-    return render(request, "events/event_list.html", {"events": events})
-
-
-def event_detail(request: HttpRequest, pk: int) -> HttpResponse:
-    event = (
-        Event.objects
-        .select_related("category")
-        .annotate(
-            likes_count=Count("likes", distinct=True),
-            applications_count=Count("applications", distinct=True),
-        )
-        .filter(pk=pk)
-        .first()
+    if validators and (not_modified := validators.not_modified(request)):
+        return not_modified
+
+    cards = await aget_event_cards(event_ids)
+    response = render(
+        request,
+        "events/event_list.html",
+        {
+            "page": page,
+            "query": query,
+            "cards": [(pk, cards[pk], states[pk]) for pk in event_ids if pk in cards],
+            "prev_query": prev_query,
+            "next_query": next_query,
+        },
     )
-    if not event:
-        event = get_object_or_404(Event, pk=pk)
+    return validators.apply(response) if validators else response
 
-    liked = False
-    application = None
-    if request.user.is_authenticated:
-        liked = EventLike.objects.filter(user=request.user, event=event).exists()
-        application = VolunteerApplication.objects.filter(user=request.user, event=event).first()
+
+async def event_detail(request: HttpRequest, pk: int) -> HttpResponse:
+    await _resolve_user(request)
+    event = await aget_object_or_404(Event.objects.select_related("category"), pk=pk)
+    state = await event_user_states(request).aget(event.pk)
+
+    row = tuple(getattr(event, f) for f in VALIDATOR_FIELDS)
+    validators = page_validators(request, [row], {event.pk: state})
+    if validators and (not_modified := validators.not_modified(request)):
+        return not_modified
 
     form = VolunteerApplicationForm()
-    return render(
+    response = render(
         request,
         "events/event_detail.html",
         {
             "event": event,
-            "liked": liked,
-            "application": application,
+            "liked": state.liked,
+            "application": state.application,
+            "can_withdraw": state.application is not None and state.application.status in WITHDRAWABLE_STATUSES,
             "form": form,
         },
     )
+    return validators.apply(response) if validators else response
 
 
 @login_required
 def apply_to_event(request: HttpRequest, pk: int) -> HttpResponse:
     event = get_object_or_404(Event, pk=pk)
 
-    # Если заявка уже есть — не создаём повторно
+    # Если заявка уже есть — не создаём повторно; отозванную можно подать снова
     existing = VolunteerApplication.objects.filter(user=request.user, event=event).first()
-    if existing:
+    if existing and existing.status != VolunteerApplication.Status.WITHDRAWN:
         messages.info(request, "Вы уже подали заявку на это мероприятие.")
         return redirect("event_detail", pk=event.pk)
 
@@ -75,8 +139,25 @@ def apply_to_event(request: HttpRequest, pk: int) -> HttpResponse:
             obj = form.save(commit=False)
             obj.user = request.user
             obj.event = event
-            obj.save()
-            messages.success(request, "Заявка отправлена! Ожидайте решения организатора.")
+            try:
+                # Место или лист ожидания — условным UPDATE без гонки (core.seats)
+                if existing:
+                    submitted = resubmit_application(obj)
+                else:
+                    submit_application(obj)
+                    submitted = True
+            except IntegrityError:
+                submitted = False
+            if not submitted:
+                messages.info(request, "Вы уже подали заявку на это мероприятие.")
+                return redirect("event_detail", pk=event.pk)
+            if obj.status == VolunteerApplication.Status.WAITLISTED:
+                messages.info(
+                    request,
+                    "Свободных мест нет — вы в листе ожидания. Как только место освободится, заявка уйдёт организатору.",
+                )
+            else:
+                messages.success(request, "Заявка отправлена! Ожидайте решения организатора.")
             return redirect("event_detail", pk=event.pk)
     else:
         form = VolunteerApplicationForm()
@@ -84,18 +165,47 @@ def apply_to_event(request: HttpRequest, pk: int) -> HttpResponse:
     return render(request, "events/apply.html", {"event": event, "form": form})
 
 
+# Отозвать можно заявку, по которой ещё не отказали
+WITHDRAWABLE_STATUSES = (
+    VolunteerApplication.Status.NEW,
+    VolunteerApplication.Status.APPROVED,
+    VolunteerApplication.Status.WAITLISTED,
+)
+
+
 @login_required
 @require_POST
-def toggle_like(request: HttpRequest, pk: int) -> HttpResponse:
-    event = get_object_or_404(Event, pk=pk)
-    like = EventLike.objects.filter(user=request.user, event=event).first()
-    if like:
-        like.delete()
-        messages.info(request, "Лайк убран.")
+def withdraw_application(request: HttpRequest, pk: int) -> HttpResponse:
+    application = get_object_or_404(VolunteerApplication, user=request.user, event_id=pk)
+    if application.status not in WITHDRAWABLE_STATUSES:
+        messages.info(request, "Эту заявку уже нельзя отозвать.")
     else:
-        EventLike.objects.create(user=request.user, event=event)
+        # Освободившееся место сразу получает первый из листа ожидания
+        change_status(application, VolunteerApplication.Status.WITHDRAWN)
+        messages.info(request, "Заявка отозвана.")
+    return redirect("event_detail", pk=pk)
+
+
+def _wants_json(request: HttpRequest) -> bool:
+    return request.get_preferred_type(["text/html", "application/json"]) == "application/json"
+
+
+@login_required
+@require_POST
+def toggle_like(request: HttpRequest, pk: int) -> HttpResponse:
+    # Без предварительного SELECT: одна запись (в Postgres — один запрос), см. core.likes
+    state = toggle_event_like(request.user.pk, pk)
+    if state is None:
+        raise Http404("Мероприятие не найдено")
+
+    if _wants_json(request):
+        return JsonResponse({"liked": state.liked, "likes_count": state.likes_count})
+
+    if state.liked:
         messages.success(request, "Спасибо за поддержку! Лайк добавлен.")
-    return redirect("event_detail", pk=event.pk)
+    else:
+        messages.info(request, "Лайк убран.")
+    return redirect("event_detail", pk=pk)
 
 
 def signup(request: HttpRequest) -> HttpResponse:
@@ -116,12 +226,31 @@ def signup(request: HttpRequest) -> HttpResponse:
 
 
 @login_required
-def my_dashboard(request: HttpRequest) -> HttpResponse:
-    applications = (
-        VolunteerApplication.objects
-        .select_related("event", "event__category")
+async def my_dashboard(request: HttpRequest) -> HttpResponse:
+    await _resolve_user(request)
+    applications = [
+        a
+        async for a in VolunteerApplication.objects.select_related("event", "event__category")
         .filter(user=request.user)
         .order_by("-created_at")
-    )
-    likes = EventLike.objects.select_related("event").filter(user=request.user).order_by("-created_at")
+    ]
+    likes = [
+        like async for like in EventLike.objects.select_related("event").filter(user=request.user).order_by("-created_at")
+    ]
     return render(request, "profile/dashboard.html", {"applications": applications, "likes": likes})
+
+
+def _metrics_token_ok(request: HttpRequest) -> bool:
+    token = settings.METRICS_TOKEN
+    header = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(header, f"Bearer {token}")
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Метрики всех процессов в формате Prometheus. Доступ: staff или METRICS_TOKEN."""
+    if not (request.user.is_authenticated and request.user.is_staff) and not _metrics_token_ok(request):
+        return HttpResponse("Forbidden", status=403)
+    return HttpResponse(
+        render_prometheus(get_registry().collect()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Event, EventLike, VolunteerApplication
+from core.pagination import EstimatedCountPaginator, estimated_row_count
+from .utils import create_category, create_user
+
+
+class LargeTableAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_user(username="admin", is_staff=True, is_superuser=True)
+        category = create_category()
+        base = timezone.now()
+        cls.events = [
+            Event.objects.create(
+                category=category,
+                title=f"Мероприятие {i}",
+                description="d",
+                event_date=base + timedelta(days=i),
+                location="loc",
+            )
+            for i in range(5)
+        ]
+        users = [create_user(username=f"u{i}") for i in range(3)]
+        EventLike.objects.bulk_create([EventLike(user=u, event=e) for u in users for e in cls.events])
+        VolunteerApplication.objects.create(user=users[0], event=cls.events[1], motivation="m")
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def test_estimated_row_count(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("sqlite_stat1")
+        self.assertIsNone(estimated_row_count(EventLike.objects.all()))  # ANALYZE ещё не было
+        self._analyze()
+        self.assertEqual(estimated_row_count(EventLike.objects.all()), 15)
+        self.assertIsNone(estimated_row_count(EventLike.objects.filter(user__username="u1")))
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=10)
+    def test_paginator_uses_estimate_above_threshold(self):
+        self._analyze()
+        with CaptureQueriesContext(connection) as ctx:
+            count = EstimatedCountPaginator(EventLike.objects.order_by("-pk"), 5).count
+        self.assertEqual(count, 15)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in ctx.captured_queries))
+
+        with override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=100):
+            self.assertEqual(EstimatedCountPaginator(EventLike.objects.order_by("-pk"), 5).count, 15)
+        filtered = EventLike.objects.filter(event=self.events[0]).order_by("-pk")
+        self.assertEqual(EstimatedCountPaginator(filtered, 5).count, 3)
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=10)
+    def test_like_changelist_without_count(self):
+        self._analyze()
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("admin:core_eventlike_changelist"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in ctx.captured_queries))
+        # user и event — JOIN-ом в том же запросе, без запроса на строку
+        [rows_sql] = [q["sql"] for q in ctx.captured_queries if 'FROM "core_eventlike"' in q["sql"]]
+        self.assertIn('"auth_user"', rows_sql)
+        self.assertIn('"core_event"', rows_sql)
+
+    def test_list_select_related_from_list_display(self):
+        request = RequestFactory().get("/")
+        request.user = self.staff
+        registry = admin.site._registry
+        self.assertEqual(registry[EventLike].get_list_select_related(request), ("user", "event"))
+        self.assertEqual(
+            registry[VolunteerApplication].get_list_select_related(request), ("user", "event", "decided_by")
+        )
+        self.assertEqual(admin.site._registry[Event].get_list_select_related(request), ("category",))
+
+    @override_settings(ADMIN_EVENT_FILTER_LIMIT=2)
+    def test_event_filter_is_bounded(self):
+        url = reverse("admin:core_volunteerapplication_changelist")
+        resp = self.client.get(url)
+        self.assertContains(resp, "Мероприятие 4")
+        self.assertContains(resp, "Мероприятие 3")
+        self.assertNotContains(resp, "Мероприятие 0")
+
+        # выбранное старое мероприятие попадает в список и фильтрует
+        resp = self.client.get(url, {"event": self.events[0].pk})
+        self.assertContains(resp, "Мероприятие 0")
+        self.assertEqual(resp.context["cl"].result_count, 0)
+        resp = self.client.get(url, {"event": self.events[1].pk})
+        self.assertEqual(resp.context["cl"].result_count, 1)
+
+        self.assertEqual(self.client.get(url, {"event": "abc"}).status_code, 302)
+
+    def test_fk_widgets_are_autocomplete(self):
+        resp = self.client.get(reverse("admin:core_volunteerapplication_add"))
+        form = resp.context["adminform"].form
+        for name in ("user", "event"):
+            self.assertIsInstance(form.fields[name].widget.widget, AutocompleteSelect)
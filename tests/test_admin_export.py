@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import csv
+import gzip
 import io
+import json
 
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.admin.utils import label_for_field
 
@@ -11,7 +17,8 @@ from openpyxl import load_workbook
 from django.contrib import admin
 
 from core.admin import CategoryAdmin, EventAdmin
-from core.models import Category, Event
+from core.exports import compile_export_columns, iter_admin_rows
+from core.models import Category, Event, EventLike, VolunteerApplication
 from .utils import create_category, create_event, create_user
 
 
@@ -43,7 +50,7 @@ class AdminExportXlsxTests(TestCase):
         )
         self.assertIn("attachment; filename=", resp["Content-Disposition"])
 
-        wb = load_workbook(io.BytesIO(resp.content))
+        wb = load_workbook(io.BytesIO(b"".join(resp.streaming_content)))
         self.assertIn("Category", wb.sheetnames)
         self.assertIn("Event", wb.sheetnames)
 
@@ -56,10 +63,110 @@ class AdminExportXlsxTests(TestCase):
 
         ws_event = wb["Event"]
         event_admin = EventAdmin(Event, admin.site)
-        expected_event_headers = [label_for_field(f, Event, event_admin) for f in ("id", "title", "category", "event_date", "location", "created_at")]
+        expected_event_headers = [label_for_field(f, Event, event_admin) for f in ("id", "title", "category", "event_date", "location", "capacity", "seats_taken", "created_at")]
         actual_event_headers = [cell.value for cell in next(ws_event.iter_rows(min_row=1, max_row=1))]
         self.assertEqual(actual_event_headers, expected_event_headers)
 
         # Проверяем, что выгрузились строки с данными (минимум 1 строка + header)
         self.assertGreaterEqual(ws_cat.max_row, 2)
         self.assertGreaterEqual(ws_event.max_row, 2)
+
+    @override_settings(EXPORT_CHUNK_SIZE=1000)
+    def test_export_streams_all_rows_without_cap(self):
+        Category.objects.bulk_create(Category(name=f"Кат {i}") for i in range(5100))
+        self.client.login(username=self.admin.username, password=self.super_password)
+
+        resp = self.client.post(reverse("admin:export_xlsx"), data={"models": ["core.Category"]})
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+
+        wb = load_workbook(io.BytesIO(b"".join(resp.streaming_content)), read_only=True)
+        ws = wb["Category"]
+        # header + все строки, без прежнего среза [:5000]
+        self.assertEqual(sum(1 for _ in ws.iter_rows()), Category.objects.count() + 1)
+
+
+class CompiledExportColumnsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user(username="admin", is_staff=True, is_superuser=True)
+        cls.event = create_event(title="Колонки")
+
+    def _request(self):
+        request = RequestFactory().get("/admin/")
+        request.user = self.admin
+        return request
+
+    def _export_queries(self, model) -> tuple[int, list[list]]:
+        model_admin = admin.site._registry[model]
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(iter_admin_rows(self._request(), model_admin))
+        return len(ctx.captured_queries), rows
+
+    def test_fk_columns_are_select_related(self):
+        columns = compile_export_columns(self._request(), admin.site._registry[VolunteerApplication])
+        self.assertEqual([c.related_path for c in columns], [None, "user", "event", None, None, "decided_by", None])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        users = get_user_model().objects.bulk_create(get_user_model()(username=f"exp{i}") for i in range(20))
+        VolunteerApplication.objects.create(user=users[0], event=self.event, motivation="m")
+        EventLike.objects.create(user=users[0], event=self.event)
+        small_apps, _ = self._export_queries(VolunteerApplication)
+        small_likes, _ = self._export_queries(EventLike)
+
+        VolunteerApplication.objects.bulk_create(
+            VolunteerApplication(user=u, event=self.event, motivation="m") for u in users[1:]
+        )
+        EventLike.objects.bulk_create(EventLike(user=u, event=self.event) for u in users[1:])
+        big_apps, rows = self._export_queries(VolunteerApplication)
+        big_likes, _ = self._export_queries(EventLike)
+
+        self.assertEqual(big_apps, small_apps)
+        self.assertEqual(big_likes, small_likes)
+        self.assertEqual(len(rows), 20)
+        # значения как в админке: FK -> str(), choices -> сырое значение
+        self.assertEqual(rows[0][1:4], [users[0].username, "Колонки", "new"])
+
+
+class AdminExportStreamingFormatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.password = "adminpass12345"
+        cls.admin = create_user(username="admin", password=cls.password, is_staff=True, is_superuser=True)
+        cls.user = create_user(username="volunteer")
+        cls.event = create_event(title="Поток")
+        VolunteerApplication.objects.create(user=cls.user, event=cls.event, motivation="m")
+
+    def setUp(self):
+        self.client.login(username=self.admin.username, password=self.password)
+
+    def _post(self, **data):
+        return self.client.post(reverse("admin:export_xlsx"), data=data)
+
+    def test_csv_streams_list_display_columns(self):
+        resp = self._post(models=["core.VolunteerApplication"], format="csv")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertIn('filename="export.csv"', resp["Content-Disposition"])
+
+        rows = list(csv.reader(io.StringIO(b"".join(resp.streaming_content).decode("utf-8"))))
+        model_admin = admin.site._registry[VolunteerApplication]
+        expected_headers = [str(label_for_field(f, VolunteerApplication, model_admin)) for f in model_admin.list_display]
+        self.assertEqual(rows[0], expected_headers)
+        self.assertEqual(rows[1][1:4], ["volunteer", "Поток", "new"])
+
+    def test_ndjson_gzip_has_one_object_per_row(self):
+        resp = self._post(models=["core.Event", "core.VolunteerApplication"], format="ndjson", compress="on")
+        self.assertEqual(resp["Content-Type"], "application/gzip")
+        self.assertIn('filename="export.ndjson.gz"', resp["Content-Disposition"])
+
+        lines = gzip.decompress(b"".join(resp.streaming_content)).decode("utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([r["model"] for r in records], ["core.Event", "core.VolunteerApplication"])
+        self.assertEqual(records[1]["user"], "volunteer")
+        self.assertEqual(records[1]["id"], VolunteerApplication.objects.get().pk)
+
+    def test_csv_rejects_several_tables(self):
+        resp = self._post(models=["core.Category", "core.Event"], format="csv")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("models", resp.context["form"].errors)
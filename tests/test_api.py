@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.api import EVENT_FIELDS
+from core.counters import bump_event_counters
+from core.models import Event
+from .utils import create_category
+
+
+class EventApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.animals = create_category("Помощь животным")
+        cls.ecology = create_category("Экология")
+        base = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0) + timedelta(days=10)
+        cls.base = base
+        for i in range(5):
+            Event.objects.create(
+                category=cls.animals if i % 2 else cls.ecology,
+                title=f"Событие {i}",
+                description="Описание",
+                event_date=base + timedelta(days=i),
+                location="Парк",
+            )
+        cls.expected = list(Event.objects.order_by("-event_date", "-pk").values_list("pk", flat=True))
+        bump_event_counters(cls.expected[0], likes=3, applications=2)
+
+    def get(self, name, params=None, *args, **headers):
+        return self.client.get(reverse(name, args=args), params or {}, **headers)
+
+    def test_list_default_fields_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.get("api_event_list")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        first = resp.json()["results"][0]
+        self.assertEqual(set(first), set(EVENT_FIELDS))
+        self.assertEqual(first["id"], self.expected[0])
+        self.assertEqual((first["likes_count"], first["applications_count"]), (3, 2))
+        self.assertEqual(first["category_name"], "Экология")
+        self.assertIsNone(first["image"])
+
+    def test_sparse_fields_only_selected(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.get("api_event_list", {"fields": "title,likes_count"})
+        self.assertEqual(set(resp.json()["results"][0]), {"title", "likes_count"})
+        sql = ctx.captured_queries[0]["sql"]
+        self.assertNotIn("description", sql)
+        self.assertNotIn("core_category", sql)
+
+    def test_unknown_field_400(self):
+        resp = self.get("api_event_list", {"fields": "title,password"})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("password", resp.json()["error"])
+
+    def test_empty_field_selection_400(self):
+        self.assertEqual(self.get("api_event_list", {"fields": ","}).status_code, 400)
+        self.assertEqual(self.get("api_category_list", {"fields": " , "}).status_code, 400)
+
+    @override_settings(API_PAGE_SIZE=2)
+    def test_cursor_walks_all_pages(self):
+        seen, url, params = [], reverse("api_event_list"), {"fields": "id"}
+        while url:
+            data = self.client.get(url, params).json()
+            seen += [row["id"] for row in data["results"]]
+            url, params = data["next"], None
+        self.assertEqual(seen, self.expected)
+
+        second = self.get("api_event_list", {"fields": "id", "limit": 2})
+        third = self.client.get(second.json()["next"]).json()
+        back = self.client.get(third["previous"]).json()
+        self.assertEqual([r["id"] for r in back["results"]], self.expected[:2])
+
+    def test_filters(self):
+        resp = self.get("api_event_list", {"category": str(self.animals.pk), "fields": "id,category"})
+        self.assertEqual({r["category"] for r in resp.json()["results"]}, {self.animals.pk})
+
+        day = (self.base + timedelta(days=1)).date().isoformat()
+        resp = self.get("api_event_list", {"date_from": day, "date_to": day, "fields": "id"})
+        self.assertEqual([r["id"] for r in resp.json()["results"]], [self.expected[3]])
+
+        self.assertEqual(self.get("api_event_list", {"date_from": "завтра"}).status_code, 400)
+        self.assertEqual(self.get("api_event_list", {"category": "x"}).status_code, 400)
+        self.assertEqual(self.get("api_event_list", {"category": "99999999999999999999999"}).status_code, 400)
+
+    def test_detail(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.get("api_event_detail", {"fields": "title,applications_count"}, self.expected[0])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(resp.json(), {"title": "Событие 4", "applications_count": 2})
+        self.assertEqual(self.get("api_event_detail", None, 999999).status_code, 404)
+
+    def test_categories_with_counts(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.get("api_category_list")
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(
+            resp.json()["results"],
+            [
+                {"id": self.animals.pk, "name": "Помощь животным", "events_count": 2},
+                {"id": self.ecology.pk, "name": "Экология", "events_count": 3},
+            ],
+        )
+
+    def test_cache_headers_and_304(self):
+        resp = self.get("api_event_list")
+        self.assertIn("public", resp.headers["Cache-Control"])
+        self.assertIn("max-age=", resp.headers["Cache-Control"])
+        self.assertNotIn("Cookie", resp.headers.get("Vary", ""))
+
+        again = self.get("api_event_list", None, HTTP_IF_NONE_MATCH=resp.headers["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+        bump_event_counters(self.expected[0], likes=1)
+        changed = self.get("api_event_list", None, HTTP_IF_NONE_MATCH=resp.headers["ETag"])
+        self.assertEqual(changed.status_code, 200)
+
+    def test_read_only(self):
+        self.assertEqual(self.client.post(reverse("api_event_list")).status_code, 405)
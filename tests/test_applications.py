@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from django.contrib.admin import helpers
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.applications import decide_applications
+from core.models import VolunteerApplication
+from .utils import create_category, create_event, create_user
+
+Status = VolunteerApplication.Status
+
+
+class ApplicationsTestData:
+    """5 новых заявок на фестиваль и 2 — на субботник."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_user(username="organiser", is_staff=True, is_superuser=True)
+        category = create_category()
+        cls.festival = create_event(category=category, title="Городской фестиваль")
+        cls.other = create_event(category=category, title="Субботник")
+        users = [create_user(username=f"v{i}") for i in range(7)]
+        VolunteerApplication.objects.bulk_create(
+            [VolunteerApplication(user=u, event=cls.festival, motivation="m") for u in users[:5]]
+            + [VolunteerApplication(user=u, event=cls.other, motivation="m") for u in users[5:]]
+        )
+
+
+class DecideApplicationsTests(ApplicationsTestData, TestCase):
+    def test_set_based_batches(self):
+        queryset = VolunteerApplication.objects.filter(event=self.festival)
+        with CaptureQueriesContext(connection) as ctx:
+            changed = decide_applications(queryset, Status.APPROVED, self.staff, batch_size=2)
+        self.assertEqual(changed, 5)
+        sqls = [q["sql"] for q in ctx.captured_queries]
+        updates = [sql for sql in sqls if sql.startswith('UPDATE "core_volunteerapplication"')]
+        self.assertEqual(len(updates), 3)  # 2 + 2 + 1
+        # заявки в Python не читаются: SELECT-ы — id мероприятий, блокировки и подсчёт мест (core.seats)
+        self.assertFalse(any(sql.startswith('SELECT "core_volunteerapplication"."id"') for sql in sqls))
+
+        approved = VolunteerApplication.objects.filter(event=self.festival)
+        self.assertEqual(set(approved.values_list("status", "decided_by")), {(Status.APPROVED, self.staff.pk)})
+        self.assertFalse(approved.filter(decided_at=None).exists())
+        self.assertFalse(VolunteerApplication.objects.filter(event=self.other).exclude(status=Status.NEW).exists())
+
+    def test_already_decided_untouched(self):
+        first = VolunteerApplication.objects.filter(event=self.festival).order_by("pk").first()
+        decide_applications(VolunteerApplication.objects.filter(pk=first.pk), Status.REJECTED, None)
+        before = VolunteerApplication.objects.get(pk=first.pk)
+
+        changed = decide_applications(VolunteerApplication.objects.all(), Status.REJECTED, self.staff)
+        self.assertEqual(changed, 6)
+        after = VolunteerApplication.objects.get(pk=first.pk)
+        self.assertEqual((after.decided_by_id, after.decided_at), (None, before.decided_at))
+
+    def test_unknown_status(self):
+        with self.assertRaises(ValueError):
+            decide_applications(VolunteerApplication.objects.all(), "maybe", self.staff)
+
+
+class ApplicationAdminDecisionTests(ApplicationsTestData, TestCase):
+    def setUp(self):
+        self.client.force_login(self.staff)
+        self.url = reverse("admin:core_volunteerapplication_changelist")
+
+    def test_action_on_selected(self):
+        pks = list(VolunteerApplication.objects.filter(event=self.festival).values_list("pk", flat=True)[:2])
+        resp = self.client.post(
+            self.url, {"action": "reject_applications", helpers.ACTION_CHECKBOX_NAME: pks}, follow=True
+        )
+        self.assertContains(resp, "заявкам: 2")
+        self.assertEqual(
+            set(VolunteerApplication.objects.filter(status=Status.REJECTED).values_list("pk", flat=True)), set(pks)
+        )
+
+    def test_action_on_all_matching_filter(self):
+        resp = self.client.post(
+            f"{self.url}?event={self.festival.pk}",
+            {
+                "action": "approve_applications",
+                "select_across": "1",
+                helpers.ACTION_CHECKBOX_NAME: [VolunteerApplication.objects.first().pk],
+            },
+        )
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(VolunteerApplication.objects.filter(status=Status.APPROVED).count(), 5)
+        self.assertFalse(VolunteerApplication.objects.filter(event=self.other, status=Status.APPROVED).exists())
+
+    def test_change_form_records_decision(self):
+        app = VolunteerApplication.objects.filter(event=self.other).first()
+        resp = self.client.post(
+            reverse("admin:core_volunteerapplication_change", args=[app.pk]),
+            {"user": app.user_id, "event": app.event_id, "motivation": app.motivation, "status": Status.APPROVED},
+        )
+        self.assertEqual(resp.status_code, 302)
+        app.refresh_from_db()
+        self.assertEqual((app.status, app.decided_by_id), (Status.APPROVED, self.staff.pk))
+        self.assertIsNotNone(app.decided_at)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import io
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.http import FileResponse, HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from core.async_support import ASYNC_FILE_BLOCK_SIZE, AsyncStreamingMiddleware, AsyncWhiteNoiseMiddleware
+from core.models import EventLike, VolunteerApplication
+from .utils import create_event, create_user
+
+
+class AsyncViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(username="async_user")
+        cls.event = create_event(title="Асинхронный субботник")
+        VolunteerApplication.objects.create(user=cls.user, event=cls.event, motivation="Хочу помочь")
+        EventLike.objects.create(user=cls.user, event=cls.event)
+
+    async def test_event_list_and_detail(self):
+        resp = await self.async_client.get(reverse("event_list"))
+        self.assertContains(resp, "Асинхронный субботник")
+        resp = await self.async_client.get(reverse("event_detail", args=[self.event.pk]))
+        self.assertContains(resp, "Асинхронный субботник")
+        resp = await self.async_client.get(reverse("event_detail", args=[self.event.pk + 1000]))
+        self.assertEqual(resp.status_code, 404)
+
+    async def test_user_state_and_conditional_get(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse("event_detail", args=[self.event.pk])
+        resp = await self.async_client.get(url)
+        self.assertContains(resp, "Отозвать заявку")
+        resp = await self.async_client.get(url, headers={"if-none-match": resp["ETag"]})
+        self.assertEqual(resp.status_code, 304)
+
+    async def test_dashboard(self):
+        resp = await self.async_client.get(reverse("my_dashboard"))
+        self.assertEqual(resp.status_code, 302)
+        await self.async_client.aforce_login(self.user)
+        resp = await self.async_client.get(reverse("my_dashboard"))
+        self.assertContains(resp, "Асинхронный субботник", count=2)
+
+
+class AsyncChainTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_user(username="async_admin", is_staff=True, is_superuser=True)
+
+    def test_middleware_is_async_capable(self):
+        for path in settings.MIDDLEWARE:
+            self.assertTrue(getattr(import_string(path), "async_capable", False), path)
+        # ни одна middleware не переводит цепочку в поток (о переходе Django пишет только при DEBUG)
+        with override_settings(DEBUG=True), self.assertNoLogs("django.request", "DEBUG"):
+            ASGIHandler()
+
+    async def test_metrics_count_async_queries(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(METRICS_DIR=tmp, METRICS_FLUSH_INTERVAL=3600):
+            await self.async_client.get(reverse("event_list"))
+            await self.async_client.aforce_login(self.staff)
+            text = (await self.async_client.get(reverse("metrics"))).content.decode()
+        match = re.search(r'^volunteer_db_queries_total\{view="event_list"\} (\d+)', text, re.M)
+        self.assertIsNotNone(match)
+        self.assertGreater(int(match.group(1)), 0)
+
+    async def test_streaming_export_is_not_buffered(self):
+        await self.async_client.aforce_login(self.staff)
+        resp = await self.async_client.post(
+            reverse("admin:export_xlsx"), {"models": ["core.Category"], "format": "csv"}
+        )
+        self.assertEqual(resp.status_code, 200)
+        # async-итератор: Django не читает sync-итератор целиком через sync_to_async(list)
+        self.assertTrue(resp.is_async)
+        body = b"".join([chunk async for chunk in resp.streaming_content])
+        self.assertIn("Название", body.decode("utf-8"))
+
+    async def test_file_response_is_read_in_large_blocks(self):
+        async def get_response(request):
+            return FileResponse(io.BytesIO(b"x" * 10))
+
+        response = await AsyncStreamingMiddleware(get_response)(RequestFactory().get("/"))
+        self.assertEqual(response.block_size, ASYNC_FILE_BLOCK_SIZE)
+        self.assertEqual(b"".join([chunk async for chunk in response.streaming_content]), b"x" * 10)
+
+    async def test_whitenoise_serves_static_without_thread(self):
+        async def get_response(request):
+            return HttpResponse("view")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "site.css").write_text("body{}", encoding="utf-8")
+            with override_settings(STATIC_ROOT=tmp, STATICFILES_STORAGE=None):
+                middleware = AsyncWhiteNoiseMiddleware(get_response)
+            factory = RequestFactory()
+            static = await middleware(factory.get("/static/site.css"))
+            other = await middleware(factory.get("/events/"))
+        self.assertEqual(static.status_code, 200)
+        self.assertEqual(b"".join(static.streaming_content), b"body{}")
+        self.assertEqual(other.content, b"view")
+
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from core.bench import connection_mode, percentile
+from core.models import EventLike
+from .utils import create_event, create_user
+
+
+class BenchCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(username="bench")
+        create_user(username="bench_staff", is_staff=True, is_superuser=True)
+        cls.event = create_event(title="Замер")
+        EventLike.objects.create(user=cls.user, event=cls.event)
+
+    def test_percentile(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertAlmostEqual(percentile(values, 50), 50.5)
+        self.assertAlmostEqual(percentile(values, 99), 99.01)
+        self.assertEqual(percentile([3.0], 95), 3.0)
+
+    def test_bench_writes_json_and_compares(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench.json"
+            out = StringIO()
+            call_command("bench", "--iterations", "2", "--warmup", "0", "--json", str(path), stdout=out)
+
+            report = json.loads(path.read_text(encoding="utf-8"))
+            self.assertEqual(report["meta"]["rows"]["events"], 1)
+            self.assertEqual(
+                set(report["results"]),
+                {"event_list", "event_list_search", "event_detail", "my_dashboard", "export_xlsx"},
+            )
+            for summary in report["results"].values():
+                self.assertEqual(summary["iterations"], 2)
+                self.assertGreater(summary["queries"], 0)
+                self.assertGreater(summary["bytes"], 0)
+
+            out = StringIO()
+            call_command("bench", "--views", "event_list", "--iterations", "1", "--compare", str(path), stdout=out)
+            self.assertIn("event_list", out.getvalue())
+            self.assertIn("p95_ms", out.getvalue())
+
+    def test_connection_modes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench.json"
+            out = StringIO()
+            call_command(
+                "bench",
+                "--views",
+                "event_detail",
+                "--iterations",
+                "2",
+                "--warmup",
+                "0",
+                "--connections",
+                "direct,persistent,pool",
+                "--json",
+                str(path),
+                stdout=out,
+            )
+            report = json.loads(path.read_text(encoding="utf-8"))
+        # пул — только у PostgreSQL, тесты идут на SQLite
+        self.assertIn("pool: пул соединений есть только у PostgreSQL", out.getvalue())
+        self.assertEqual(report["meta"]["connections"], ["direct", "persistent"])
+        self.assertEqual(set(report["results"]), {"event_detail[direct]", "event_detail[persistent]"})
+        self.assertEqual(connection.settings_dict["CONN_MAX_AGE"], settings.DATABASES["default"]["CONN_MAX_AGE"])
+
+    def test_connection_mode_switches_settings(self):
+        with connection_mode("direct"):
+            self.assertEqual(connection.settings_dict["CONN_MAX_AGE"], 0)
+        with connection_mode("persistent"):
+            self.assertGreater(connection.settings_dict["CONN_MAX_AGE"], 0)
+        with self.assertRaises(ValueError):
+            with connection_mode("pool"):
+                pass
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+
+from django.contrib.messages import constants, get_messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from core.counters import bump_event_counters
+from core.fragments import card_cache
+from core.models import Category, Event
+from .utils import create_event, create_user
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(username="user", password="pass12345")
+        cls.other = create_user(username="other", password="pass12345")
+        cls.event = create_event(title="Субботник")
+
+    def setUp(self):
+        card_cache().clear()
+
+    def _revalidate(self, url, response, **params):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+
+    def test_event_list_anonymous_304(self):
+        url = reverse("event_list")
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.headers["ETag"].startswith('W/"'))
+        # у списка — только ETag (core.conditional)
+        self.assertNotIn("Last-Modified", first.headers)
+        self.assertIn("no-cache", first.headers["Cache-Control"])
+        self.assertIn("private", first.headers["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = self._revalidate(url, first)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+        self.assertEqual(second.headers["ETag"], first.headers["ETag"])
+        # 304 — без выборки карточек: только (id, updated_at, счётчики) страницы
+        self.assertEqual(len(ctx.captured_queries), 1, [q["sql"] for q in ctx.captured_queries])
+
+    def test_event_detail_logged_in_304(self):
+        self.client.force_login(self.user)
+        url = reverse("event_detail", args=[self.event.pk])
+        first = self.client.get(url)
+        second = self._revalidate(url, first)
+        self.assertEqual(second.status_code, 304)
+
+    def test_if_modified_since(self):
+        url = reverse("event_detail", args=[self.event.pk])
+        first = self.client.get(url)
+        second = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first.headers["Last-Modified"])
+        self.assertEqual(second.status_code, 304)
+
+    def test_list_ignores_if_modified_since_after_delete(self):
+        older = create_event(category=self.event.category, title="Старое мероприятие", days_from_now=10)
+        Event.objects.filter(pk=older.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        url = reverse("event_list")
+        since = http_date(time.time())
+        self.event.delete()
+        # на месте удалённого — более старое мероприятие: по дате «не изменилось», но список другой
+        resp = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Старое мероприятие")
+
+    def test_search_and_pages_have_own_etags(self):
+        url = reverse("event_list")
+        plain = self.client.get(url)
+        search = self.client.get(url, {"q": "Субботник"})
+        self.assertEqual(search.status_code, 200)
+        self.assertNotEqual(plain.headers["ETag"], search.headers["ETag"])
+        self.assertEqual(self._revalidate(url, search, q="Субботник").status_code, 304)
+
+    def test_etag_changes_after_like(self):
+        self.client.force_login(self.user)
+        url = reverse("event_detail", args=[self.event.pk])
+        first = self.client.get(url)
+        self.client.post(reverse("toggle_like", args=[self.event.pk]), HTTP_ACCEPT="application/json")
+        second = self._revalidate(url, first)
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.headers["ETag"], first.headers["ETag"])
+
+    def test_etag_changes_after_counter_bump(self):
+        url = reverse("event_list")
+        first = self.client.get(url)
+        bump_event_counters(self.event.pk, applications=1)
+        self.assertEqual(self._revalidate(url, first).status_code, 200)
+
+    def test_etag_changes_after_category_rename(self):
+        url = reverse("event_detail", args=[self.event.pk])
+        first = self.client.get(url)
+        category = Category.objects.get(pk=self.event.category_id)
+        category.name = "Экология"
+        category.save()
+        second = self._revalidate(url, first)
+        self.assertEqual(second.status_code, 200)
+        self.assertContains(second, "Экология")
+
+    def test_etag_differs_per_user(self):
+        url = reverse("event_list")
+        anonymous = self.client.get(url)
+        self.client.force_login(self.user)
+        user = self.client.get(url)
+        self.client.force_login(self.other)
+        other = self.client.get(url)
+        self.assertEqual(len({anonymous.headers["ETag"], user.headers["ETag"], other.headers["ETag"]}), 3)
+        # чужой ETag не подходит
+        self.assertEqual(self._revalidate(url, user).status_code, 200)
+
+    def test_no_etag_with_pending_messages(self):
+        url = reverse("event_list")
+        first = self.client.get(url)
+        # сообщение в cookie, как после редиректа с формы
+        request = first.wsgi_request
+        storage = CookieStorage(request)
+        storage.add(constants.SUCCESS, "Заявка отправлена")
+        storage.update(first)
+        self.client.cookies.update(first.cookies)
+
+        second = self._revalidate(url, first)
+        self.assertEqual(second.status_code, 200)
+        self.assertNotIn("ETag", second.headers)
+        self.assertEqual([str(m) for m in get_messages(second.wsgi_request)], ["Заявка отправлена"])
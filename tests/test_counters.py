@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from io import StringIO
+
+from django.contrib.admin.sites import site
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from core.counters import bump_event_counters, find_counter_drift
+from core.models import Event, EventLike, VolunteerApplication
+from core.seats import submit_application
+from .utils import create_event, create_user
+
+
+class EventCountersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.password = "pass12345"
+        cls.user = create_user(username="counter", password=cls.password)
+        cls.event = create_event(title="Счётчики")
+
+    def _counts(self) -> tuple[int, int]:
+        self.event.refresh_from_db()
+        return self.event.likes_count, self.event.applications_count
+
+    def test_toggle_like_updates_counter(self):
+        self.client.login(username=self.user.username, password=self.password)
+
+        self.client.post(reverse("toggle_like", args=[self.event.pk]))
+        self.assertEqual(self._counts(), (1, 0))
+
+        self.client.post(reverse("toggle_like", args=[self.event.pk]))
+        self.assertEqual(self._counts(), (0, 0))
+
+    def test_apply_updates_counter_once(self):
+        self.client.login(username=self.user.username, password=self.password)
+        url = reverse("apply_to_event", args=[self.event.pk])
+
+        self.client.post(url, data={"motivation": "1"})
+        self.client.post(url, data={"motivation": "2"})  # дубль не считается
+        self.assertEqual(self._counts(), (0, 1))
+
+    def test_admin_deletes_decrement_counters(self):
+        other = create_user(username="counter2")
+        like1 = EventLike.objects.create(user=self.user, event=self.event)
+        EventLike.objects.create(user=other, event=self.event)
+        VolunteerApplication.objects.create(user=self.user, event=self.event, motivation="m")
+        call_command("recount_counters", stdout=StringIO())
+        self.assertEqual(self._counts(), (2, 1))
+
+        request = RequestFactory().post("/")
+        site._registry[EventLike].delete_model(request, like1)
+        self.assertEqual(self._counts(), (1, 1))
+
+        site._registry[VolunteerApplication].delete_queryset(request, VolunteerApplication.objects.all())
+        self.assertEqual(self._counts(), (1, 0))
+
+    def test_user_delete_cascade_decrements_counters(self):
+        Event.objects.filter(pk=self.event.pk).update(capacity=1)
+        other = create_user(username="waiting")
+        EventLike.objects.create(user=self.user, event=self.event)
+        mine = submit_application(VolunteerApplication(user=self.user, event=self.event, motivation="m"))
+        queued = submit_application(VolunteerApplication(user=other, event=self.event, motivation="m"))
+        bump_event_counters(self.event.pk, likes=1)
+        self.assertEqual((mine.status, queued.status), ("new", "waitlisted"))
+
+        self.user.delete()
+        self.assertEqual(self._counts(), (0, 1))
+        self.assertEqual(self.event.seats_taken, 1)
+        self.assertEqual(VolunteerApplication.objects.get(pk=queued.pk).status, VolunteerApplication.Status.NEW)
+        self.assertFalse(find_counter_drift().exists())
+
+    def test_recount_command_checks_and_fixes_drift(self):
+        EventLike.objects.create(user=self.user, event=self.event)  # в обход счётчика
+
+        with self.assertRaises(CommandError):
+            call_command("recount_counters", "--check", stdout=StringIO())
+
+        call_command("recount_counters", stdout=StringIO())
+        self.assertEqual(self._counts(), (1, 0))
+        call_command("recount_counters", "--check", stdout=StringIO())
+
+    def test_event_list_reads_counter_columns(self):
+        Event.objects.filter(pk=self.event.pk).update(likes_count=7, applications_count=3)
+        resp = self.client.get(reverse("event_list"))
+        event = next(e for e in resp.context["page"] if e.pk == self.event.pk)
+        self.assertEqual((event.likes_count, event.applications_count), (7, 3))
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from openpyxl import load_workbook
+
+from core.models import ExportJob
+from .utils import create_category, create_event, create_user
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="export-jobs-")
+EXPORT_ROOT = tempfile.mkdtemp(prefix="export-jobs-private-")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, EXPORT_ROOT=EXPORT_ROOT)
+class ExportJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.password = "adminpass12345"
+        cls.admin = create_user(username="jobadmin", password=cls.password, is_staff=True, is_superuser=True)
+        cat = create_category("Фон")
+        create_event(category=cat, title="Фоновое событие")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(EXPORT_ROOT, ignore_errors=True)
+
+    def test_background_export_is_queued_processed_and_downloadable(self):
+        self.client.login(username=self.admin.username, password=self.password)
+        url = reverse("admin:export_xlsx")
+
+        resp = self.client.post(url, data={"models": ["core.Category", "core.Event"], "background": "on"})
+        self.assertRedirects(resp, url)
+        job = ExportJob.objects.get()
+        self.assertEqual(job.status, ExportJob.Status.QUEUED)
+        self.assertEqual(job.model_labels, ["core.Category", "core.Event"])
+
+        call_command("run_export_jobs", "--once", stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.Status.DONE, job.error)
+        self.assertEqual(job.rows_done, job.rows_total)
+        self.assertEqual(job.progress, 100)
+        self.assertTrue(job.file.name.startswith("exports/"))
+        # вне MEDIA_ROOT и не по номеру задачи: /media/exports/export-1.xlsx не существует
+        self.assertTrue(job.file.path.startswith(EXPORT_ROOT))
+        self.assertNotEqual(job.file.name, f"exports/export-{job.pk}.xlsx")
+        with self.assertRaises(ValueError):
+            job.file.url
+
+        page = self.client.get(url)
+        download_url = reverse("admin:export_job_download", args=[job.pk])
+        self.assertContains(page, download_url)
+
+        resp = self.client.get(download_url)
+        self.assertEqual(resp.status_code, 200)
+        wb = load_workbook(io.BytesIO(b"".join(resp.streaming_content)))
+        self.assertEqual(wb.sheetnames, ["Category", "Event"])
+
+    def test_background_ndjson_export(self):
+        job = ExportJob.objects.create(
+            created_by=self.admin, model_labels=["core.Event"], export_format="ndjson", compress=True
+        )
+        call_command("run_export_jobs", "--once", stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.Status.DONE, job.error)
+        self.assertTrue(job.file.name.endswith(".ndjson.gz"))
+
+        with job.file.open("rb") as fh:
+            lines = gzip.decompress(fh.read()).decode("utf-8").splitlines()
+        self.assertEqual(json.loads(lines[0])["title"], "Фоновое событие")
+
+    def test_download_is_limited_to_author(self):
+        job = ExportJob.objects.create(created_by=self.admin, model_labels=["core.Category"])
+        call_command("run_export_jobs", "--once", stdout=StringIO())
+
+        other_password = "otherpass12345"
+        other = create_user(username="otherstaff", password=other_password, is_staff=True)
+        self.client.login(username=other.username, password=other_password)
+        resp = self.client.get(reverse("admin:export_job_download", args=[job.pk]))
+        self.assertEqual(resp.status_code, 403)
+
+    def test_job_of_non_staff_author_fails(self):
+        user = create_user(username="plain")
+        job = ExportJob.objects.create(created_by=user, model_labels=["core.Category"])
+        with self.assertLogs("core.export_jobs", level="ERROR"):
+            call_command("run_export_jobs", "--once", stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.Status.FAILED)
+        self.assertTrue(job.error)
+
+    @override_settings(EXPORT_JOB_STALE_AFTER=600)
+    def test_stale_running_job_is_failed(self):
+        stale = ExportJob.objects.create(created_by=self.admin, model_labels=["core.Category"])
+        alive = ExportJob.objects.create(created_by=self.admin, model_labels=["core.Category"])
+        ExportJob.objects.filter(pk=stale.pk).update(
+            status=ExportJob.Status.RUNNING, updated_at=timezone.now() - timedelta(seconds=601)
+        )
+        ExportJob.objects.filter(pk=alive.pk).update(
+            status=ExportJob.Status.RUNNING, updated_at=timezone.now() - timedelta(seconds=599)
+        )
+
+        with self.assertLogs("core.export_jobs", level="WARNING"):
+            call_command("run_export_jobs", "--once", stdout=StringIO())
+        stale.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual(stale.status, ExportJob.Status.FAILED)
+        self.assertIn("Воркер остановился", stale.error)
+        self.assertIsNotNone(stale.finished_at)
+        self.assertEqual(alive.status, ExportJob.Status.RUNNING)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core.fragments import card_cache, card_cache_key
+from core.models import EventLike
+from .utils import create_category, create_event, create_user
+
+
+class EventCardCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = create_category("Кэш")
+        cls.event = create_event(category=cls.category, title="Кэшируемое")
+        cls.other = create_event(category=create_category("Другая"), title="Соседнее")
+
+    def setUp(self):
+        card_cache().clear()
+
+    def _cached(self, event) -> str | None:
+        return card_cache().get(card_cache_key(event.pk))
+
+    def test_list_fills_cache_and_reuses_it(self):
+        self.client.get(reverse("event_list"))
+        self.assertIn("Кэшируемое", self._cached(self.event))
+
+        # Подменяем фрагмент: второй запрос должен отдать его как есть, без рендера
+        card_cache().set(card_cache_key(self.event.pk), "<div>из-кэша</div>")
+        resp = self.client.get(reverse("event_list"))
+        self.assertContains(resp, "<div>из-кэша</div>", html=False)
+
+    def test_event_save_invalidates_only_its_card(self):
+        self.client.get(reverse("event_list"))
+        self.event.title = "Переименовано"
+        self.event.save()
+
+        self.assertIsNone(self._cached(self.event))
+        self.assertIsNotNone(self._cached(self.other))
+        self.assertContains(self.client.get(reverse("event_list")), "Переименовано")
+
+    def test_category_save_invalidates_its_events(self):
+        self.client.get(reverse("event_list"))
+        self.category.name = "Кэш-2"
+        self.category.save()
+
+        self.assertIsNone(self._cached(self.event))
+        self.assertIsNotNone(self._cached(self.other))
+
+    def test_like_and_application_invalidate_event_card(self):
+        user = create_user(username="cache-user")
+        self.client.get(reverse("event_list"))
+        like = EventLike.objects.create(user=user, event=self.event)
+        self.assertIsNone(self._cached(self.event))
+
+        self.client.get(reverse("event_list"))
+        like.delete()
+        self.assertIsNone(self._cached(self.event))
+
+        self.client.get(reverse("event_list"))
+        self.event.applications.create(user=user, motivation="m")
+        self.assertIsNone(self._cached(self.event))
+        self.assertIsNotNone(self._cached(self.other))
+
+    def test_warm_command_fills_cache(self):
+        call_command("warm_event_cache", stdout=StringIO())
+        self.assertIn("Кэшируемое", self._cached(self.event))
+        self.assertIn("Соседнее", self._cached(self.other))
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.fragments import card_cache
+from core.models import Event
+from .utils import create_event
+
+
+def make_image(width: int, height: int, fmt: str = "JPEG") -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (200, 80, 40)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class EventImageTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media, EVENT_IMAGE_WIDTHS=(320, 640, 960))
+        override.enable()
+        self.addCleanup(override.disable)
+        card_cache().clear()
+
+    def _event_with_image(self, width=1200, height=800, name="photo.jpg") -> Event:
+        event = create_event(title="С картинкой")
+        event.image = SimpleUploadedFile(name, make_image(width, height), content_type="image/jpeg")
+        event.save()
+        event.refresh_from_db()
+        return event
+
+    def test_upload_generates_renditions(self):
+        event = self._event_with_image()
+        info = event.image_renditions
+        self.assertEqual(info["source"], event.image.name)
+        self.assertEqual((event.image_width, event.image_height), (1200, 800))
+        self.assertEqual([w for w, _h, _n in info["webp"]], [320, 640, 960])
+        self.assertEqual([w for w, _h, _n in info["jpeg"]], [320, 640, 960])
+
+        width, height, name = info["webp"][0]
+        self.assertEqual((width, height), (320, 213))
+        with Image.open(event.image.storage.path(name)) as img:
+            self.assertEqual((img.format, img.size), ("WEBP", (320, 213)))
+
+    def test_small_image_is_not_upscaled(self):
+        event = self._event_with_image(200, 100, name="small.png")
+        self.assertEqual([w for w, _h, _n in event.image_renditions["jpeg"]], [200])
+
+    def test_card_and_detail_markup(self):
+        event = self._event_with_image()
+        html = self.client.get(reverse("event_list")).content.decode()
+        self.assertIn('type="image/webp"', html)
+        self.assertIn("-320w.webp 320w", html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('width="640" height="427"', html)
+        self.assertNotIn(f'src="{event.image.url}"', html)
+
+        html = self.client.get(reverse("event_detail", args=[event.pk])).content.decode()
+        self.assertIn('fetchpriority="high"', html)
+        self.assertNotIn('loading="lazy"', html)
+
+    def test_replacing_image_removes_old_renditions(self):
+        event = self._event_with_image()
+        old = event.image_renditions["jpeg"][0][2]
+        event.image = SimpleUploadedFile("second.jpg", make_image(700, 700), content_type="image/jpeg")
+        event.save()
+        event.refresh_from_db()
+
+        self.assertFalse(event.image.storage.exists(old))
+        self.assertEqual([w for w, _h, _n in event.image_renditions["jpeg"]], [320, 640, 700])
+
+    def test_delete_removes_renditions(self):
+        event = self._event_with_image()
+        names = [name for _w, _h, name in event.image_renditions["jpeg"] + event.image_renditions["webp"]]
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+        self.assertFalse(any(event.image.storage.exists(name) for name in names))
+
+    def test_decompression_bomb_does_not_break_save(self):
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 1000), self.assertLogs("core.signals", "ERROR"):
+            event = self._event_with_image(200, 200, name="bomb.png")
+        self.assertEqual(event.image_renditions, {})
+        self.assertTrue(event.image)
+
+    def test_backfill_command(self):
+        event = self._event_with_image()
+        Event.objects.filter(pk=event.pk).update(image_renditions={}, image_width=None, image_height=None)
+
+        out = StringIO()
+        call_command("generate_thumbnails", "--workers", "2", stdout=out, stderr=StringIO())
+        self.assertIn("Готово: 1", out.getvalue())
+        event.refresh_from_db()
+        self.assertEqual(event.image_renditions["source"], event.image.name)
+        self.assertEqual(event.image_width, 1200)
+
+        out = StringIO()
+        call_command("generate_thumbnails", "--workers", "1", stdout=out)
+        self.assertIn("актуальны", out.getvalue())
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import MetricsRegistry
+from .utils import create_event, create_user
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(username="metrics")
+        cls.staff = create_user(username="metrics_admin", is_staff=True, is_superuser=True)
+        cls.event = create_event(title="Метрики")
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        override = override_settings(METRICS_DIR=tmp.name, METRICS_FLUSH_INTERVAL=3600)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _scrape(self) -> str:
+        self.client.force_login(self.staff)
+        resp = self.client.get(reverse("metrics"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return resp.content.decode()
+
+    def test_requests_are_labelled_by_url_name(self):
+        self.client.get(reverse("event_list"))
+        self.client.get(reverse("event_list"))
+        self.client.force_login(self.user)
+        self.client.post(reverse("toggle_like", args=[self.event.pk]))
+
+        text = self._scrape()
+        self.assertIn('volunteer_http_requests_total{method="GET",status="200",view="event_list"} 2', text)
+        self.assertIn('volunteer_http_requests_total{method="POST",status="302",view="toggle_like"} 1', text)
+        self.assertIn('volunteer_http_request_duration_seconds_bucket{method="GET",view="event_list",le="+Inf"} 2', text)
+        self.assertIn('volunteer_http_request_duration_seconds_count{method="GET",view="event_list"} 2', text)
+        self.assertIn('volunteer_db_queries_total{view="toggle_like"}', text)
+        self.assertIn('volunteer_http_response_size_bytes_count{view="event_list"} 2', text)
+
+    def test_streaming_response_is_measured_when_consumed(self):
+        self.client.force_login(self.staff)
+        resp = self.client.post(reverse("admin:export_xlsx"), {"models": ["core.Event"], "format": "csv"})
+        body = b"".join(resp.streaming_content)
+
+        text = self._scrape()
+        self.assertIn('volunteer_http_response_size_bytes_count{view="admin:export_xlsx"} 1', text)
+        self.assertIn(f'volunteer_http_response_size_bytes_sum{{view="admin:export_xlsx"}} {len(body)}', text)
+
+    def test_snapshots_of_other_processes_are_summed(self):
+        self.client.get(reverse("event_list"))
+        other = MetricsRegistry(self.dir)
+        other.inc("volunteer_http_requests_total", {"method": "GET", "status": "200", "view": "event_list"}, 5)
+        (self.dir / f"metrics-{os.getppid()}.json").write_text(json.dumps(other.snapshot()), encoding="utf-8")
+
+        self.assertIn('volunteer_http_requests_total{method="GET",status="200",view="event_list"} 6', self._scrape())
+        self.assertTrue((self.dir / f"metrics-{os.getppid()}.json").exists())
+
+    def test_snapshots_of_dead_processes_are_folded(self):
+        self.client.get(reverse("event_list"))
+        for value in (2, 3):
+            dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+            other = MetricsRegistry(self.dir)
+            other.inc("volunteer_http_requests_total", {"method": "GET", "status": "200", "view": "event_list"}, value)
+            (self.dir / f"metrics-{dead.stdout.strip()}.json").write_text(json.dumps(other.snapshot()), encoding="utf-8")
+
+        line = 'volunteer_http_requests_total{method="GET",status="200",view="event_list"} 6'
+        self.assertIn(line, self._scrape())
+        self.assertEqual(
+            sorted(path.name for path in self.dir.glob("metrics-*.json")),
+            sorted(["metrics-dead.json", f"metrics-{os.getpid()}.json"]),
+        )
+        # повторный сбор не считает слитое дважды
+        self.assertIn(line, self._scrape())
+
+    def test_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+    @override_settings(METRICS_TOKEN="scrape-token")
+    def test_bearer_token(self):
+        resp = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(resp.status_code, 403)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import base64
+import warnings
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Event
+from core.pagination import Cursor
+from .utils import create_category
+
+
+@override_settings(EVENT_LIST_PAGE_SIZE=2)
+class EventListKeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = create_category("Пагинация")
+        base = timezone.now() + timedelta(days=1)
+        # две пары с одинаковой датой — проверяем, что pk разрешает «ничьи»
+        dates = [base, base, base + timedelta(hours=1), base + timedelta(hours=2), base + timedelta(hours=2)]
+        for i, dt in enumerate(dates):
+            Event.objects.create(
+                category=cat,
+                title=f"Событие {i}",
+                description="d",
+                event_date=dt,
+                location="loc",
+            )
+        cls.expected = list(Event.objects.order_by("-event_date", "-pk").values_list("pk", flat=True))
+
+    def _walk_forward(self):
+        seen, pages = [], []
+        resp = self.client.get(reverse("event_list"))
+        while True:
+            self.assertEqual(resp.status_code, 200)
+            page = resp.context["page"]
+            seen.extend(e.pk for e in page)
+            pages.append(page)
+            if not page.has_next:
+                return seen, pages
+            resp = self.client.get(reverse("event_list"), {"after": page.next_cursor})
+
+    def test_forward_walk_returns_every_event_once_in_order(self):
+        seen, pages = self._walk_forward()
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 3)
+        self.assertFalse(pages[0].has_previous)
+
+    def test_prev_link_returns_to_previous_page(self):
+        _, pages = self._walk_forward()
+        resp = self.client.get(reverse("event_list"), {"before": pages[2].prev_cursor})
+        self.assertEqual([e.pk for e in resp.context["page"]], [e.pk for e in pages[1]])
+
+        resp = self.client.get(reverse("event_list"), {"before": pages[1].prev_cursor})
+        page = resp.context["page"]
+        self.assertEqual([e.pk for e in page], [e.pk for e in pages[0]])
+        self.assertFalse(page.has_previous)
+        self.assertTrue(page.has_next)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        resp = self.client.get(reverse("event_list"), {"after": "!!!мусор"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([e.pk for e in resp.context["page"]], self.expected[:2])
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        def token(raw: str) -> str:
+            return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+        aware = timezone.now().isoformat()
+        tampered = [
+            token(f"{aware}|99999999999999999999999"),  # pk вне bigint
+            token("2030-01-01T00:00:00|1"),  # наивная дата
+            token("не дата|1"),
+        ]
+        for after in tampered:
+            self.assertIsNone(Cursor.decode(after))
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", RuntimeWarning)
+                resp = self.client.get(reverse("event_list"), {"after": after})
+            self.assertEqual([e.pk for e in resp.context["page"]], self.expected[:2])
+
+    def test_cursor_roundtrip(self):
+        now = timezone.now()
+        token = Cursor(value=now, pk=42).encode()
+        self.assertEqual(Cursor.decode(token), Cursor(value=now, pk=42))
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import pstats
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.profiling import list_profiles
+from .utils import create_event, create_user
+
+
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_user(username="prof_admin", is_staff=True, is_superuser=True)
+        cls.user = create_user(username="prof_user")
+        cls.event = create_event(title="Профиль")
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        override = override_settings(PROFILE_ENABLED=True, PROFILE_DIR=tmp.name, PROFILE_MAX_FILES=3)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _dumps(self) -> list[Path]:
+        return sorted(self.dir.glob("*.prof"))
+
+    def test_staff_flag_saves_dump(self):
+        self.client.force_login(self.staff)
+        resp = self.client.get(reverse("admin:core_event_changelist"), HTTP_X_PROFILE="1")
+        self.assertEqual(resp.status_code, 200)
+        name = resp["X-Profile-Id"]
+        self.assertEqual([p.name for p in self._dumps()], [name])
+
+        [dump] = list_profiles(limit=50)
+        self.assertEqual(dump.meta["view"], "admin:core_event_changelist")
+        self.assertEqual(dump.meta["user"], "prof_admin")
+        self.assertTrue(any("changelist_view" in f.function for f in dump.top))
+
+    def test_header_and_streaming_export(self):
+        self.client.force_login(self.staff)
+        resp = self.client.post(
+            reverse("admin:export_xlsx"), {"models": ["core.Event"], "format": "csv"}, HTTP_X_PROFILE="1"
+        )
+        self.assertEqual(self._dumps(), [])  # поток ещё не выдан
+        b"".join(resp.streaming_content)
+        self.assertEqual([p.name for p in self._dumps()], [resp["X-Profile-Id"]])
+        # профиль включает и генерацию потока, а не только вызов представления
+        [dump] = list_profiles(limit=50)
+        self.assertTrue(any("iter_csv" in f.function for f in dump.top))
+
+    def test_async_view_body_is_profiled_under_wsgi(self):
+        self.client.force_login(self.staff)
+        name = self.client.get(reverse("event_detail", args=[self.event.pk]), {"_profile": "1"})["X-Profile-Id"]
+        functions = {(Path(file).name, func) for file, _, func in pstats.Stats(str(self.dir / name)).stats}
+        self.assertIn(("views.py", "event_detail"), functions)
+        self.assertIn(("user_state.py", "aload"), functions)
+
+    def test_non_staff_is_not_profiled(self):
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("event_list"), {"_profile": "1"})
+        self.assertNotIn("X-Profile-Id", resp)
+        self.assertEqual(self._dumps(), [])
+
+    @override_settings(PROFILE_ENABLED=False)
+    def test_disabled_flag_is_ignored(self):
+        self.client.force_login(self.staff)
+        resp = self.client.get(reverse("admin:core_event_changelist"), HTTP_X_PROFILE="1")
+        self.assertNotIn("X-Profile-Id", resp)
+        self.assertEqual(self._dumps(), [])
+
+    def test_directory_is_bounded(self):
+        self.client.force_login(self.staff)
+        for _ in range(5):
+            self.client.get(reverse("event_list"), {"_profile": "1"})
+        self.assertEqual(len(self._dumps()), 3)
+        self.assertEqual(len(list(self.dir.glob("*.json"))), 3)
+
+    def test_admin_list_and_download(self):
+        self.client.force_login(self.staff)
+        name = self.client.get(reverse("event_list"), {"_profile": "1"})["X-Profile-Id"]
+
+        resp = self.client.get(reverse("admin:profiles"))
+        self.assertContains(resp, name)
+        self.assertContains(resp, "cumtime")
+
+        resp = self.client.get(reverse("admin:profile_download", args=[name]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(b"".join(resp.streaming_content), (self.dir / name).read_bytes())
+
+        resp = self.client.get(reverse("admin:profile_download", args=["..%2Fsettings.prof"]))
+        self.assertEqual(resp.status_code, 404)
+
+        self.client.force_login(self.user)
+        self.assertNotEqual(self.client.get(reverse("admin:profiles")).status_code, 200)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from collections.abc import Callable
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.fragments import card_cache
+from core.models import Category, Event, EventLike, VolunteerApplication
+from core.search import index_events
+from .utils import create_user
+
+SMALL = 10
+LARGE = 1000
+
+# Потолок SQL-запросов на страницу. Число не должно зависеть от объёма данных:
+# рост между SMALL и LARGE — это N+1, даже если потолок ещё не пробит.
+BUDGETS = {
+    "event_list": 2,
+    "event_list_user": 6,
+    "event_list_search": 3,  # + (id, updated_at, счётчики) найденных — для ETag
+    "event_detail": 5,
+    "my_dashboard": 4,
+    "apply_form": 4,
+    "admin_export_form": 3,
+    "admin_export_xlsx": 5,
+    "admin_export_csv": 3,
+    "admin_category_changelist": 5,
+    "admin_event_changelist": 6,
+    "admin_application_changelist": 6,
+    "admin_like_changelist": 6,  # + статистика таблицы (EstimatedCountPaginator) и фильтр по мероприятию
+}
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def _shape(sql: str) -> str:
+    """SQL без литералов: одинаковые «формы» запросов в одном ответе — признак N+1."""
+    return _LITERALS.sub("?", sql)
+
+
+def _describe(queries: list[dict]) -> str:
+    repeated = [(n, shape) for shape, n in Counter(_shape(q["sql"]) for q in queries).items() if n > 1]
+    lines = [f"{i}. {q['sql']}" for i, q in enumerate(queries, 1)]
+    if repeated:
+        lines.append("\nПовторяющиеся запросы:")
+        lines.extend(f"  ×{n}: {shape}" for n, shape in sorted(repeated, reverse=True))
+    return "\n".join(lines)
+
+
+class QueryBudgetTests(TestCase):
+    """Каждая страница укладывается в свой бюджет запросов и при 10, и при 1000 строк."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(username="budget")
+        cls.staff = create_user(username="budget_admin", is_staff=True, is_superuser=True)
+        cls.category = Category.objects.create(name="Бюджет")
+        cls._add_rows(SMALL)
+        cls.event = Event.objects.order_by("pk").first()
+
+    @classmethod
+    def _add_rows(cls, count: int) -> None:
+        """count мероприятий, пользователей, лайков и заявок (в т.ч. текущего пользователя)."""
+        User = get_user_model()
+        start = Event.objects.count()
+        now = timezone.now()
+        events = Event.objects.bulk_create(
+            Event(
+                category=cls.category,
+                title=f"Помощь {start + i}",
+                description="d",
+                location="l",
+                event_date=now + timedelta(hours=start + i),
+            )
+            for i in range(count)
+        )
+        users = User.objects.bulk_create(User(username=f"budget{start + i}") for i in range(count))
+        EventLike.objects.bulk_create(EventLike(user=u, event=e) for u, e in zip(users, events))
+        EventLike.objects.bulk_create(EventLike(user=cls.user, event=e) for e in events)
+        VolunteerApplication.objects.bulk_create(
+            VolunteerApplication(user=u, event=e, motivation="m") for u, e in zip(users, events)
+        )
+        VolunteerApplication.objects.bulk_create(
+            VolunteerApplication(user=cls.user, event=e, motivation="m") for e in events[1:]
+        )
+        index_events(e.pk for e in events)  # bulk_create обходит сигналы
+
+    def _count(self, request: Callable) -> list[dict]:
+        card_cache().clear()  # худший случай: карточки не в кэше
+        with CaptureQueriesContext(connection) as ctx:
+            resp = request()
+            if resp.streaming:
+                b"".join(resp.streaming_content)
+        self.assertEqual(resp.status_code, 200)
+        return ctx.captured_queries
+
+    def assertQueryBudget(self, name: str, request: Callable, *, user=None) -> None:
+        if user is not None:
+            self.client.force_login(user)
+        small = self._count(request)
+        self._add_rows(LARGE - SMALL)
+        large = self._count(request)
+
+        budget = BUDGETS[name]
+        self.assertLessEqual(
+            len(large),
+            budget,
+            f"{name}: {len(large)} запросов при {LARGE} строках, бюджет {budget}:\n{_describe(large)}",
+        )
+        self.assertEqual(
+            len(large),
+            len(small),
+            f"{name}: число запросов растёт с данными ({len(small)} при {SMALL} -> {len(large)} при {LARGE}):\n"
+            f"{_describe(large)}",
+        )
+
+    def test_event_list(self):
+        self.assertQueryBudget("event_list", lambda: self.client.get(reverse("event_list")))
+
+    def test_event_list_user(self):
+        self.assertQueryBudget("event_list_user", lambda: self.client.get(reverse("event_list")), user=self.user)
+
+    def test_event_list_search(self):
+        self.assertQueryBudget("event_list_search", lambda: self.client.get(reverse("event_list"), {"q": "помощь"}))
+
+    def test_event_detail(self):
+        url = reverse("event_detail", args=[self.event.pk])
+        self.assertQueryBudget("event_detail", lambda: self.client.get(url), user=self.user)
+
+    def test_my_dashboard(self):
+        self.assertQueryBudget("my_dashboard", lambda: self.client.get(reverse("my_dashboard")), user=self.user)
+
+    def test_apply_form(self):
+        # у первого мероприятия заявки от пользователя нет — показывается форма
+        url = reverse("apply_to_event", args=[self.event.pk])
+        self.assertQueryBudget("apply_form", lambda: self.client.get(url), user=self.user)
+
+    def test_admin_export_form(self):
+        self.assertQueryBudget(
+            "admin_export_form", lambda: self.client.get(reverse("admin:export_xlsx")), user=self.staff
+        )
+
+    def test_admin_export_xlsx(self):
+        data = {"models": ["core.Event", "core.VolunteerApplication", "core.EventLike"], "format": "xlsx"}
+        self.assertQueryBudget(
+            "admin_export_xlsx", lambda: self.client.post(reverse("admin:export_xlsx"), data), user=self.staff
+        )
+
+    def test_admin_export_csv(self):
+        data = {"models": ["core.VolunteerApplication"], "format": "csv"}
+        self.assertQueryBudget(
+            "admin_export_csv", lambda: self.client.post(reverse("admin:export_xlsx"), data), user=self.staff
+        )
+
+    def test_admin_changelists(self):
+        self.client.force_login(self.staff)
+        pages = {
+            "admin_category_changelist": "admin:core_category_changelist",
+            "admin_event_changelist": "admin:core_event_changelist",
+            "admin_application_changelist": "admin:core_volunteerapplication_changelist",
+            "admin_like_changelist": "admin:core_eventlike_changelist",
+        }
+        sizes = {name: len(self._count(lambda u=url: self.client.get(reverse(u)))) for name, url in pages.items()}
+        self._add_rows(LARGE - SMALL)
+        for name, url in pages.items():
+            with self.subTest(name):
+                large = self._count(lambda: self.client.get(reverse(url)))
+                self.assertLessEqual(len(large), BUDGETS[name], f"{name}: бюджет {BUDGETS[name]}:\n{_describe(large)}")
+                self.assertEqual(len(large), sizes[name], f"{name}: число запросов растёт с данными:\n{_describe(large)}")
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Category, Event, EventLike, VolunteerApplication
+
+# Большие таблицы, которые на горячих путях нельзя читать целиком
+HOT_TABLES = ("core_event", "core_volunteerapplication", "core_eventlike")
+
+
+def explain(sql: str, params=()) -> list[str]:
+    """План запроса построчно (SQLite: EXPLAIN QUERY PLAN, PostgreSQL: EXPLAIN)."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute(f"EXPLAIN {sql}", params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def plan_problems(plan: list[str]) -> list[str]:
+    """Строки плана с полным сканированием горячей таблицы (или сортировкой без индекса в SQLite)."""
+    problems = []
+    for line in plan:
+        for table in HOT_TABLES:
+            if connection.vendor == "sqlite":
+                if line.strip() == f"SCAN {table}":
+                    problems.append(line)
+            elif f"Seq Scan on {table} " in f"{line} ":
+                problems.append(line)
+        if connection.vendor == "sqlite" and "USE TEMP B-TREE FOR ORDER BY" in line:
+            problems.append(line)
+    return problems
+
+
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN для горячих запросов на засеянных данных: тест падает, если запрос
+    перестал попадать в индекс (например, после правки сортировки или фильтра).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        now = timezone.now()
+        categories = Category.objects.bulk_create(Category(name=f"Категория {i}") for i in range(10))
+        cls.events = Event.objects.bulk_create(
+            Event(
+                category=categories[i % len(categories)],
+                title=f"Событие {i}",
+                description="d",
+                location="l",
+                event_date=now + timedelta(hours=i),
+            )
+            for i in range(400)
+        )
+        users = User.objects.bulk_create(User(username=f"plan{i}") for i in range(60))
+        VolunteerApplication.objects.bulk_create(
+            VolunteerApplication(user=u, event=e, motivation="m") for i, u in enumerate(users) for e in cls.events[i : i + 20]
+        )
+        EventLike.objects.bulk_create(
+            EventLike(user=u, event=e) for i, u in enumerate(users) for e in cls.events[i * 2 : i * 2 + 20]
+        )
+        cls.user = users[0]
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # На маленьких таблицах Postgres честно выбирает Seq Scan; запрещаем его,
+            # чтобы проверять именно наличие подходящего индекса.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndexes(self, captured: list[dict]) -> None:
+        checked = 0
+        for query in captured:
+            sql = query["sql"]
+            if not sql.startswith("SELECT") or not any(f'"{t}"' in sql for t in HOT_TABLES):
+                continue
+            checked += 1
+            plan = explain(sql)
+            problems = plan_problems(plan)
+            self.assertFalse(problems, f"Запрос ушёл в полное сканирование:\n{sql}\n\nПлан:\n" + "\n".join(plan))
+        self.assertGreater(checked, 0, "Не найдено ни одного запроса к горячим таблицам")
+
+    def _view_queries(self, url: str, **params) -> list[dict]:
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url, params)
+        self.assertEqual(resp.status_code, 200)
+        return ctx.captured_queries
+
+    def test_event_list_first_and_next_page(self):
+        first = self._view_queries(reverse("event_list"))
+        self.assertUsesIndexes(first)
+
+        resp = self.client.get(reverse("event_list"))
+        self.assertUsesIndexes(self._view_queries(reverse("event_list"), after=resp.context["page"].next_cursor))
+
+    def test_event_detail(self):
+        self.client.force_login(self.user)
+        self.assertUsesIndexes(self._view_queries(reverse("event_detail", args=[self.events[5].pk])))
+
+    def test_my_dashboard(self):
+        self.client.force_login(self.user)
+        self.assertUsesIndexes(self._view_queries(reverse("my_dashboard")))
+
+    def test_admin_filter_by_status_and_event(self):
+        qs = VolunteerApplication.objects.filter(status=VolunteerApplication.Status.NEW, event=self.events[10])
+        with CaptureQueriesContext(connection) as ctx:
+            list(qs)
+        self.assertUsesIndexes(ctx.captured_queries)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Event
+from core.search import search_event_ids
+from .utils import create_category, create_event
+
+
+class EventSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.eco = create_category("Экология")
+        cls.park = create_event(category=cls.eco, title="Субботник в парке", days_from_now=1)
+        cls.shelter = create_event(category=create_category("Животные"), title="Помощь приюту", days_from_now=2)
+        cls.library = create_event(category=create_category("Образование"), title="Наставник", days_from_now=3)
+
+    def test_search_by_title_description_location_and_category(self):
+        self.assertEqual(search_event_ids("субботник"), [self.park.pk])
+        self.assertEqual(search_event_ids("приют"), [self.shelter.pk])  # префикс слова
+        self.assertEqual(search_event_ids("экология"), [self.park.pk])  # категория
+        self.assertEqual(len(search_event_ids("Амстердам")), 3)  # место
+        self.assertEqual(search_event_ids("нет-такого"), [])
+
+    def test_title_match_ranks_above_description_match(self):
+        other = create_event(category=self.eco, title="Лекция")
+        Event.objects.filter(pk=other.pk).update(description="После лекции — субботник")
+        Event.objects.get(pk=other.pk).save()  # переиндексация по сигналу
+
+        self.assertEqual(search_event_ids("субботник"), [self.park.pk, other.pk])
+
+    def test_index_updates_on_event_and_category_save(self):
+        self.park.title = "Высадка деревьев"
+        self.park.save()
+        self.assertEqual(search_event_ids("деревьев"), [self.park.pk])
+        self.assertEqual(search_event_ids("субботник"), [])
+
+        self.eco.name = "Зелёный город"
+        self.eco.save()
+        self.assertEqual(search_event_ids("зелёный"), [self.park.pk])
+
+        self.park.delete()
+        self.assertEqual(search_event_ids("деревьев"), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        # кавычки/операторы FTS не должны ломать запрос
+        self.assertEqual(search_event_ids('"субботник" * (:^'), [self.park.pk])
+        self.assertEqual(search_event_ids("!!!"), [])
+
+    @override_settings(EVENT_LIST_PAGE_SIZE=2)
+    def test_event_list_search_is_paginated(self):
+        resp = self.client.get(reverse("event_list"), {"q": "Амстердам"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.context["cards"]), 2)
+        self.assertEqual(resp.context["next_query"], "q=%D0%90%D0%BC%D1%81%D1%82%D0%B5%D1%80%D0%B4%D0%B0%D0%BC&page=2")
+
+        resp = self.client.get(reverse("event_list"), {"q": "Амстердам", "page": 2})
+        self.assertEqual(len(resp.context["cards"]), 1)
+        self.assertIsNone(resp.context["next_query"])
+        self.assertIsNotNone(resp.context["prev_query"])
+
+    @override_settings(EVENT_LIST_PAGE_SIZE=1, SEARCH_MAX_PAGE=2)
+    def test_event_list_search_page_is_capped(self):
+        resp = self.client.get(reverse("event_list"), {"q": "Амстердам", "page": 2})
+        self.assertEqual(len(resp.context["cards"]), 1)
+        self.assertIsNone(resp.context["next_query"])  # третья страница есть, но за потолком
+
+        for page in (3, "99999999999999999999"):
+            resp = self.client.get(reverse("event_list"), {"q": "Амстердам", "page": page})
+            self.assertEqual(resp.status_code, 404)
+
+    def test_event_list_search_renders_cards(self):
+        resp = self.client.get(reverse("event_list"), {"q": "приют"})
+        self.assertContains(resp, "Помощь приюту")
+        self.assertNotContains(resp, "Субботник в парке")
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import threading
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.applications import decide_applications
+from core.models import Event, VolunteerApplication
+from core.seats import change_status, submit_application
+from .utils import create_category, create_event, create_user
+
+Status = VolunteerApplication.Status
+
+
+def _apply(user, event) -> VolunteerApplication:
+    return submit_application(VolunteerApplication(user=user, event=event, motivation="m"))
+
+
+class SeatAllocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = create_event(title="Фестиваль")
+        Event.objects.filter(pk=cls.event.pk).update(capacity=2)
+        cls.users = [create_user(username=f"s{i}") for i in range(5)]
+
+    def _seats(self) -> int:
+        return Event.objects.values_list("seats_taken", flat=True).get(pk=self.event.pk)
+
+    def _statuses(self) -> list[str]:
+        return list(VolunteerApplication.objects.filter(event=self.event).order_by("pk").values_list("status", flat=True))
+
+    def test_overflow_goes_to_waitlist(self):
+        for user in self.users[:4]:
+            _apply(user, self.event)
+        self.assertEqual(self._statuses(), [Status.NEW, Status.NEW, Status.WAITLISTED, Status.WAITLISTED])
+        self.assertEqual(self._seats(), 2)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.applications_count, 4)
+
+    def test_unlimited_capacity(self):
+        Event.objects.filter(pk=self.event.pk).update(capacity=None)
+        for user in self.users:
+            _apply(user, self.event)
+        self.assertEqual(set(self._statuses()), {Status.NEW})
+        self.assertEqual(self._seats(), 5)
+
+    def test_withdraw_promotes_first_in_line(self):
+        first, _second, third, fourth = [_apply(u, self.event) for u in self.users[:4]]
+        self.assertEqual(change_status(first, Status.WITHDRAWN), [third.pk])
+        self.assertEqual(self._statuses(), [Status.WITHDRAWN, Status.NEW, Status.NEW, Status.WAITLISTED])
+        self.assertEqual(self._seats(), 2)
+
+        # из листа ожидания уходят без освобождения места
+        change_status(fourth, Status.WITHDRAWN)
+        self.assertEqual(self._seats(), 2)
+
+    def test_bulk_reject_promotes(self):
+        for user in self.users:
+            _apply(user, self.event)
+        modified = Event.objects.values_list("updated_at", flat=True).get(pk=self.event.pk)
+        seated = VolunteerApplication.objects.filter(event=self.event, status=Status.NEW)
+        decide_applications(seated, Status.REJECTED, None)
+        self.assertEqual(
+            self._statuses(), [Status.REJECTED, Status.REJECTED, Status.NEW, Status.NEW, Status.WAITLISTED]
+        )
+        self.assertEqual(self._seats(), 2)
+        # страница мероприятия получает новый ETag / Last-Modified
+        self.assertGreater(Event.objects.values_list("updated_at", flat=True).get(pk=self.event.pk), modified)
+
+    def test_bulk_approve_of_waitlisted_takes_seats(self):
+        for user in self.users[:4]:
+            _apply(user, self.event)
+        decide_applications(VolunteerApplication.objects.filter(event=self.event), Status.APPROVED, None)
+        self.assertEqual(self._seats(), 4)  # решение организатора может превысить capacity
+
+    def test_event_row_is_locked_before_application(self):
+        application = _apply(self.users[0], self.event)
+        with CaptureQueriesContext(connection) as ctx:
+            change_status(application, Status.WITHDRAWN)
+        sqls = [q["sql"] for q in ctx.captured_queries]
+        first_event = next(i for i, sql in enumerate(sqls) if '"core_event"' in sql)
+        first_update = next(i for i, sql in enumerate(sqls) if sql.startswith('UPDATE "core_volunteerapplication"'))
+        self.assertLess(first_event, first_update)
+
+    def test_stale_application_is_not_changed(self):
+        application = _apply(self.users[0], self.event)
+        VolunteerApplication.objects.filter(pk=application.pk).update(status=Status.REJECTED)
+        self.assertEqual(change_status(application, Status.WITHDRAWN), [])
+        self.assertEqual(VolunteerApplication.objects.get(pk=application.pk).status, Status.REJECTED)
+
+    def test_duplicate_does_not_leak_seat(self):
+        _apply(self.users[0], self.event)
+        with self.assertRaises(IntegrityError):
+            _apply(self.users[0], self.event)
+        self.assertEqual(self._seats(), 1)
+
+    def test_admin_capacity_increase_promotes(self):
+        for user in self.users[:4]:
+            _apply(user, self.event)
+        staff = create_user(username="organiser", is_staff=True, is_superuser=True)
+        self.client.force_login(staff)
+        event = Event.objects.get(pk=self.event.pk)
+        resp = self.client.post(
+            reverse("admin:core_event_change", args=[event.pk]),
+            {
+                "category": event.category_id,
+                "title": event.title,
+                "description": event.description,
+                "event_date_0": event.event_date.strftime("%d.%m.%Y"),
+                "event_date_1": event.event_date.strftime("%H:%M:%S"),
+                "location": event.location,
+                "capacity": 3,
+            },
+        )
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(self._statuses().count(Status.NEW), 3)
+
+    def test_admin_event_save_keeps_counters(self):
+        _apply(self.users[0], self.event)
+        staff = create_user(username="organiser", is_staff=True, is_superuser=True)
+        self.client.force_login(staff)
+        event = Event.objects.get(pk=self.event.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(
+                reverse("admin:core_event_change", args=[event.pk]),
+                {
+                    "category": event.category_id,
+                    "title": "Новое название",
+                    "description": event.description,
+                    "event_date_0": event.event_date.strftime("%d.%m.%Y"),
+                    "event_date_1": event.event_date.strftime("%H:%M:%S"),
+                    "location": event.location,
+                    "capacity": 2,
+                },
+            )
+        [save] = [
+            q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "core_event"') and '"title"' in q["sql"]
+        ]
+        for field in ("likes_count", "applications_count", "seats_taken"):
+            self.assertNotIn(f'"{field}"', save)
+        self.assertEqual(Event.objects.get(pk=event.pk).title, "Новое название")
+
+    def test_admin_bulk_delete_releases_seats(self):
+        first, second, third = [_apply(u, self.event) for u in self.users[:3]]
+        staff = create_user(username="organiser", is_staff=True, is_superuser=True)
+        self.client.force_login(staff)
+        self.client.post(
+            reverse("admin:core_volunteerapplication_changelist"),
+            {"action": "delete_selected", "post": "yes", "_selected_action": [first.pk, second.pk]},
+        )
+        self.assertEqual(self._statuses(), [Status.NEW])
+        self.assertEqual(self._seats(), 1)
+
+    def test_recount_fixes_seat_drift(self):
+        _apply(self.users[0], self.event)
+        Event.objects.filter(pk=self.event.pk).update(seats_taken=7)
+        call_command("recount_counters", stdout=StringIO())
+        self.assertEqual(self._seats(), 1)
+
+
+class SeatViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = create_event(category=create_category("Места"), title="Один волонтёр")
+        Event.objects.filter(pk=cls.event.pk).update(capacity=1)
+        cls.first = create_user(username="first")
+        cls.second = create_user(username="second")
+
+    def test_apply_when_full_and_withdraw(self):
+        self.client.force_login(self.first)
+        self.client.post(reverse("apply_to_event", args=[self.event.pk]), {"motivation": "Хочу"})
+
+        self.client.force_login(self.second)
+        resp = self.client.post(reverse("apply_to_event", args=[self.event.pk]), {"motivation": "Я тоже"}, follow=True)
+        self.assertContains(resp, "листе ожидания")
+        self.assertContains(resp, "Мест занято: <b>1</b> из 1")
+
+        self.client.force_login(self.first)
+        resp = self.client.post(reverse("withdraw_application", args=[self.event.pk]), follow=True)
+        self.assertContains(resp, "Заявка отозвана")
+        self.assertEqual(VolunteerApplication.objects.get(user=self.second).status, Status.NEW)
+
+        # отозванную заявку второй раз не отозвать
+        resp = self.client.post(reverse("withdraw_application", args=[self.event.pk]), follow=True)
+        self.assertContains(resp, "уже нельзя отозвать")
+
+    def test_reapply_after_withdraw_goes_to_end_of_waitlist(self):
+        third = create_user(username="third")
+        for user in (self.first, self.second, third):
+            self.client.force_login(user)
+            self.client.post(reverse("apply_to_event", args=[self.event.pk]), {"motivation": "Хочу"})
+
+        self.client.force_login(self.second)
+        self.client.post(reverse("withdraw_application", args=[self.event.pk]))
+        resp = self.client.get(reverse("event_detail", args=[self.event.pk]))
+        self.assertContains(resp, "можно подать снова")
+
+        resp = self.client.post(reverse("apply_to_event", args=[self.event.pk]), {"motivation": "Передумал"}, follow=True)
+        self.assertContains(resp, "листе ожидания")
+        again = VolunteerApplication.objects.get(user=self.second, event=self.event)
+        self.assertEqual((again.status, again.motivation), (Status.WAITLISTED, "Передумал"))
+        self.assertGreater(again.pk, VolunteerApplication.objects.get(user=third).pk)  # в конец очереди
+        self.assertEqual(
+            Event.objects.values_list("seats_taken", "applications_count").get(pk=self.event.pk), (1, 3)
+        )
+
+        # место освободилось — первым поднимается тот, кто ждал дольше
+        self.client.force_login(self.first)
+        self.client.post(reverse("withdraw_application", args=[self.event.pk]))
+        self.assertEqual(VolunteerApplication.objects.get(user=third).status, Status.NEW)
+
+        # активную заявку повторно не подать
+        self.client.force_login(self.second)
+        resp = self.client.post(reverse("apply_to_event", args=[self.event.pk]), {"motivation": "Ещё"}, follow=True)
+        self.assertContains(resp, "уже подали заявку")
+
+
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class ConcurrentApplyTests(TransactionTestCase):
+    def test_parallel_applications_never_exceed_capacity(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("нужна файловая БД")
+        event = create_event(title="Ажиотаж")
+        Event.objects.filter(pk=event.pk).update(capacity=3)
+        users = [create_user(username=f"rush{i}") for i in range(12)]
+        barrier = threading.Barrier(len(users))
+        errors = []
+
+        def worker(user):
+            try:
+                barrier.wait()
+                _apply(user, event)
+            except Exception as exc:  # в тесте важно увидеть любую ошибку потока
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(u,)) for u in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        statuses = list(VolunteerApplication.objects.filter(event=event).values_list("status", flat=True))
+        self.assertEqual(statuses.count(Status.NEW), 3)
+        self.assertEqual(statuses.count(Status.WAITLISTED), 9)
+        self.assertEqual(Event.objects.get(pk=event.pk).seats_taken, 3)
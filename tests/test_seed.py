@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import random
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from core.counters import find_counter_drift
+from core.models import Event, EventLike, VolunteerApplication
+from core.synthetic import zipf_counts
+
+
+class SeedScaleTests(TestCase):
+    def _seed(self, *args: str) -> str:
+        out = StringIO()
+        call_command("seed", *args, stdout=out)
+        return out.getvalue()
+
+    def test_scale_mode_creates_requested_rows(self):
+        out = self._seed(
+            "--users", "40", "--events", "25", "--likes", "300", "--applications", "120",
+            "--batch-size", "50", "--seed", "7",
+        )
+        self.assertIn("строк/с", out)
+        self.assertEqual(Event.objects.count(), 25)
+        self.assertEqual(EventLike.objects.count(), 300)
+        self.assertEqual(VolunteerApplication.objects.count(), 120)
+        # bulk_create обходит сигналы — счётчики пересчитаны в конце
+        self.assertFalse(find_counter_drift().exists())
+
+        likes = sorted(Event.objects.values_list("likes_count", flat=True), reverse=True)
+        self.assertGreater(likes[0], likes[len(likes) // 2] * 3)
+
+    def test_too_many_likes_rejected(self):
+        with self.assertRaises(CommandError):
+            self._seed("--users", "2", "--events", "2", "--likes", "5")
+
+    def test_zipf_counts_deterministic_and_capped(self):
+        a = zipf_counts(1000, 50, skew=1.2, cap=60, rng=random.Random(1))
+        b = zipf_counts(1000, 50, skew=1.2, cap=60, rng=random.Random(1))
+        self.assertEqual(a, b)
+        self.assertEqual(sum(a), 1000)
+        self.assertLessEqual(max(a), 60)
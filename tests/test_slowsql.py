@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Event
+from core.slowsql import capture_slow_queries, check_slow_sql_cache, clear_slow_queries, recent_slow_queries
+from .utils import create_event, create_user
+
+
+@override_settings(SLOW_SQL_ENABLED=True, SLOW_SQL_THRESHOLD_MS=0, SLOW_SQL_BUFFER_SIZE=5)
+class SlowSqlTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user(username="slow_admin", is_staff=True, is_superuser=True)
+        cls.staff = create_user(username="slow_staff", is_staff=True)
+        create_event(title="Медленно")
+
+    def setUp(self):
+        clear_slow_queries()
+
+    def test_view_queries_recorded_with_view_and_plan(self):
+        self.client.get(reverse("event_list"))
+        records = recent_slow_queries()
+        self.assertTrue(records)
+        event_queries = [r for r in records if "core_event" in r["sql"]]
+        self.assertTrue(event_queries)
+        self.assertTrue(all(r["source"].startswith("event_list (GET /") for r in event_queries))
+        self.assertTrue(all(r["plan"] for r in event_queries))
+
+    def test_ring_buffer_is_bounded(self):
+        with capture_slow_queries("test"):
+            for _ in range(12):
+                list(Event.objects.all())
+        records = recent_slow_queries()
+        self.assertEqual(len(records), 5)
+        self.assertEqual([r["seq"] for r in records], [12, 11, 10, 9, 8])
+        self.assertEqual(records[0]["source"], "test")
+
+    @override_settings(SLOW_SQL_THRESHOLD_MS=60_000)
+    def test_fast_queries_are_ignored(self):
+        self.client.get(reverse("event_list"))
+        self.assertEqual(recent_slow_queries(), [])
+
+    @override_settings(SLOW_SQL_ENABLED=False)
+    def test_disabled_by_setting(self):
+        self.client.get(reverse("event_list"))
+        self.assertEqual(recent_slow_queries(), [])
+
+    def test_admin_page_superuser_only_and_clear(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(reverse("admin:slow_sql")).status_code, 403)
+
+        self.client.force_login(self.admin)
+        self.client.get(reverse("event_list"))
+        resp = self.client.get(reverse("admin:slow_sql"))
+        self.assertContains(resp, "event_list (GET /)")
+        self.assertContains(resp, "План:")
+
+        self.client.post(reverse("admin:slow_sql"))
+        # после очистки в буфере только запросы самого редиректа/страницы
+        self.assertFalse(any("core_event" in r["sql"] for r in recent_slow_queries()))
+
+    def test_process_local_cache_is_reported(self):
+        [warning] = check_slow_sql_cache(None)
+        self.assertEqual(warning.id, "core.W001")
+        self.client.force_login(self.admin)
+        self.assertContains(self.client.get(reverse("admin:slow_sql")), "в памяти процесса")
+
+        shared = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": tempfile.gettempdir()}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_slow_sql_cache(None), [])
+        with override_settings(SLOW_SQL_ENABLED=False):
+            self.assertEqual(check_slow_sql_cache(None), [])
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.fragments import card_cache
+from core.models import Event, EventLike, VolunteerApplication
+from core.user_state import EventUserStateLoader
+from .utils import create_category, create_user
+
+
+class EventUserStateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.password = "pass12345"
+        cls.user = create_user(username="state", password=cls.password)
+        category = create_category("Состояние")
+        now = timezone.now()
+        cls.events = Event.objects.bulk_create(
+            Event(category=category, title=f"E{i}", description="d", location="l", event_date=now + timedelta(days=i))
+            for i in range(6)
+        )
+        EventLike.objects.create(user=cls.user, event=cls.events[0])
+        VolunteerApplication.objects.create(user=cls.user, event=cls.events[1], motivation="m")
+
+    def setUp(self):
+        card_cache().clear()
+
+    def test_loader_batches_and_memoizes(self):
+        loader = EventUserStateLoader(self.user)
+        ids = [e.pk for e in self.events]
+
+        with self.assertNumQueries(2):
+            states = loader.load(ids)
+        self.assertTrue(states[self.events[0].pk].liked)
+        self.assertEqual(states[self.events[1].pk].application.status, VolunteerApplication.Status.NEW)
+        self.assertFalse(states[self.events[2].pk].liked)
+
+        with self.assertNumQueries(0):
+            loader.get(self.events[0].pk)
+
+    def test_anonymous_costs_nothing(self):
+        with self.assertNumQueries(0):
+            states = EventUserStateLoader(AnonymousUser()).load([e.pk for e in self.events])
+        self.assertFalse(any(s.liked or s.application for s in states.values()))
+
+    def test_list_badges_constant_queries(self):
+        self.client.login(username=self.user.username, password=self.password)
+        self.client.get(reverse("event_list"))  # прогрев кэша карточек
+
+        with CaptureQueriesContext(connection) as small:
+            resp = self.client.get(reverse("event_list"))
+        self.assertContains(resp, "Вам нравится")
+        self.assertContains(resp, "Заявка: Новая")
+
+        # Лайки и заявки на всех мероприятиях — число запросов то же
+        for event in self.events[2:]:
+            EventLike.objects.create(user=self.user, event=event)
+        card_cache().clear()
+        self.client.get(reverse("event_list"))
+        with CaptureQueriesContext(connection) as big:
+            self.client.get(reverse("event_list"))
+        self.assertEqual(len(big.captured_queries), len(small.captured_queries))
+
+    def test_detail_uses_loader(self):
+        self.client.login(username=self.user.username, password=self.password)
+        resp = self.client.get(reverse("event_detail", args=[self.events[0].pk]))
+        self.assertTrue(resp.context["liked"])
+        self.assertIsNone(resp.context["application"])
+
+        resp = self.client.get(reverse("event_detail", args=[self.events[1].pk]))
+        self.assertFalse(resp.context["liked"])
+        self.assertEqual(resp.context["application"].status, VolunteerApplication.Status.NEW)
@@ -80,6 +80,42 @@ class ViewsAccessAndCrudTests(TestCase):
         self.assertEqual(resp2.status_code, 302)
         self.assertFalse(EventLike.objects.filter(user=self.user, event=self.event).exists())
 
+    def test_toggle_like_json_mode(self):
+        self.client.login(username=self.user.username, password=self.user_password)
+        url = reverse("toggle_like", args=[self.event.pk])
+
+        resp = self.client.post(url, HTTP_ACCEPT="application/json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json(), {"liked": True, "likes_count": 1})
+        self.assertTrue(EventLike.objects.filter(user=self.user, event=self.event).exists())
+
+        resp = self.client.post(url, HTTP_ACCEPT="application/json")
+        self.assertEqual(resp.json(), {"liked": False, "likes_count": 0})
+
+    def test_toggle_like_does_not_select_before_write(self):
+        self.client.login(username=self.user.username, password=self.user_password)
+        url = reverse("toggle_like", args=[self.event.pk])
+
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(url, HTTP_ACCEPT="application/json")
+            like_selects = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT") and "core_eventlike" in q["sql"]]
+            self.assertEqual(like_selects, [])
+
+    def test_toggle_like_existing_row_is_not_integrity_error(self):
+        # «Двойной клик»: лайк уже вставлен параллельным запросом — переключение снимает его
+        self.client.login(username=self.user.username, password=self.user_password)
+        EventLike.objects.create(user=self.user, event=self.event)
+
+        resp = self.client.post(reverse("toggle_like", args=[self.event.pk]), HTTP_ACCEPT="application/json")
+        self.assertEqual(resp.json()["liked"], False)
+
+    def test_toggle_like_missing_event_404(self):
+        self.client.login(username=self.user.username, password=self.user_password)
+        resp = self.client.post(reverse("toggle_like", args=[999999]), HTTP_ACCEPT="application/json")
+        self.assertEqual(resp.status_code, 404)
+        self.assertFalse(EventLike.objects.filter(user=self.user).exists())
+
     def test_event_list_query_count_is_reasonable(self):
         # защита от N+1: список мероприятий должен грузиться малым числом запросов.
         # Правильная проверка: "не больше N", а не "ровно N".
@@ -1,4 +1,8 @@
-"""ASGI config for volunteer_service project."""
+"""
+ASGI config for volunteer_service project.
+
+uvicorn volunteer_service.asgi:application — см. README, раздел «ASGI».
+"""
 import os
 from django.core.asgi import get_asgi_application
 
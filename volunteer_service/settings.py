@@ -3,6 +3,7 @@
 from pathlib import Path
 import os
 import sys
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,12 +30,20 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Под ASGI — потоковые ответы по чанку, а не целиком в памяти (core.async_support)
+    "core.async_support.AsyncStreamingMiddleware",
+    # Сразу за ней — чтобы в замер попадали все остальные middleware
+    "core.metrics.MetricsMiddleware",
+    "core.slowsql.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise, не ломающий async-цепочку в режиме ASGI (core.async_support)
+    "core.async_support.AsyncWhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # ?_profile=1 / X-Profile: 1 от staff — дамп cProfile запроса (core.profiling)
+    "core.profiling.ProfileMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -61,6 +70,16 @@ TEMPLATES = [
 WSGI_APPLICATION = "volunteer_service.wsgi.application"
 
 # --- Database (default: Postgres in Docker) ---------------------------------
+# Соединения: либо постоянные (DB_CONN_MAX_AGE секунд, 0 — новое соединение на каждый запрос),
+# либо пул psycopg 3 (DB_POOL=1, на процесс; тогда CONN_MAX_AGE всегда 0 — так требует Django).
+# Под ASGI постоянные соединения не переиспользуются — там нужен пул.
+DB_POOL = os.getenv("DB_POOL", "0") == "1"
+DB_POOL_OPTIONS = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+    # сколько секунд запрос ждёт свободное соединение, прежде чем получить ошибку
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+}
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -69,9 +88,65 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", "volunteer_pass"),
         "HOST": os.getenv("POSTGRES_HOST", "db"),
         "PORT": int(os.getenv("POSTGRES_PORT", "5432")),
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        # Перед первым запросом в новом HTTP-запросе проверять, живо ли соединение
+        # (перезапуск Postgres, разрыв по таймауту) — иначе запрос упадёт с ошибкой
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "1") == "1",
+        "OPTIONS": {"pool": DB_POOL_OPTIONS} if DB_POOL else {},
     }
 }
 
+# --- Cache -------------------------------------------------------------------
+# По умолчанию — локальная память процесса. В проде с несколькими воркерами задайте
+# общий бэкенд, например:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://redis:6379/1
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "default"),
+    },
+}
+
+# Кэш отрендеренных карточек мероприятий (core.fragments)
+EVENT_CARD_CACHE_ALIAS = os.getenv("EVENT_CARD_CACHE_ALIAS", "default")
+EVENT_CARD_CACHE_TIMEOUT = int(os.getenv("EVENT_CARD_CACHE_TIMEOUT", str(24 * 3600)))
+
+# Полнотекстовый поиск (core.search): конфигурация текстового поиска PostgreSQL
+SEARCH_CONFIG = os.getenv("SEARCH_CONFIG", "russian")
+# Последняя доступная страница поисковой выдачи: дальше — 404, без глубокого OFFSET по ранжированию
+SEARCH_MAX_PAGE = int(os.getenv("SEARCH_MAX_PAGE", "50"))
+
+# Ширины уменьшенных копий Event.image (core.images), px
+EVENT_IMAGE_WIDTHS = tuple(int(w) for w in os.getenv("EVENT_IMAGE_WIDTHS", "320,640,960,1280").split(","))
+
+# Экспорт из админки: сколько строк читать из БД за раз (.iterator(chunk_size=...))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+# Фоновая выгрузка без отчёта о прогрессе дольше стольких секунд считается брошенной (воркер умер)
+EXPORT_JOB_STALE_AFTER = int(os.getenv("EXPORT_JOB_STALE_AFTER", "1800"))
+
+# Метрики по представлениям (core.metrics): снимки процессов в METRICS_DIR,
+# сумма — на /metrics/ (staff или заголовок "Authorization: Bearer <METRICS_TOKEN>")
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_DIR = os.getenv(
+    "METRICS_DIR",
+    "/dev/shm/volunteer_metrics" if os.path.isdir("/dev/shm") else os.path.join(tempfile.gettempdir(), "volunteer_metrics"),
+)
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Журнал медленных SQL (core.slowsql), просмотр — /admin/slow-sql/. По умолчанию выключен.
+# Буфер — в кэше SLOW_SQL_CACHE_ALIAS; при нескольких воркерах он должен быть общим (см. CACHES)
+SLOW_SQL_ENABLED = os.getenv("SLOW_SQL_ENABLED", "0") == "1"
+SLOW_SQL_THRESHOLD_MS = float(os.getenv("SLOW_SQL_THRESHOLD_MS", "200"))
+SLOW_SQL_BUFFER_SIZE = int(os.getenv("SLOW_SQL_BUFFER_SIZE", "200"))
+SLOW_SQL_CACHE_ALIAS = os.getenv("SLOW_SQL_CACHE_ALIAS", "default")
+
+# Профилирование запросов staff по требованию (core.profiling), список — /admin/profiles/.
+# По умолчанию выключено; дампы — вне дерева исходников (в docker оно смонтировано с хоста)
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "volunteer_profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
 # --- Test-friendly defaults -------------------------------------------------
 # Чтобы `python manage.py test` запускался без внешней БД (например, в CI),
 # при запуске тестов переключаемся на SQLite.
@@ -88,6 +163,8 @@ if "test" in sys.argv or os.getenv("DJANGO_TEST", "0") == "1":
     if "tests" not in INSTALLED_APPS:
         INSTALLED_APPS.append("tests")
 
+    METRICS_DIR = os.path.join(tempfile.gettempdir(), "volunteer_metrics_test")
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -108,8 +185,27 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Файлы фоновых выгрузок (core.storage): не в MEDIA_ROOT — MEDIA_URL раздаётся без проверки прав
+EXPORT_ROOT = os.getenv("EXPORT_ROOT", str(BASE_DIR / "private"))
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Размер страницы списка мероприятий (keyset-пагинация)
+EVENT_LIST_PAGE_SIZE = int(os.getenv("EVENT_LIST_PAGE_SIZE", "12"))
+
+# JSON API (core.api): размер страницы по умолчанию, потолок ?limit=, Cache-Control max-age в секундах
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "20"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "100"))
+API_CACHE_MAX_AGE = int(os.getenv("API_CACHE_MAX_AGE", "60"))
+
+# Массовое решение по заявкам (core.applications): строк на один UPDATE
+DECISION_BATCH_SIZE = int(os.getenv("DECISION_BATCH_SIZE", "5000"))
+
+# Админка больших таблиц (core.admin): с какого размера (по статистике БД) не делать COUNT(*),
+# сколько мероприятий показывать в боковом фильтре
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv("ADMIN_ESTIMATED_COUNT_THRESHOLD", "100000"))
+ADMIN_EVENT_FILTER_LIMIT = int(os.getenv("ADMIN_EVENT_FILTER_LIMIT", "20"))
+
 LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "event_list"
 LOGOUT_REDIRECT_URL = "event_list"